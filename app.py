@@ -1,20 +1,33 @@
 """
 Main Flask application for Social Media Automation Bot.
 """
-from flask import Flask, jsonify, request, render_template
+from flask import Flask, Response, jsonify, request, render_template
 from flask_cors import CORS
+import hmac
 import logging
 import os
 
 from backend.config import config
-from backend.models.database import db, User, ScheduledPost, SocialAccount, Analytics
+from backend.models.database import (
+    db, User, ScheduledPost, SocialAccount, Analytics, RecurringSchedule, upgrade_schema
+)
+from backend.models.projections import POST_PROJECTION, ACCOUNT_PROJECTION
 from backend.core.scheduler import PostScheduler
 from backend.core.post_handler import PostHandler
 from backend.core.analytics import AnalyticsTracker
+from backend.core.events import create_event_hub
+from backend.core import metrics
+from backend.core.planner import plan_post_time
+from backend.core.recurrence import validate_rule
+from backend.media.prefetch import create_media_prefetcher
+from backend.utils.serialization import create_serializer
+from backend.utils.compression import Compressor
+from backend.utils.asgi import WsgiToAsgi
+from backend.utils.idempotency import DeliveryLog, idempotent
 from backend.utils.helpers import (
     hash_password, verify_password, generate_token, 
     require_auth, format_error_response, format_success_response,
-    validate_subscription, encrypt_credentials, decrypt_credentials
+    validate_subscription, validate_media_url, encrypt_credentials, decrypt_credentials
 )
 
 # Configure logging
@@ -25,8 +38,14 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 
-def create_app(config_name='default'):
-    """Create and configure the Flask application."""
+def create_app(config_name='default', scheduler_role=None):
+    """
+    Create and configure the Flask application.
+    
+    Args:
+        config_name: Configuration name
+        scheduler_role: Overrides SCHEDULER_ROLE ('embedded', 'api' or 'worker')
+    """
     # Get the base directory
     basedir = os.path.abspath(os.path.dirname(__file__))
     
@@ -40,17 +59,43 @@ def create_app(config_name='default'):
     # Enable CORS
     CORS(app)
     
+    # Response serializer used by format_success_response
+    app.serializer = create_serializer(app.config['JSON_SERIALIZER'])
+    
+    # Compress large responses and version static assets
+    Compressor(app)
+    
     # Initialize database
     db.init_app(app)
     
     # Initialize scheduler and post handler
     with app.app_context():
         db.create_all()
-        post_handler = PostHandler(app.config)
-        scheduler = PostScheduler(db, post_handler)
+        upgrade_schema(db.engine)
+        post_handler = PostHandler(app.config, delivery_log=DeliveryLog(app))
+        event_hub = create_event_hub(app.config)
+        scheduler = PostScheduler(
+            db, post_handler, event_hub,
+            app=app,
+            role=scheduler_role or app.config['SCHEDULER_ROLE'],
+            poll_interval=app.config['SCHEDULER_POLL_SECONDS'],
+            batch_size=app.config['SCHEDULER_BATCH_SIZE'],
+            lease_seconds=app.config['SCHEDULER_LEASE_SECONDS'],
+            worker_id=app.config['SCHEDULER_WORKER_ID'],
+            plan_weights={name: plan.get('weight', 1)
+                          for name, plan in app.config['SUBSCRIPTION_PLANS'].items()},
+            dispatch_workers=app.config['SCHEDULER_DISPATCH_WORKERS'],
+            recurrence_horizon=app.config['RECURRENCE_HORIZON_MINUTES'] * 60,
+            recurrence_interval=app.config['RECURRENCE_POLL_SECONDS'],
+            media_prefetcher=create_media_prefetcher(app.config, post_handler),
+            prefetch_horizon=app.config['MEDIA_PREFETCH_MINUTES'] * 60,
+            prefetch_interval=app.config['MEDIA_PREFETCH_POLL_SECONDS'],
+            tenant_metrics_limit=app.config['METRICS_TENANT_LIMIT']
+        )
         analytics_tracker = AnalyticsTracker(db)
         
         # Store in app context
+        app.event_hub = event_hub
         app.scheduler = scheduler
         app.post_handler = post_handler
         app.analytics_tracker = analytics_tracker
@@ -63,6 +108,77 @@ def create_app(config_name='default'):
     return app
 
 
+def create_asgi_app(config_name='default'):
+    """
+    Create the application wrapped for ASGI servers such as uvicorn.
+    
+    Request handlers, including their database access, run on a thread pool
+    bounded by ASGI_MAX_WORKERS so blocking I/O never stalls the event loop.
+    Event streams are iterated on a separate pool bounded by ASGI_MAX_STREAMS.
+    Credential checks await the platform call on the post handler's pool
+    (PUBLISH_MAX_WORKERS), so a slow platform API holds no request thread.
+    """
+    app = create_app(config_name)
+    
+    def shutdown():
+        app.scheduler.shutdown()
+        app.post_handler.shutdown()
+    
+    asgi_app = WsgiToAsgi(app, max_workers=app.config['ASGI_MAX_WORKERS'],
+                          max_streams=app.config['ASGI_MAX_STREAMS'], on_shutdown=shutdown)
+    
+    async def validate_social_account(environ):
+        """Awaitable version of POST /api/accounts/validate."""
+        user_id, platform, denied = await asgi_app.run_in_executor(authorize_validation, app, environ)
+        if denied is not None:
+            return await asgi_app.run_in_executor(finish_response, app, environ, lambda: denied)
+        valid = await app.post_handler.validate_credentials_async(platform, user_id=user_id)
+        return await asgi_app.run_in_executor(
+            finish_response, app, environ,
+            lambda: format_success_response({'platform': platform, 'valid': valid})
+        )
+    
+    asgi_app.add_route('POST', '/api/accounts/validate', validate_social_account)
+    asgi_app.flask_app = app
+    return asgi_app
+
+
+def authorize_validation(app, environ):
+    """
+    Authenticate a credential check and read its platform.
+    
+    Args:
+        app: Flask application
+        environ: WSGI environ of the request
+        
+    Returns:
+        tuple: (user_id, platform, None), or (None, None, error response)
+    """
+    with app.request_context(environ):
+        denied = require_auth(lambda: None)()
+        if denied is not None:
+            return None, None, denied
+        platform = read_validation_platform()
+        if not platform:
+            return None, None, format_error_response("Unknown platform")
+        return request.user_id, platform, None
+
+
+def finish_response(app, environ, view):
+    """Build a response in the request's context and run the after-request hooks."""
+    with app.request_context(environ):
+        return app.process_response(app.make_response(view()))
+
+
+def read_validation_platform():
+    """Get the platform of a credential check request, or None if unknown."""
+    from flask import current_app
+    
+    data = request.get_json(silent=True) or {}
+    platform = str(data.get('platform', '')).lower()
+    return platform if platform in current_app.post_handler.platforms else None
+
+
 def register_routes(app):
     """Register all API routes."""
     
@@ -76,6 +192,18 @@ def register_routes(app):
         """Health check endpoint."""
         return jsonify({'status': 'healthy'})
     
+    @app.route('/api/metrics')
+    def get_metrics():
+        """Scheduler metrics in the Prometheus text format."""
+        token = app.config.get('METRICS_TOKEN')
+        if not token:
+            # Never served unauthenticated: lag and queue depth describe every user
+            return format_error_response("Metrics are disabled; set METRICS_TOKEN", 404)
+        auth = request.headers.get('Authorization', '')
+        if not hmac.compare_digest(auth, f'Bearer {token}'):
+            return format_error_response("Unauthorized", 401)
+        return Response(app.scheduler.render_metrics(), content_type=metrics.CONTENT_TYPE)
+    
     # Authentication routes
     @app.route('/api/auth/register', methods=['POST'])
     def register():
@@ -135,11 +263,14 @@ def register_routes(app):
     @require_auth
     def get_posts():
         """Get all scheduled posts for the user."""
-        posts = ScheduledPost.query.filter_by(user_id=request.user_id).all()
-        return format_success_response([post.to_dict() for post in posts])
+        rows = db.session.execute(
+            POST_PROJECTION.select().where(ScheduledPost.user_id == request.user_id)
+        )
+        return format_success_response(POST_PROJECTION.to_dicts(rows))
     
     @app.route('/api/posts', methods=['POST'])
     @require_auth
+    @idempotent
     def create_post():
         """Schedule a new post."""
         data = request.json
@@ -147,6 +278,10 @@ def register_routes(app):
         if not all(k in data for k in ['content', 'platforms', 'scheduled_time']):
             return format_error_response("Missing required fields")
         
+        is_valid, message = validate_media_url(data.get('media_url'))
+        if not is_valid:
+            return format_error_response(message)
+        
         # Validate user subscription
         user = User.query.get(request.user_id)
         is_valid, message = validate_subscription(user)
@@ -156,20 +291,35 @@ def register_routes(app):
         from datetime import datetime
         scheduled_time = datetime.fromisoformat(data['scheduled_time'])
         
+        # Optional window in which the post may be moved to spread load
+        try:
+            flexibility_minutes = int(data.get('flexibility_minutes') or 0)
+        except (TypeError, ValueError):
+            return format_error_response("flexibility_minutes must be an integer")
+        if not 0 <= flexibility_minutes <= app.config['PLANNER_MAX_FLEX_MINUTES']:
+            return format_error_response(
+                f"flexibility_minutes must be between 0 and {app.config['PLANNER_MAX_FLEX_MINUTES']}"
+            )
+        flex_window_seconds = flexibility_minutes * 60
+        planned_time = plan_post_time(db.session, scheduled_time, flex_window_seconds,
+                                      app.config['PLANNER_SLOT_SECONDS'])
+        
         # Create post
         post = ScheduledPost(
             user_id=request.user_id,
             content=data['content'],
             platforms=','.join(data['platforms']),
             scheduled_time=scheduled_time,
-            media_url=data.get('media_url')
+            media_url=data.get('media_url'),
+            flex_window_seconds=flex_window_seconds,
+            planned_time=planned_time
         )
         
         db.session.add(post)
         db.session.commit()
         
         # Schedule the post
-        app.scheduler.schedule_post(post.id, scheduled_time)
+        app.scheduler.schedule_post(post.id, planned_time or scheduled_time)
         
         return format_success_response(post.to_dict(), "Post scheduled successfully")
     
@@ -191,6 +341,95 @@ def register_routes(app):
         
         return format_success_response(None, "Post deleted successfully")
     
+    # Recurring schedule routes
+    @app.route('/api/recurring', methods=['GET'])
+    @require_auth
+    def get_recurring_schedules():
+        """Get all recurring schedules for the user."""
+        schedules = RecurringSchedule.query.filter_by(user_id=request.user_id).all()
+        return format_success_response([schedule.to_dict() for schedule in schedules])
+    
+    @app.route('/api/recurring', methods=['POST'])
+    @require_auth
+    @idempotent
+    def create_recurring_schedule():
+        """Create a recurring schedule from an RRULE or cron expression."""
+        data = request.json
+        
+        if not all(k in data for k in ['content', 'platforms', 'rule']):
+            return format_error_response("Missing required fields")
+        
+        is_valid, message = validate_media_url(data.get('media_url'))
+        if not is_valid:
+            return format_error_response(message)
+        
+        user = User.query.get(request.user_id)
+        is_valid, message = validate_subscription(user)
+        if not is_valid:
+            return format_error_response(message, 403)
+        
+        from datetime import datetime
+        try:
+            starts_at = datetime.fromisoformat(data['starts_at']) if data.get('starts_at') else datetime.utcnow()
+            ends_at = datetime.fromisoformat(data['ends_at']) if data.get('ends_at') else None
+        except ValueError:
+            return format_error_response("starts_at and ends_at must be ISO8601 datetimes")
+        
+        is_valid, first_run = validate_rule(data['rule'], starts_at, ends_at)
+        if not is_valid:
+            return format_error_response(first_run)
+        
+        schedule = RecurringSchedule(
+            user_id=request.user_id,
+            content=data['content'],
+            platforms=','.join(data['platforms']),
+            media_url=data.get('media_url'),
+            rule=data['rule'],
+            starts_at=starts_at,
+            ends_at=ends_at,
+            next_run_at=first_run
+        )
+        
+        db.session.add(schedule)
+        db.session.commit()
+        
+        # Occurrences already inside the horizon are created right away
+        app.scheduler.materialize_recurring([schedule.id])
+        db.session.refresh(schedule)
+        
+        return format_success_response(schedule.to_dict(), "Recurring schedule created successfully")
+    
+    @app.route('/api/recurring/<int:schedule_id>', methods=['DELETE'])
+    @require_auth
+    def delete_recurring_schedule(schedule_id):
+        """Stop a recurring schedule and remove its unpublished posts."""
+        schedule = RecurringSchedule.query.filter_by(id=schedule_id, user_id=request.user_id).first()
+        
+        if not schedule:
+            return format_error_response("Recurring schedule not found", 404)
+        
+        pending = ScheduledPost.query.filter_by(recurrence_id=schedule_id, status='pending').all()
+        for post in pending:
+            app.scheduler.cancel_post(post.id)
+            db.session.delete(post)
+        
+        # Published posts keep their history, so the rule is kept but stopped
+        schedule.is_active = False
+        schedule.next_run_at = None
+        db.session.commit()
+        
+        return format_success_response(None, "Recurring schedule deleted successfully")
+    
+    @app.route('/api/events', methods=['GET'])
+    @require_auth(allow_query_token=True)
+    def stream_events():
+        """Stream post status changes as server-sent events."""
+        stream = app.event_hub.stream(request.user_id, app.config['SSE_KEEPALIVE_SECONDS'])
+        return Response(stream, mimetype='text/event-stream', headers={
+            'Cache-Control': 'no-cache',
+            'X-Accel-Buffering': 'no'
+        })
+    
     # Analytics routes
     @app.route('/api/analytics/summary', methods=['GET'])
     @require_auth
@@ -223,8 +462,10 @@ def register_routes(app):
     @require_auth
     def get_social_accounts():
         """Get all connected social accounts."""
-        accounts = SocialAccount.query.filter_by(user_id=request.user_id).all()
-        return format_success_response([acc.to_dict() for acc in accounts])
+        rows = db.session.execute(
+            ACCOUNT_PROJECTION.select().where(SocialAccount.user_id == request.user_id)
+        )
+        return format_success_response(ACCOUNT_PROJECTION.to_dicts(rows))
     
     @app.route('/api/accounts', methods=['POST'])
     @require_auth
@@ -250,6 +491,17 @@ def register_routes(app):
         
         return format_success_response(account.to_dict(), "Account connected successfully")
     
+    @app.route('/api/accounts/validate', methods=['POST'])
+    @require_auth
+    def validate_social_account():
+        """Check a platform's credentials against its API."""
+        platform = read_validation_platform()
+        if not platform:
+            return format_error_response("Unknown platform")
+        
+        valid = app.post_handler.validate_credentials(platform, user_id=request.user_id)
+        return format_success_response({'platform': platform, 'valid': valid})
+    
     # User profile
     @app.route('/api/user/profile', methods=['GET'])
     @require_auth
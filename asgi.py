@@ -0,0 +1,11 @@
+"""
+ASGI entry point for the Social Media Automation Bot.
+
+Run with an ASGI server, for example:
+    uvicorn asgi:app --host 0.0.0.0 --port 5000
+"""
+import os
+
+from app import create_asgi_app
+
+app = create_asgi_app(os.getenv('FLASK_ENV', 'production'))
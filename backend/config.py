@@ -8,6 +8,10 @@ from dotenv import load_dotenv
 # Load environment variables
 load_dotenv()
 
+# Runtime files (SQLite databases, media cache) live in the Flask instance folder
+INSTANCE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'instance')
+DEFAULT_MEDIA_CACHE_DIR = os.path.join(INSTANCE_DIR, 'media_cache')
+
 
 class Config:
     """Base configuration class."""
@@ -36,12 +40,84 @@ class Config:
     INSTAGRAM_USERNAME = os.getenv('INSTAGRAM_USERNAME')
     INSTAGRAM_PASSWORD = os.getenv('INSTAGRAM_PASSWORD')
     
+    # 'fake' sends all platform calls to the fake platform server
+    # (python -m backend.integrations.fake_server) instead of the real APIs
+    PLATFORM_API_MODE = os.getenv('PLATFORM_API_MODE', 'live')
+    FAKE_PLATFORM_URL = os.getenv('FAKE_PLATFORM_URL', 'http://127.0.0.1:8090')
+    FAKE_PLATFORM_TIMEOUT = float(os.getenv('FAKE_PLATFORM_TIMEOUT', 10))
+    
+    # Media is downloaded once into a content-addressed cache shared by all
+    # integrations; set MEDIA_CACHE_DIR empty to pass URLs through unchanged
+    MEDIA_CACHE_DIR = os.getenv('MEDIA_CACHE_DIR', DEFAULT_MEDIA_CACHE_DIR)
+    MEDIA_CACHE_MAX_MB = int(os.getenv('MEDIA_CACHE_MAX_MB', 1024))
+    MEDIA_MAX_FILE_MB = int(os.getenv('MEDIA_MAX_FILE_MB', 512))
+    MEDIA_FETCH_TIMEOUT = float(os.getenv('MEDIA_FETCH_TIMEOUT', 30))
+    # Media URLs resolving to loopback, private or link-local addresses are
+    # refused unless this is set (e.g. media served by the fake platform server)
+    MEDIA_ALLOW_PRIVATE_HOSTS = os.getenv('MEDIA_ALLOW_PRIVATE_HOSTS', 'false').lower() == 'true'
+    # Media of posts due within this many minutes is downloaded in the background; 0 disables
+    MEDIA_PREFETCH_MINUTES = int(os.getenv('MEDIA_PREFETCH_MINUTES', 30))
+    MEDIA_PREFETCH_POLL_SECONDS = int(os.getenv('MEDIA_PREFETCH_POLL_SECONDS', 60))
+    MEDIA_PREFETCH_WORKERS = int(os.getenv('MEDIA_PREFETCH_WORKERS', 4))
+    # Processes producing per-platform image variants; 0 uploads originals unchanged
+    MEDIA_TRANSCODE_WORKERS = int(os.getenv('MEDIA_TRANSCODE_WORKERS', 2))
+    # Chunk size for streaming uploads; bounds memory per concurrent upload
+    MEDIA_UPLOAD_CHUNK_KB = int(os.getenv('MEDIA_UPLOAD_CHUNK_KB', 4096))
+    
+    # Scheduler settings
+    # embedded: web process publishes; api: web process only enqueues and a
+    # separate `python worker.py` process publishes
+    SCHEDULER_ROLE = os.getenv('SCHEDULER_ROLE', 'embedded')
+    SCHEDULER_POLL_SECONDS = int(os.getenv('SCHEDULER_POLL_SECONDS', 30))
+    SCHEDULER_BATCH_SIZE = int(os.getenv('SCHEDULER_BATCH_SIZE', 100))
+    SCHEDULER_LEASE_SECONDS = int(os.getenv('SCHEDULER_LEASE_SECONDS', 300))
+    SCHEDULER_WORKER_ID = os.getenv('SCHEDULER_WORKER_ID')  # Defaults to host:pid:random
+    SCHEDULER_DISPATCH_WORKERS = int(os.getenv('SCHEDULER_DISPATCH_WORKERS', 10))
+    # Recurring schedules are materialized into posts this far ahead
+    RECURRENCE_HORIZON_MINUTES = int(os.getenv('RECURRENCE_HORIZON_MINUTES', 60))
+    RECURRENCE_POLL_SECONDS = int(os.getenv('RECURRENCE_POLL_SECONDS', 60))
+    # Load smoothing for posts with a flexibility window
+    PLANNER_MAX_FLEX_MINUTES = int(os.getenv('PLANNER_MAX_FLEX_MINUTES', 60))
+    PLANNER_SLOT_SECONDS = int(os.getenv('PLANNER_SLOT_SECONDS', 1))
+    
+    # Idempotency settings
+    IDEMPOTENCY_TTL_HOURS = int(os.getenv('IDEMPOTENCY_TTL_HOURS', 24))
+    IDEMPOTENCY_LOCK_SECONDS = int(os.getenv('IDEMPOTENCY_LOCK_SECONDS', 60))  # reclaim keys of crashed requests
+    
+    # Response serialization: auto (orjson when installed), orjson, json
+    JSON_SERIALIZER = os.getenv('JSON_SERIALIZER', 'auto')
+    
+    # Response compression and static asset caching
+    COMPRESS_MIN_SIZE = int(os.getenv('COMPRESS_MIN_SIZE', 1024))  # bytes
+    COMPRESS_LEVEL = int(os.getenv('COMPRESS_LEVEL', 6))  # gzip 1-9
+    COMPRESS_BR_LEVEL = int(os.getenv('COMPRESS_BR_LEVEL', 5))  # brotli 0-11
+    STATIC_MAX_AGE = int(os.getenv('STATIC_MAX_AGE', 31536000))  # seconds, versioned assets only
+    
+    # ASGI serving: requests, open event streams and awaited platform calls run on separate bounded pools
+    ASGI_MAX_WORKERS = int(os.getenv('ASGI_MAX_WORKERS', 16))
+    ASGI_MAX_STREAMS = int(os.getenv('ASGI_MAX_STREAMS', 256))
+    PUBLISH_MAX_WORKERS = int(os.getenv('PUBLISH_MAX_WORKERS', 8))
+    
+    # Event streaming settings
+    EVENT_BACKEND = os.getenv('EVENT_BACKEND', 'memory')  # memory, redis
+    REDIS_URL = os.getenv('REDIS_URL', 'redis://localhost:6379/0')
+    EVENT_QUEUE_SIZE = int(os.getenv('EVENT_QUEUE_SIZE', 100))
+    SSE_KEEPALIVE_SECONDS = int(os.getenv('SSE_KEEPALIVE_SECONDS', 15))
+    
+    # Prometheus metrics; scrapers send METRICS_TOKEN as a bearer token, and
+    # /api/metrics is disabled while it is unset
+    METRICS_TOKEN = os.getenv('METRICS_TOKEN')
+    METRICS_PORT = int(os.getenv('METRICS_PORT', 0))  # Publisher worker metrics listener; 0 disables
+    METRICS_HOST = os.getenv('METRICS_HOST', '127.0.0.1')  # Interface the worker listener binds to
+    METRICS_TENANT_LIMIT = int(os.getenv('METRICS_TENANT_LIMIT', 20))  # Users exported by per-user gauges
+    
     # Subscription settings
     STRIPE_API_KEY = os.getenv('STRIPE_API_KEY')
     SUBSCRIPTION_PLANS = {
-        'basic': {'price': 9.99, 'posts_per_month': 100, 'platforms': 2},
-        'premium': {'price': 29.99, 'posts_per_month': 500, 'platforms': 5},
-        'enterprise': {'price': 99.99, 'posts_per_month': -1, 'platforms': -1}
+        # weight: share of publisher capacity relative to other users during bursts
+        'basic': {'price': 9.99, 'posts_per_month': 100, 'platforms': 2, 'weight': 1},
+        'premium': {'price': 29.99, 'posts_per_month': 500, 'platforms': 5, 'weight': 2},
+        'enterprise': {'price': 99.99, 'posts_per_month': -1, 'platforms': -1, 'weight': 4}
     }
 
 
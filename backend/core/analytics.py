@@ -4,6 +4,7 @@ Analytics module for tracking post performance and engagement.
 import logging
 from datetime import datetime, timedelta
 from backend.models.database import Analytics, ScheduledPost
+from backend.models.projections import ANALYTICS_PROJECTION
 
 logger = logging.getLogger(__name__)
 
@@ -172,11 +173,11 @@ class AnalyticsTracker:
             list: Analytics records for the post
         """
         try:
-            analytics = self.db.session.query(Analytics).filter(
-                Analytics.post_id == post_id
-            ).all()
+            rows = self.db.session.execute(
+                ANALYTICS_PROJECTION.select().where(Analytics.post_id == post_id)
+            )
             
-            return [a.to_dict() for a in analytics]
+            return ANALYTICS_PROJECTION.to_dicts(rows)
             
         except Exception as e:
             logger.error(f"Error getting post analytics: {str(e)}")
@@ -0,0 +1,245 @@
+"""
+Event hub for pushing post status changes to connected clients.
+Events are fanned out to per-user subscriber queues and streamed as
+server-sent events.
+"""
+import itertools
+import json
+import logging
+import queue
+import threading
+
+logger = logging.getLogger(__name__)
+
+
+class InMemoryBackend:
+    """
+    Delivers events to listeners inside the current process.
+    """
+
+    def __init__(self):
+        """Initialize the in-memory backend."""
+        self._listeners = []
+        self._lock = threading.Lock()
+
+    def publish(self, user_id, event):
+        """
+        Publish an event for a user.
+
+        Args:
+            user_id: ID of the user the event belongs to
+            event: Event dictionary
+        """
+        with self._lock:
+            listeners = list(self._listeners)
+        for listener in listeners:
+            listener(user_id, event)
+
+    def listen(self, callback):
+        """
+        Register a callback invoked with (user_id, event) for every event.
+
+        Args:
+            callback: Callable receiving published events
+        """
+        with self._lock:
+            self._listeners.append(callback)
+
+    def close(self):
+        """Remove all listeners."""
+        with self._lock:
+            self._listeners = []
+
+
+class RedisBackend:
+    """
+    Relays events between processes through Redis pub/sub.
+
+    Requires the redis package. Every process publishes to the same channel
+    and delivers received events to its own local subscribers.
+    """
+
+    def __init__(self, url, channel='social_bot_events'):
+        """
+        Initialize the Redis backend.
+
+        Args:
+            url: Redis connection URL
+            channel: Pub/sub channel name
+        """
+        import redis
+        self.client = redis.Redis.from_url(url)
+        self.channel = channel
+        self._pubsub = None
+        self._thread = None
+
+    def publish(self, user_id, event):
+        """Publish an event to the shared channel."""
+        self.client.publish(self.channel, json.dumps({'user_id': user_id, 'event': event}))
+
+    def listen(self, callback):
+        """Start a background thread delivering channel messages to callback."""
+        def handle(message):
+            try:
+                payload = json.loads(message['data'])
+                callback(payload['user_id'], payload['event'])
+            except Exception as e:
+                logger.error(f"Error handling event message: {str(e)}")
+
+        self._pubsub = self.client.pubsub(ignore_subscribe_messages=True)
+        self._pubsub.subscribe(**{self.channel: handle})
+        self._thread = self._pubsub.run_in_thread(sleep_time=1.0, daemon=True)
+
+    def close(self):
+        """Stop listening and release the connection."""
+        if self._thread:
+            self._thread.stop()
+        if self._pubsub:
+            self._pubsub.close()
+
+
+class EventHub:
+    """
+    Fans out published events to per-user subscriber queues.
+    """
+
+    def __init__(self, backend=None, max_queue_size=100):
+        """
+        Initialize the event hub.
+
+        Args:
+            backend: Pub/sub backend (defaults to InMemoryBackend)
+            max_queue_size: Maximum buffered events per subscriber
+        """
+        self.backend = backend or InMemoryBackend()
+        self.max_queue_size = max_queue_size
+        self._subscribers = {}
+        self._lock = threading.Lock()
+        self._ids = itertools.count(1)
+        self.backend.listen(self._deliver)
+
+    def publish(self, user_id, event_type, data):
+        """
+        Publish an event to every subscriber of a user.
+
+        Args:
+            user_id: ID of the user the event belongs to
+            event_type: Event name, e.g. 'post.status'
+            data: JSON-serializable event payload
+        """
+        try:
+            self.backend.publish(user_id, {'type': event_type, 'data': data})
+        except Exception as e:
+            logger.error(f"Error publishing {event_type} event: {str(e)}")
+
+    def subscribe(self, user_id):
+        """
+        Subscribe to a user's events.
+
+        Args:
+            user_id: ID of the user
+
+        Returns:
+            queue.Queue: Queue receiving the user's events
+        """
+        subscription = queue.Queue(maxsize=self.max_queue_size)
+        with self._lock:
+            self._subscribers.setdefault(user_id, []).append(subscription)
+        return subscription
+
+    def unsubscribe(self, user_id, subscription):
+        """Remove a subscription created by subscribe()."""
+        with self._lock:
+            subscriptions = self._subscribers.get(user_id, [])
+            if subscription in subscriptions:
+                subscriptions.remove(subscription)
+            if not subscriptions:
+                self._subscribers.pop(user_id, None)
+
+    def subscriber_count(self, user_id=None):
+        """Get the number of active subscriptions, optionally for one user."""
+        with self._lock:
+            if user_id is not None:
+                return len(self._subscribers.get(user_id, []))
+            return sum(len(subs) for subs in self._subscribers.values())
+
+    def stream(self, user_id, keepalive=15):
+        """
+        Generate server-sent event messages for a user.
+
+        Args:
+            user_id: ID of the user
+            keepalive: Seconds of inactivity before sending a keepalive comment
+
+        Yields:
+            str: SSE-formatted messages
+        """
+        subscription = self.subscribe(user_id)
+        try:
+            yield 'retry: 5000\n\n'
+            while True:
+                try:
+                    event = subscription.get(timeout=keepalive)
+                except queue.Empty:
+                    yield ': keepalive\n\n'
+                    continue
+                yield format_sse(event['data'], event=event['type'], event_id=next(self._ids))
+        finally:
+            self.unsubscribe(user_id, subscription)
+
+    def _deliver(self, user_id, event):
+        """Deliver a backend event to local subscribers."""
+        with self._lock:
+            subscriptions = list(self._subscribers.get(user_id, []))
+        for subscription in subscriptions:
+            try:
+                subscription.put_nowait(event)
+            except queue.Full:
+                logger.warning(f"Dropping {event['type']} event for slow subscriber of user {user_id}")
+
+    def close(self):
+        """Shut down the backend."""
+        self.backend.close()
+
+
+def format_sse(data, event=None, event_id=None):
+    """
+    Format a payload as a server-sent event message.
+
+    Args:
+        data: JSON-serializable payload
+        event: Optional event name
+        event_id: Optional event ID
+
+    Returns:
+        str: SSE message
+    """
+    lines = []
+    if event_id is not None:
+        lines.append(f'id: {event_id}')
+    if event:
+        lines.append(f'event: {event}')
+    lines.append(f'data: {json.dumps(data)}')
+    return '\n'.join(lines) + '\n\n'
+
+
+def create_event_hub(config):
+    """
+    Create an event hub using the backend named in configuration.
+
+    Args:
+        config: Application configuration
+
+    Returns:
+        EventHub: Configured event hub
+    """
+    backend = None
+    if config.get('EVENT_BACKEND') == 'redis':
+        try:
+            backend = RedisBackend(config.get('REDIS_URL'))
+            logger.info("Event hub using Redis backend")
+        except ImportError:
+            logger.warning("Redis library not installed, falling back to in-memory events")
+        except Exception as e:
+            logger.error(f"Error initializing Redis event backend: {str(e)}")
+    return EventHub(backend, max_queue_size=config.get('EVENT_QUEUE_SIZE', 100))
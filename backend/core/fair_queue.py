@@ -0,0 +1,84 @@
+"""
+Weighted fair queue for dispatching posts across tenants.
+
+Each item gets a virtual finish tag of max(virtual_time, tenant_last_tag) +
+1 / weight, and items are served in tag order. A tenant that enqueues a
+burst therefore only gets its weighted share of dispatch slots, and a tenant
+arriving later is served after at most a bounded number of the burst's items.
+"""
+import heapq
+import itertools
+import threading
+
+
+class FairQueue:
+    """
+    Thread-safe weighted fair queue keyed by tenant.
+    """
+
+    def __init__(self):
+        """Initialize an empty queue."""
+        self._heap = []
+        self._last_tags = {}
+        self._pending = {}
+        self._virtual_time = 0.0
+        self._sequence = itertools.count()
+        self._closed = False
+        self._condition = threading.Condition()
+
+    def push(self, tenant, item, weight=1):
+        """
+        Add an item for a tenant.
+
+        Args:
+            tenant: Tenant key (user ID)
+            item: Item to dispatch
+            weight: Tenant weight; higher weights get proportionally more slots
+        """
+        with self._condition:
+            start = max(self._virtual_time, self._last_tags.get(tenant, 0.0))
+            tag = start + 1.0 / max(weight, 1e-9)
+            self._last_tags[tenant] = tag
+            self._pending[tenant] = self._pending.get(tenant, 0) + 1
+            heapq.heappush(self._heap, (tag, next(self._sequence), tenant, item))
+            self._condition.notify()
+
+    def pop(self, timeout=None):
+        """
+        Remove and return the next (tenant, item) in fair order.
+
+        Args:
+            timeout: Seconds to wait for an item (None waits indefinitely)
+
+        Returns:
+            tuple: (tenant, item), or None on timeout or after close()
+        """
+        with self._condition:
+            if not self._condition.wait_for(lambda: self._heap or self._closed, timeout):
+                return None
+            if not self._heap:
+                return None
+            tag, _, tenant, item = heapq.heappop(self._heap)
+            self._virtual_time = tag
+            self._pending[tenant] -= 1
+            if not self._pending[tenant]:
+                # Idle tenants start again from the current virtual time
+                del self._pending[tenant]
+                del self._last_tags[tenant]
+            return tenant, item
+
+    def close(self):
+        """Wake all waiting consumers; pop() returns None once drained."""
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+
+    def depth(self, tenant=None):
+        """Get the number of queued items, optionally for one tenant."""
+        with self._condition:
+            if tenant is not None:
+                return self._pending.get(tenant, 0)
+            return len(self._heap)
+
+    def __len__(self):
+        return self.depth()
@@ -0,0 +1,104 @@
+"""
+Load planner that spreads flexible posts to flatten the publish rate.
+
+Users overwhelmingly schedule on round times, so many posts fall due in the
+same second. A post with a flexibility window may be published any time in
+[scheduled_time, scheduled_time + window]; the planner assigns it the least
+loaded time slot in that range. Strict posts (no window) are never moved.
+"""
+import math
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import func, select
+
+
+class LoadPlanner:
+    """
+    Tracks planned publish load per time slot and places flexible posts.
+    """
+
+    def __init__(self, slot_seconds=1):
+        """
+        Initialize the planner.
+
+        Args:
+            slot_seconds: Width of a load slot in seconds
+        """
+        self.slot_seconds = slot_seconds
+        self.load = Counter()
+
+    def _slot(self, when):
+        """Get the slot index containing a naive UTC datetime."""
+        return math.floor(_utc_timestamp(when) / self.slot_seconds)
+
+    def add(self, when):
+        """Record a post planned for a fixed time."""
+        self.load[self._slot(when)] += 1
+
+    def place(self, scheduled_time, window_seconds):
+        """
+        Choose a publish time for a post and record it.
+
+        Args:
+            scheduled_time: Earliest time the post may be published
+            window_seconds: Flexibility window; 0 keeps the exact time
+
+        Returns:
+            datetime: Planned publish time
+        """
+        if window_seconds <= 0:
+            self.add(scheduled_time)
+            return scheduled_time
+
+        first = self._slot(scheduled_time)
+        last = self._slot(scheduled_time + timedelta(seconds=window_seconds))
+        # Earliest of the least-loaded slots keeps added delay minimal
+        best = min(range(first, last + 1), key=lambda slot: (self.load[slot], slot))
+        self.load[best] += 1
+        if best == first:
+            return scheduled_time
+        offset = best * self.slot_seconds - _utc_timestamp(scheduled_time)
+        return scheduled_time + timedelta(seconds=offset)
+
+    def peak(self):
+        """Get the highest number of posts planned in any slot."""
+        return max(self.load.values(), default=0)
+
+
+def _utc_timestamp(when):
+    """Get the POSIX timestamp of a naive UTC datetime, whatever the host time zone."""
+    return when.replace(tzinfo=timezone.utc).timestamp()
+
+
+def plan_post_time(session, scheduled_time, window_seconds, slot_seconds=1):
+    """
+    Plan a publish time for a new post against posts already pending.
+
+    Args:
+        session: Database session
+        scheduled_time: Requested publish time
+        window_seconds: Flexibility window in seconds
+        slot_seconds: Width of a load slot in seconds
+
+    Returns:
+        datetime or None: Planned time, or None for strict posts
+    """
+    from backend.models.database import ScheduledPost
+
+    if not window_seconds or window_seconds <= 0:
+        return None
+
+    effective_time = func.coalesce(ScheduledPost.planned_time, ScheduledPost.scheduled_time)
+    end = scheduled_time + timedelta(seconds=window_seconds + slot_seconds)
+    planner = LoadPlanner(slot_seconds)
+    for (when,) in session.execute(
+        select(effective_time)
+        .where(ScheduledPost.status == 'pending',
+               effective_time >= scheduled_time,
+               effective_time < end)
+    ):
+        if isinstance(when, str):
+            when = datetime.fromisoformat(when)
+        planner.add(when)
+    return planner.place(scheduled_time, window_seconds)
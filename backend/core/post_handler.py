@@ -1,10 +1,17 @@
 """
 Post handler for publishing content to social media platforms.
 """
+import asyncio
+import functools
 import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 from backend.integrations.twitter_integration import TwitterIntegration
 from backend.integrations.facebook_integration import FacebookIntegration
 from backend.integrations.instagram_integration import InstagramIntegration
+from backend.media.cache import MediaCache, MediaFetchError, check_media_url
+from backend.media.transcode import MediaTranscoder
 
 logger = logging.getLogger(__name__)
 
@@ -14,14 +21,21 @@ class PostHandler:
     Handles posting content to various social media platforms.
     """
     
-    def __init__(self, config):
+    def __init__(self, config, delivery_log=None):
         """
         Initialize post handler with platform integrations.
         
         Args:
             config: Application configuration
+            delivery_log: Optional DeliveryLog; deliveries with an idempotency
+                key already recorded there are not repeated
         """
         self.config = config
+        self.executor = None
+        self.media_cache = None
+        self.transcoder = None
+        self._media_cache_lock = threading.Lock()
+        self.delivery_log = delivery_log
         self.platforms = {
             'twitter': TwitterIntegration(config),
             'facebook': FacebookIntegration(config),
@@ -29,15 +43,19 @@ class PostHandler:
         }
         logger.info("Post handler initialized with platforms: " + ", ".join(self.platforms.keys()))
     
-    def post_to_platform(self, platform, content, media_url=None, user_id=None):
+    def post_to_platform(self, platform, content, media_url=None, user_id=None, idempotency_key=None,
+                         media_path=None):
         """
         Post content to a specific platform.
         
         Args:
             platform: Platform name (twitter, facebook, instagram)
             content: Post content/text
-            media_url: Optional media URL
+            media_url: Optional media URL; user-supplied, so only http(s) URLs are accepted
             user_id: User ID for account-specific credentials
+            idempotency_key: Optional token identifying this delivery; a
+                delivery the delivery log has already seen is not repeated
+            media_path: Local media file from an internal caller; never user input
             
         Returns:
             bool: True if successful, False otherwise
@@ -48,9 +66,36 @@ class PostHandler:
             logger.error(f"Unsupported platform: {platform}")
             return False
         
+        logged = bool(idempotency_key and self.delivery_log)
+        if logged:
+            recorded = self.delivery_log.start(idempotency_key)
+            if recorded == 'delivered':
+                logger.info(f"Skipping duplicate delivery {idempotency_key}")
+                return True
+            if recorded:
+                logger.warning(f"Delivery {idempotency_key} was interrupted earlier; not repeating it")
+                return False
+        
+        result = False
         try:
             integration = self.platforms[platform]
-            result = integration.post(content=content, media_url=media_url, user_id=user_id)
+            kwargs = {'content': content, 'media_url': media_url, 'user_id': user_id}
+            if idempotency_key:
+                kwargs['idempotency_key'] = idempotency_key
+            if media_url:
+                # Rejects file paths and other schemes; hosts are checked when the cache fetches
+                check_media_url(media_url, allow_private_hosts=True)
+            cache = self.get_media_cache() if media_url and not media_path else None
+            if media_path:
+                with self._variant(media_path, platform) as variant_path:
+                    result = integration.post(media_path=variant_path, **kwargs)
+            elif cache:
+                # Hold the cached file for the whole upload so it cannot be evicted
+                with cache.local_path(media_url) as cached_path, \
+                        self._variant(cached_path, platform) as variant_path:
+                    result = integration.post(media_path=variant_path, **kwargs)
+            else:
+                result = integration.post(**kwargs)
             
             if result:
                 logger.info(f"Successfully posted to {platform}")
@@ -59,9 +104,59 @@ class PostHandler:
                 logger.error(f"Failed to post to {platform}")
                 return False
                 
+        except MediaFetchError as e:
+            logger.error(f"Error fetching media for {platform}: {str(e)}")
+            return False
         except Exception as e:
             logger.error(f"Error posting to {platform}: {str(e)}")
             return False
+        finally:
+            if logged:
+                self.delivery_log.finish(idempotency_key, bool(result))
+    
+    def get_media_cache(self):
+        """
+        Get the shared media cache, creating it on first use.
+        
+        Returns:
+            MediaCache: Cache, or None when MEDIA_CACHE_DIR is not configured
+        """
+        if self.media_cache is None and self.config.get('MEDIA_CACHE_DIR'):
+            with self._media_cache_lock:
+                if self.media_cache is None:
+                    self.media_cache = MediaCache(
+                        self.config['MEDIA_CACHE_DIR'],
+                        max_bytes=self.config.get('MEDIA_CACHE_MAX_MB', 1024) * 1024 * 1024,
+                        max_file_bytes=self.config.get('MEDIA_MAX_FILE_MB', 512) * 1024 * 1024,
+                        timeout=self.config.get('MEDIA_FETCH_TIMEOUT', 30),
+                        allow_private_hosts=self.config.get('MEDIA_ALLOW_PRIVATE_HOSTS', False)
+                    )
+        return self.media_cache
+    
+    def get_transcoder(self):
+        """
+        Get the shared per-platform image transcoder, creating it on first use.
+        
+        Returns:
+            MediaTranscoder: Transcoder, or None when the media cache or
+                transcoding (MEDIA_TRANSCODE_WORKERS=0) is disabled
+        """
+        cache = self.get_media_cache()
+        if self.transcoder is None and cache and self.config.get('MEDIA_TRANSCODE_WORKERS', 2):
+            with self._media_cache_lock:
+                if self.transcoder is None:
+                    self.transcoder = MediaTranscoder(cache, self.config.get('MEDIA_TRANSCODE_WORKERS', 2))
+        return self.transcoder
+    
+    @contextmanager
+    def _variant(self, media_path, platform):
+        """Yield the local file to upload: the platform's variant of media_path."""
+        transcoder = self.get_transcoder()
+        if not transcoder:
+            yield media_path
+            return
+        with transcoder.variant(media_path, platform) as variant_path:
+            yield variant_path
     
     def validate_credentials(self, platform, user_id=None):
         """
@@ -85,3 +180,45 @@ class PostHandler:
         except Exception as e:
             logger.error(f"Error validating credentials for {platform}: {str(e)}")
             return False
+    
+    async def post_to_platform_async(self, platform, content, media_url=None, user_id=None,
+                                     idempotency_key=None):
+        """
+        Awaitable version of post_to_platform.
+        
+        The blocking platform call runs on a bounded thread pool sized by
+        PUBLISH_MAX_WORKERS.
+        
+        Returns:
+            bool: True if successful, False otherwise
+        """
+        call = functools.partial(self.post_to_platform, platform, content, media_url=media_url,
+                                 user_id=user_id, idempotency_key=idempotency_key)
+        return await asyncio.get_running_loop().run_in_executor(self._get_executor(), call)
+    
+    async def validate_credentials_async(self, platform, user_id=None):
+        """
+        Awaitable version of validate_credentials.
+        
+        Returns:
+            bool: True if credentials are valid, False otherwise
+        """
+        call = functools.partial(self.validate_credentials, platform, user_id=user_id)
+        return await asyncio.get_running_loop().run_in_executor(self._get_executor(), call)
+    
+    def _get_executor(self):
+        """Get the thread pool used by the awaitable methods."""
+        if self.executor is None:
+            self.executor = ThreadPoolExecutor(
+                max_workers=self.config.get('PUBLISH_MAX_WORKERS', 8),
+                thread_name_prefix='publish'
+            )
+        return self.executor
+    
+    def shutdown(self):
+        """Shut down the publishing thread pool and the transcoding processes."""
+        if self.executor:
+            self.executor.shutdown(wait=False)
+            self.executor = None
+        if self.transcoder:
+            self.transcoder.shutdown()
@@ -0,0 +1,168 @@
+"""
+Recurrence rules for repeating posts.
+
+A rule is either an iCalendar RRULE (e.g. "FREQ=WEEKLY;BYDAY=MO;BYHOUR=9")
+parsed with python-dateutil, or a five-field cron expression (e.g.
+"0 9 * * 1") evaluated with APScheduler's CronTrigger. All times are naive
+UTC datetimes, like the rest of the models.
+"""
+import re
+from datetime import timedelta, timezone
+
+from apscheduler.triggers.cron import CronTrigger
+from dateutil.rrule import rrulestr
+
+CRON_WEEKDAYS = ['sun', 'mon', 'tue', 'wed', 'thu', 'fri', 'sat', 'sun']
+
+
+class Recurrence:
+    """
+    Occurrence calculator for a stored rule.
+    """
+
+    def __init__(self, rule, starts_at, ends_at=None):
+        """
+        Parse a rule.
+
+        Args:
+            rule: RRULE string or five-field cron expression
+            starts_at: First moment an occurrence may fall on
+            ends_at: Optional last moment an occurrence may fall on
+
+        Raises:
+            ValueError: If the rule cannot be parsed
+        """
+        self.rule = rule.strip()
+        self.starts_at = starts_at.replace(microsecond=0)
+        self.ends_at = ends_at
+        if is_cron(self.rule):
+            self._cron = CronTrigger.from_crontab(cron_to_apscheduler(self.rule), timezone=timezone.utc)
+            self._rrule = None
+        else:
+            self._cron = None
+            try:
+                self._rrule = rrulestr(self.rule, dtstart=self.starts_at, ignoretz=True)
+            except (TypeError, ValueError) as e:
+                raise ValueError(f"Invalid recurrence rule: {str(e)}")
+
+    def next_after(self, when, inclusive=False):
+        """
+        Get the first occurrence after a moment.
+
+        Args:
+            when: Reference datetime
+            inclusive: Also accept an occurrence exactly at when
+
+        Returns:
+            datetime or None: Next occurrence, or None if the rule has ended
+        """
+        if when < self.starts_at:
+            when, inclusive = self.starts_at, True
+        if self._cron:
+            start = when if inclusive else when + timedelta(seconds=1)
+            fire = self._cron.get_next_fire_time(None, start.replace(tzinfo=timezone.utc))
+            occurrence = fire.astimezone(timezone.utc).replace(tzinfo=None) if fire else None
+        else:
+            occurrence = self._rrule.after(when, inc=inclusive)
+        if occurrence is None or (self.ends_at and occurrence > self.ends_at):
+            return None
+        return occurrence
+
+    def between(self, start, end, limit=None):
+        """
+        Get occurrences in [start, end].
+
+        Args:
+            start: Earliest occurrence
+            end: Latest occurrence
+            limit: Maximum number of occurrences to return
+
+        Returns:
+            list: Occurrences in ascending order
+        """
+        occurrences = []
+        occurrence = self.next_after(start, inclusive=True)
+        while occurrence is not None and occurrence <= end:
+            occurrences.append(occurrence)
+            if limit and len(occurrences) >= limit:
+                break
+            occurrence = self.next_after(occurrence)
+        return occurrences
+
+
+def is_cron(rule):
+    """Check whether a rule looks like a five-field cron expression."""
+    return len(rule.split()) == 5 and 'FREQ=' not in rule.upper()
+
+
+def cron_to_apscheduler(rule):
+    """
+    Translate numeric cron weekdays (0 or 7 = Sunday) to names.
+
+    APScheduler numbers weekdays from Monday, unlike cron, so numeric items of
+    the day-of-week field are expanded to day names to keep "0 9 * * 1"
+    meaning Monday. Ranges and steps are expanded too ("*/2" is Sunday,
+    Tuesday, Thursday and Saturday, as in cron); named items pass through.
+    """
+    fields = rule.split()
+    fields[4] = ','.join(_cron_weekday_names(item) for item in fields[4].split(','))
+    return ' '.join(fields)
+
+
+def _cron_weekday_names(item):
+    """Expand one numeric day-of-week item to comma-separated day names."""
+    match = re.fullmatch(r'(\*|(\d+)(?:-(\d+))?)(?:/(\d+))?', item)
+    if not match or item == '*':
+        return item
+    _, first, last, step = match.groups()
+    if first is None:
+        first, last = 0, 6
+    else:
+        first = int(first)
+        last = int(last) if last is not None else (7 if step else first)
+    if last > 7 or first > last:
+        return item  # Out of range; let APScheduler reject it
+    days = range(first, last + 1, int(step) if step else 1)
+    return ','.join(dict.fromkeys(CRON_WEEKDAYS[day] for day in days))
+
+
+def validate_rule(rule, starts_at, ends_at=None):
+    """
+    Validate a rule and get its first occurrence.
+
+    Args:
+        rule: RRULE string or cron expression
+        starts_at: First moment an occurrence may fall on
+        ends_at: Optional last moment
+
+    Returns:
+        tuple: (is_valid, first occurrence or error message)
+    """
+    try:
+        first = Recurrence(rule, starts_at, ends_at).next_after(starts_at, inclusive=True)
+    except ValueError as e:
+        return False, str(e)
+    if first is None:
+        return False, "Recurrence rule has no occurrences"
+    return True, first
+
+
+def materialize(recurrence, next_run_at, horizon_end, limit):
+    """
+    Expand a rule's occurrences up to the horizon.
+
+    Args:
+        recurrence: Recurrence for the rule
+        next_run_at: First occurrence not yet materialized
+        horizon_end: Latest occurrence to materialize now
+        limit: Maximum occurrences per call
+
+    Returns:
+        tuple: (occurrences, new next_run_at or None when the rule has ended)
+    """
+    occurrences = recurrence.between(next_run_at, horizon_end, limit)
+    if occurrences:
+        following = recurrence.next_after(occurrences[-1])
+    else:
+        following = recurrence.next_after(next_run_at, inclusive=True)
+    return occurrences, following
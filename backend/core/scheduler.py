@@ -1,11 +1,41 @@
 """
 Scheduler module for automating social media posts.
 Uses APScheduler for scheduling posts at optimal times.
+
+The scheduler runs in one of three roles:
+    embedded - the web process schedules and publishes posts (single process)
+    api      - the web process only stores posts; a publisher worker sends them
+    worker   - a publisher process that polls the database for due posts
+
+Any number of schedulers may share a database. A post is published only by
+the scheduler holding its lease (claimed_by / lease_expires_at); leases are
+renewed while work is in flight and reclaimed by others once they expire.
+
+Claimed posts are dispatched to a fixed pool of publisher threads through a
+weighted fair queue keyed by user, with weights taken from the user's
+subscription plan, so one tenant's burst cannot starve everyone else.
+
+Recurring schedules are stored as one rule each and materialized into
+concrete pending posts only recurrence_horizon seconds ahead.
+
+Media of posts due within prefetch_horizon seconds is downloaded ahead of
+time by the media prefetcher, so publishing only uploads a local file.
 """
-from datetime import datetime
+from contextlib import nullcontext
+from datetime import datetime, timedelta
 from apscheduler.schedulers.background import BackgroundScheduler
 from apscheduler.triggers.date import DateTrigger
+from sqlalchemy import Float, and_, case, cast, func, literal, or_, select, update
+from backend.core.fair_queue import FairQueue
+from backend.core.metrics import MetricsRegistry
+from backend.core.recurrence import Recurrence, materialize
+import heapq
 import logging
+import os
+import socket
+import threading
+import time
+import uuid
 
 logger = logging.getLogger(__name__)
 
@@ -15,19 +45,210 @@ class PostScheduler:
     Handles scheduling and execution of social media posts.
     """
     
-    def __init__(self, db, post_handler):
+    def __init__(self, db, post_handler, event_hub=None, app=None, role='embedded',
+                 poll_interval=30, batch_size=100, lease_seconds=300, worker_id=None,
+                 plan_weights=None, dispatch_workers=10, recurrence_horizon=3600,
+                 recurrence_interval=60, media_prefetcher=None, prefetch_horizon=1800,
+                 prefetch_interval=60, tenant_metrics_limit=20):
         """
         Initialize the scheduler.
         
         Args:
             db: Database instance
             post_handler: Handler for posting to social media platforms
+            event_hub: Optional EventHub notified of post status changes
+            app: Flask application whose context jobs run in
+            role: 'embedded', 'api' or 'worker'
+            poll_interval: Seconds between polls for due posts
+            batch_size: Maximum due posts dispatched per poll
+            lease_seconds: How long a claim is valid without renewal
+            worker_id: Unique name recorded in claimed_by (generated if omitted)
+            plan_weights: Fair-share weight per subscription plan
+            dispatch_workers: Number of publisher threads
+            recurrence_horizon: Seconds ahead recurring posts are materialized
+            recurrence_interval: Seconds between materialization passes
+            media_prefetcher: Optional MediaPrefetcher for media of upcoming posts
+            prefetch_horizon: Seconds ahead of due time media is prefetched
+            prefetch_interval: Seconds between prefetch passes
+            tenant_metrics_limit: Users with the worst lag exported by the per-user gauges
         """
         self.db = db
         self.post_handler = post_handler
+        self.event_hub = event_hub
+        self.app = app
+        self.role = role
+        self.batch_size = batch_size
+        self.lease_seconds = lease_seconds
+        self.recurrence_horizon = recurrence_horizon
+        self.media_prefetcher = media_prefetcher
+        self.prefetch_horizon = prefetch_horizon
+        self.worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self._in_flight = set()
+        self._in_flight_lock = threading.Lock()
+        self.plan_weights = plan_weights or {}
+        self.queue = FairQueue()
+        self.tenant_lag = {}
+        self._tenant_lag_lock = threading.Lock()
+        self.tenant_metrics_limit = tenant_metrics_limit
+        self._workers = []
+        self._init_metrics()
         self.scheduler = BackgroundScheduler()
-        self.scheduler.start()
-        logger.info("Post scheduler initialized")
+        
+        if role != 'api':
+            # Polling picks up posts created by API processes and any jobs
+            # lost when a previous process stopped
+            self.scheduler.add_job(
+                func=self.dispatch_due_posts,
+                trigger='interval',
+                seconds=poll_interval,
+                id='dispatch_due_posts',
+                max_instances=1,
+                coalesce=True,
+                next_run_time=datetime.now()
+            )
+            self.scheduler.add_job(
+                func=self.renew_leases,
+                trigger='interval',
+                seconds=max(1, lease_seconds // 3),
+                id='renew_leases',
+                max_instances=1,
+                coalesce=True
+            )
+            self.scheduler.add_job(
+                func=self.materialize_recurring,
+                trigger='interval',
+                seconds=recurrence_interval,
+                id='materialize_recurring',
+                max_instances=1,
+                coalesce=True,
+                next_run_time=datetime.now()
+            )
+            if media_prefetcher:
+                self.scheduler.add_job(
+                    func=self.prefetch_media,
+                    trigger='interval',
+                    seconds=prefetch_interval,
+                    id='prefetch_media',
+                    max_instances=1,
+                    coalesce=True,
+                    next_run_time=datetime.now()
+                )
+            self.scheduler.add_job(
+                func=self.purge_idempotency_keys,
+                trigger='interval',
+                hours=1,
+                id='purge_idempotency_keys',
+                max_instances=1,
+                coalesce=True
+            )
+            self.scheduler.start()
+            for index in range(dispatch_workers):
+                worker = threading.Thread(target=self._dispatch_worker, name=f'publisher-{index}', daemon=True)
+                worker.start()
+                self._workers.append(worker)
+        logger.info(f"Post scheduler initialized in {role} role")
+    
+    def _init_metrics(self):
+        """Create the delivery timing metrics exposed at /api/metrics."""
+        self.metrics = MetricsRegistry()
+        self.claim_lag = self.metrics.histogram(
+            'scheduler_claim_lag_seconds', 'Time from a post being due to being claimed')
+        self.queue_wait = self.metrics.histogram(
+            'scheduler_queue_wait_seconds', 'Time from claim to publish start')
+        self.publish_lag = self.metrics.histogram(
+            'scheduler_publish_lag_seconds', 'Time from a post being due to publish start')
+        self.platform_latency = self.metrics.histogram(
+            'scheduler_platform_latency_seconds', 'Platform API call duration', ['platform'])
+        self.delivery_lag = self.metrics.histogram(
+            'scheduler_delivery_lag_seconds', 'Time from a post being due to platform ack', ['platform'])
+        self.deliveries = self.metrics.counter(
+            'scheduler_deliveries', 'Platform deliveries by result', ['platform', 'result'])
+        self.completed = self.metrics.counter(
+            'scheduler_posts_completed', 'Posts finished by final status', ['status'])
+        self.media_prefetch = self.metrics.counter(
+            'scheduler_media_prefetch', 'Posts whose media was already cached at publish time', ['result'])
+        self.metrics.gauge('scheduler_media_prefetch_pending', 'Media downloads queued or running',
+                           lambda: self.media_prefetcher.pending() if self.media_prefetcher else 0)
+        self.metrics.gauge('scheduler_queue_depth', 'Claimed posts waiting for a publisher thread',
+                           lambda: len(self.queue))
+        self.metrics.gauge('scheduler_in_flight', 'Posts claimed by this scheduler and not finished',
+                           lambda: len(self._in_flight))
+        # Per-user series only for the worst tenants, so label cardinality stays bounded
+        self.metrics.gauge('scheduler_tenants', 'Users with recorded publish lag',
+                           lambda: len(self.tenant_lag))
+        self.metrics.gauge('scheduler_tenant_lag_max_seconds', 'Worst publish lag per user, worst users only',
+                           lambda: {(user_id,): lag['max_seconds'] for user_id, lag in self.get_worst_tenants()},
+                           ['user_id'])
+        self.metrics.gauge('scheduler_tenant_lag_avg_seconds', 'Mean publish lag per user, worst users only',
+                           lambda: {(user_id,): lag['avg_seconds'] for user_id, lag in self.get_worst_tenants()},
+                           ['user_id'])
+        self.metrics.gauge('scheduler_tenant_queue_depth', 'Queued posts per user, worst users only',
+                           lambda: {(user_id,): lag['queued'] for user_id, lag in self.get_worst_tenants()},
+                           ['user_id'])
+        # Read from the database at scrape time, so any process (API ones
+        # included) reports the backlog shared by every worker
+        self.backlog_metrics = MetricsRegistry()
+        self.backlog_metrics.gauge('scheduler_backlog_posts', 'Due posts not yet published, across all workers',
+                                   lambda: {(state,): count for state, count in self.get_backlog().items()},
+                                   ['state'])
+        self.backlog_metrics.gauge('scheduler_backlog_oldest_seconds',
+                                   'How overdue the oldest unclaimed due post is, across all workers',
+                                   self.get_oldest_due_seconds)
+    
+    def render_metrics(self):
+        """
+        Render the metrics this process can answer for.
+        
+        API processes publish nothing, so their delivery timings, local queue
+        depth and per-user lag would always be empty; they only export the
+        database backlog. Workers and embedded schedulers export both.
+        
+        Returns:
+            str: Prometheus exposition text
+        """
+        if self.role == 'api':
+            return self.backlog_metrics.render()
+        return self.metrics.render() + self.backlog_metrics.render()
+    
+    def get_backlog(self):
+        """
+        Count due posts across all workers from the database.
+        
+        Returns:
+            dict: {'due': claimable posts, 'claimed': posts under a live lease}
+        """
+        from backend.models.database import ScheduledPost
+        
+        now = datetime.utcnow()
+        claimable = or_(
+            and_(ScheduledPost.status == 'pending', effective_time() <= now),
+            self._lease_expired(now)
+        )
+        leased = and_(ScheduledPost.status == 'processing', ScheduledPost.lease_expires_at >= now)
+        with self._app_context():
+            due, claimed = self.db.session.execute(
+                select(func.count(case((claimable, 1))), func.count(case((leased, 1))))
+                .select_from(ScheduledPost)
+                .where(ScheduledPost.status.in_(('pending', 'processing')))
+            ).one()
+        return {'due': due, 'claimed': claimed}
+    
+    def get_oldest_due_seconds(self):
+        """
+        Get how long the oldest unclaimed due post has been waiting.
+        
+        Returns:
+            float: Seconds since it was due, or 0 when nothing is waiting
+        """
+        from backend.models.database import ScheduledPost
+        
+        now = datetime.utcnow()
+        with self._app_context():
+            oldest = self.db.session.execute(
+                select(func.min(effective_time()))
+                .where(ScheduledPost.status == 'pending', effective_time() <= now)
+            ).scalar()
+        return max(0.0, (now - oldest).total_seconds()) if oldest else 0.0
     
     def schedule_post(self, post_id, scheduled_time):
         """
@@ -37,10 +258,15 @@ class PostScheduler:
             post_id: ID of the scheduled post
             scheduled_time: datetime when the post should be published
         """
+        if self.role == 'api':
+            # The stored pending row is the queue entry; a worker publishes it
+            logger.info(f"Queued post {post_id} for {scheduled_time}")
+            return True
+        
         try:
             # Add job to scheduler
             job = self.scheduler.add_job(
-                func=self._execute_post,
+                func=self.dispatch_post,
                 trigger=DateTrigger(run_date=scheduled_time),
                 args=[post_id],
                 id=f'post_{post_id}',
@@ -59,6 +285,9 @@ class PostScheduler:
         Args:
             post_id: ID of the post to cancel
         """
+        if self.role == 'api':
+            return True
+        
         try:
             self.scheduler.remove_job(f'post_{post_id}')
             logger.info(f"Cancelled scheduled post {post_id}")
@@ -67,56 +296,557 @@ class PostScheduler:
             logger.error(f"Error cancelling post {post_id}: {str(e)}")
             return False
     
-    def _execute_post(self, post_id):
+    def dispatch_due_posts(self):
+        """
+        Claim due posts and queue them for the publisher threads.
+        
+        Claims only as many posts as the local queue has room for, leaving the
+        rest for other workers.
+        
+        Returns:
+            int: Number of posts dispatched
+        """
+        capacity = self.batch_size - len(self.queue)
+        if capacity <= 0:
+            return 0
+        
+        try:
+            with self._app_context():
+                post_ids = self.claim_due_posts(capacity)
+                self._enqueue_claimed(post_ids)
+            if post_ids:
+                logger.info(f"Dispatched {len(post_ids)} due posts")
+            return len(post_ids)
+        except Exception as e:
+            logger.error(f"Error dispatching due posts: {str(e)}")
+            return 0
+    
+    def dispatch_post(self, post_id):
+        """
+        Claim a single post whose scheduled time has arrived and queue it.
+        
+        Args:
+            post_id: ID of the post
+        """
+        try:
+            with self._app_context():
+                if self.claim_post(post_id):
+                    self._enqueue_claimed([post_id])
+                else:
+                    logger.info(f"Post {post_id} already claimed or no longer pending")
+        except Exception as e:
+            logger.error(f"Error dispatching post {post_id}: {str(e)}")
+    
+    def _enqueue_claimed(self, post_ids):
+        """Push claimed posts onto the fair queue, weighted by plan."""
+        from backend.models.database import ScheduledPost, User
+        
+        if not post_ids:
+            return
+        due_time = effective_time()
+        rows = self.db.session.execute(
+            select(ScheduledPost.id, ScheduledPost.user_id, due_time, User.subscription_plan)
+            .outerjoin(User, User.id == ScheduledPost.user_id)
+            .where(ScheduledPost.id.in_(post_ids))
+            .order_by(due_time)
+        ).all()
+        now = datetime.utcnow()
+        claimed_at = time.monotonic()
+        for post_id, user_id, scheduled_time, plan in rows:
+            self.claim_lag.observe(max(0.0, (now - scheduled_time).total_seconds()))
+            self.queue.push(user_id, (post_id, scheduled_time, claimed_at), self.plan_weights.get(plan, 1))
+    
+    def _dispatch_worker(self):
+        """Publisher thread: execute queued posts in fair order until shutdown."""
+        while True:
+            entry = self.queue.pop()
+            if entry is None:
+                return
+            user_id, (post_id, scheduled_time, claimed_at) = entry
+            self.queue_wait.observe(time.monotonic() - claimed_at)
+            self._record_lag(user_id, scheduled_time)
+            self._execute_post(post_id, claimed=True)
+    
+    def _record_lag(self, user_id, scheduled_time):
+        """Record how late a tenant's post started publishing."""
+        lag = max(0.0, (datetime.utcnow() - scheduled_time).total_seconds())
+        self.publish_lag.observe(lag)
+        with self._tenant_lag_lock:
+            stats = self.tenant_lag.setdefault(user_id, {'count': 0, 'total': 0.0, 'max': 0.0, 'last': 0.0})
+            stats['count'] += 1
+            stats['total'] += lag
+            stats['max'] = max(stats['max'], lag)
+            stats['last'] = lag
+    
+    def get_tenant_lag(self):
+        """
+        Get publish lag statistics per user.
+        
+        Returns:
+            dict: user_id -> {'count', 'avg_seconds', 'max_seconds', 'last_seconds', 'queued'}
+        """
+        with self._tenant_lag_lock:
+            snapshot = {user_id: dict(stats) for user_id, stats in self.tenant_lag.items()}
+        return {user_id: {
+            'count': stats['count'],
+            'avg_seconds': stats['total'] / stats['count'],
+            'max_seconds': stats['max'],
+            'last_seconds': stats['last'],
+            'queued': self.queue.depth(user_id)
+        } for user_id, stats in snapshot.items()}
+    
+    def get_worst_tenants(self):
+        """
+        Get the users with the worst publish lag, up to tenant_metrics_limit.
+        
+        Returns:
+            list: (user_id, stats) pairs as in get_tenant_lag(), worst first
+        """
+        lags = self.get_tenant_lag()
+        return heapq.nlargest(self.tenant_metrics_limit, lags.items(), key=lambda item: item[1]['max_seconds'])
+    
+    def claim_due_posts(self, limit):
+        """
+        Atomically lease up to limit due posts to this scheduler.
+        
+        Due pending posts and posts whose lease has expired are claimable.
+        Each user's due posts are ranked and the batch is filled in order of
+        rank divided by plan weight. On PostgreSQL candidate rows are locked
+        with SKIP LOCKED so concurrent workers claim disjoint batches; SQLite
+        serializes writers, which makes the single UPDATE equally exclusive.
+        
+        Args:
+            limit: Maximum number of posts to claim
+            
+        Returns:
+            list: IDs of the claimed posts
+        """
+        from backend.models.database import ScheduledPost, User
+        
+        now = datetime.utcnow()
+        due_time = effective_time()
+        claimable = or_(
+            and_(ScheduledPost.status == 'pending', due_time <= now),
+            self._lease_expired(now)
+        )
+        
+        # Interleave users: rank each user's due posts and order by
+        # rank / plan weight, so a burst from one user cannot fill the batch
+        weight = (case(self.plan_weights, value=User.subscription_plan, else_=1)
+                  if self.plan_weights else literal(1))
+        rank = func.row_number().over(partition_by=ScheduledPost.user_id, order_by=due_time)
+        ranked = (
+            select(ScheduledPost.id.label('id'),
+                   (cast(rank, Float) / weight).label('share'),
+                   due_time.label('scheduled_time'))
+            .outerjoin(User, User.id == ScheduledPost.user_id)
+            .where(claimable)
+            .subquery()
+        )
+        fair_ids = select(ranked.c.id).order_by(ranked.c.share, ranked.c.scheduled_time).limit(limit)
+        candidates = (
+            select(ScheduledPost.id)
+            .where(ScheduledPost.id.in_(fair_ids), claimable)
+            .with_for_update(skip_locked=True)
+        )
+        post_ids = self.db.session.execute(
+            update(ScheduledPost)
+            .where(ScheduledPost.id.in_(candidates.scalar_subquery()))
+            .values(**self._lease_values(now))
+            .returning(ScheduledPost.id)
+            .execution_options(synchronize_session=False)
+        ).scalars().all()
+        self.db.session.commit()
+        
+        with self._in_flight_lock:
+            self._in_flight.update(post_ids)
+        return post_ids
+    
+    def claim_post(self, post_id):
+        """
+        Atomically lease a single pending (or expired) post to this scheduler.
+        
+        Only one scheduler can win the claim, so a post is never published
+        twice by concurrent schedulers.
+        
+        Args:
+            post_id: ID of the post to claim
+            
+        Returns:
+            bool: True if this scheduler claimed the post
+        """
+        from backend.models.database import ScheduledPost
+        
+        now = datetime.utcnow()
+        result = self.db.session.execute(
+            update(ScheduledPost)
+            .where(ScheduledPost.id == post_id,
+                   or_(ScheduledPost.status == 'pending', self._lease_expired(now)))
+            .values(**self._lease_values(now))
+            .execution_options(synchronize_session=False)
+        )
+        self.db.session.commit()
+        
+        if result.rowcount != 1:
+            return False
+        with self._in_flight_lock:
+            self._in_flight.add(post_id)
+        return True
+    
+    def renew_leases(self):
+        """
+        Extend the leases of posts this scheduler has claimed but not finished.
+        
+        Returns:
+            int: Number of leases renewed
+        """
+        from backend.models.database import ScheduledPost
+        
+        with self._in_flight_lock:
+            post_ids = list(self._in_flight)
+        if not post_ids:
+            return 0
+        
+        try:
+            with self._app_context():
+                result = self.db.session.execute(
+                    update(ScheduledPost)
+                    .where(ScheduledPost.id.in_(post_ids),
+                           ScheduledPost.claimed_by == self.worker_id,
+                           ScheduledPost.status == 'processing')
+                    .values(lease_expires_at=datetime.utcnow() + timedelta(seconds=self.lease_seconds))
+                    .execution_options(synchronize_session=False)
+                )
+                self.db.session.commit()
+                return result.rowcount
+        except Exception as e:
+            logger.error(f"Error renewing leases: {str(e)}")
+            return 0
+    
+    def _lease_values(self, now):
+        """Column values that lease a post to this scheduler."""
+        return {
+            'status': 'processing',
+            'claimed_by': self.worker_id,
+            'lease_expires_at': now + timedelta(seconds=self.lease_seconds)
+        }
+    
+    @staticmethod
+    def _lease_expired(now):
+        """Condition matching posts whose holder stopped renewing its lease."""
+        from backend.models.database import ScheduledPost
+        
+        return and_(ScheduledPost.status == 'processing', ScheduledPost.lease_expires_at < now)
+    
+    def _complete_post(self, post_id, status):
+        """
+        Record a final status if this scheduler still holds the post's lease.
+        
+        Args:
+            post_id: ID of the post
+            status: Final status ('posted' or 'failed')
+            
+        Returns:
+            bool: True if the status was recorded
+        """
+        from backend.models.database import ScheduledPost
+        
+        result = self.db.session.execute(
+            update(ScheduledPost)
+            .where(ScheduledPost.id == post_id, ScheduledPost.claimed_by == self.worker_id)
+            .values(status=status, posted_at=datetime.utcnow(), claimed_by=None, lease_expires_at=None)
+            .execution_options(synchronize_session=False)
+        )
+        self.db.session.commit()
+        
+        if result.rowcount != 1:
+            logger.warning(f"Lease on post {post_id} was lost before it completed")
+            return False
+        return True
+    
+    def _hold_lease(self, post_id):
+        """
+        Renew a post's lease if this scheduler still holds it unexpired.
+        
+        Called before every platform call, so a scheduler that lost the lease
+        (after a long pause or a slow platform call) stops publishing before
+        the new holder repeats the same platforms.
+        
+        Args:
+            post_id: ID of the post
+            
+        Returns:
+            bool: True if the lease is still held
+        """
+        from backend.models.database import ScheduledPost
+        
+        now = datetime.utcnow()
+        result = self.db.session.execute(
+            update(ScheduledPost)
+            .where(ScheduledPost.id == post_id,
+                   ScheduledPost.claimed_by == self.worker_id,
+                   ScheduledPost.status == 'processing',
+                   ScheduledPost.lease_expires_at > now)
+            .values(lease_expires_at=now + timedelta(seconds=self.lease_seconds))
+            .execution_options(synchronize_session=False)
+        )
+        self.db.session.commit()
+        return result.rowcount == 1
+    
+    def _record_delivery(self, post_id, delivered):
+        """
+        Persist the platforms a post has been published to so far.
+        
+        Committed after every platform so a restarted delivery skips them.
+        
+        Args:
+            post_id: ID of the post
+            delivered: List of platforms already published
+            
+        Returns:
+            int: Rows updated; 0 if this scheduler no longer holds the lease
+        """
+        from backend.models.database import ScheduledPost
+        
+        result = self.db.session.execute(
+            update(ScheduledPost)
+            .where(ScheduledPost.id == post_id, ScheduledPost.claimed_by == self.worker_id)
+            .values(delivered_platforms=','.join(delivered))
+            .execution_options(synchronize_session=False)
+        )
+        self.db.session.commit()
+        return result.rowcount
+    
+    def purge_idempotency_keys(self):
+        """Delete expired Idempotency-Key responses."""
+        from backend.utils.idempotency import purge_expired_keys
+        
+        try:
+            with self._app_context():
+                ttl_hours = self.app.config.get('IDEMPOTENCY_TTL_HOURS', 24) if self.app else 24
+                deleted = purge_expired_keys(ttl_hours)
+                if deleted:
+                    logger.info(f"Purged {deleted} expired idempotency keys")
+        except Exception as e:
+            logger.error(f"Error purging idempotency keys: {str(e)}")
+    
+    def materialize_recurring(self, schedule_ids=None):
+        """
+        Create pending posts for recurring schedules due within the horizon.
+        
+        Args:
+            schedule_ids: Limit the pass to these recurring schedules
+        
+        Returns:
+            int: Number of posts created
+        """
+        from backend.models.database import RecurringSchedule, ScheduledPost
+        
+        created = []
+        with self._app_context():
+            try:
+                now = datetime.utcnow()
+                horizon_end = now + timedelta(seconds=self.recurrence_horizon)
+                query = RecurringSchedule.query.filter(
+                    RecurringSchedule.is_active.is_(True),
+                    RecurringSchedule.next_run_at.isnot(None),
+                    RecurringSchedule.next_run_at <= horizon_end
+                )
+                if schedule_ids is not None:
+                    query = query.filter(RecurringSchedule.id.in_(schedule_ids))
+                
+                for schedule in query.limit(self.batch_size).all():
+                    recurrence = Recurrence(schedule.rule, schedule.starts_at, schedule.ends_at)
+                    # Occurrences missed while no scheduler ran are skipped rather than sent late
+                    occurrences, following = materialize(
+                        recurrence, max(schedule.next_run_at, now), horizon_end, self.batch_size
+                    )
+                    # Compare-and-set on next_run_at so concurrent schedulers
+                    # materialize each occurrence once
+                    result = self.db.session.execute(
+                        update(RecurringSchedule)
+                        .where(RecurringSchedule.id == schedule.id,
+                               RecurringSchedule.next_run_at == schedule.next_run_at)
+                        .values(next_run_at=following)
+                        .execution_options(synchronize_session=False)
+                    )
+                    if result.rowcount != 1:
+                        self.db.session.rollback()
+                        continue
+                    posts = [ScheduledPost(
+                        user_id=schedule.user_id,
+                        content=schedule.content,
+                        platforms=schedule.platforms,
+                        media_url=schedule.media_url,
+                        scheduled_time=occurrence,
+                        recurrence_id=schedule.id
+                    ) for occurrence in occurrences]
+                    self.db.session.add_all(posts)
+                    self.db.session.commit()
+                    created.extend((post.id, post.scheduled_time) for post in posts)
+            except Exception as e:
+                logger.error(f"Error materializing recurring schedules: {str(e)}")
+                self.db.session.rollback()
+        
+        for post_id, scheduled_time in created:
+            self.schedule_post(post_id, scheduled_time)
+        if created:
+            logger.info(f"Materialized {len(created)} recurring posts")
+        return len(created)
+    
+    def prefetch_media(self):
+        """
+        Queue media downloads for pending posts due within the prefetch horizon.
+        
+        Returns:
+            int: Number of downloads queued
+        """
+        from backend.models.database import ScheduledPost
+        
+        if not self.media_prefetcher:
+            return 0
+        with self._app_context():
+            try:
+                horizon_end = datetime.utcnow() + timedelta(seconds=self.prefetch_horizon)
+                rows = self.db.session.execute(
+                    select(ScheduledPost.media_url, ScheduledPost.platforms)
+                    .where(ScheduledPost.status == 'pending',
+                           ScheduledPost.media_url.isnot(None),
+                           effective_time() <= horizon_end)
+                    .order_by(effective_time())
+                    .limit(self.batch_size)
+                ).all()
+                self.db.session.commit()
+            except Exception as e:
+                logger.error(f"Error finding media to prefetch: {str(e)}")
+                self.db.session.rollback()
+                return 0
+        # Soonest first; one download per URL covering every platform it goes to
+        urls = {}
+        for media_url, platforms in rows:
+            urls.setdefault(media_url, set()).update(p.strip() for p in (platforms or '').split(',') if p.strip())
+        queued = sum(1 for url, platforms in urls.items() if self.media_prefetcher.prefetch(url, sorted(platforms)))
+        if queued:
+            logger.info(f"Prefetching media for {queued} upcoming posts")
+        return queued
+    
+    def _app_context(self):
+        """Get an application context for jobs running outside a request."""
+        return self.app.app_context() if self.app else nullcontext()
+    
+    def _execute_post(self, post_id, claimed=False):
         """
         Execute a scheduled post by publishing to social media platforms.
         
         Args:
             post_id: ID of the post to execute
+            claimed: True if this scheduler already holds the post's lease
+        """
+        with self._app_context():
+            try:
+                self._publish_post(post_id, claimed)
+            finally:
+                with self._in_flight_lock:
+                    self._in_flight.discard(post_id)
+    
+    def _publish_post(self, post_id, claimed=False):
+        """
+        Claim and publish a post.
+        
+        Args:
+            post_id: ID of the post to publish
+            claimed: True if this scheduler already holds the post's lease
         """
         from backend.models.database import ScheduledPost
         
         try:
+            if not claimed and not self.claim_post(post_id):
+                logger.info(f"Post {post_id} already claimed or no longer pending")
+                return
+            
             post = self.db.session.query(ScheduledPost).get(post_id)
             if not post:
                 logger.error(f"Post {post_id} not found")
                 return
             
+            self._publish_status(post, 'publishing')
+            
             platforms = post.platforms.split(',') if post.platforms else []
+            delivered = post.delivered_platforms.split(',') if post.delivered_platforms else []
+            due_time = post.planned_time or post.scheduled_time
             success = True
+            if post.media_url and self.media_prefetcher:
+                self.media_prefetch.inc('hit' if self.media_prefetcher.is_cached(post.media_url) else 'miss')
             
             for platform in platforms:
                 platform = platform.strip()
+                if platform in delivered:
+                    # Published before a crash or lease loss; do not repeat it
+                    continue
+                if not self._hold_lease(post_id):
+                    logger.warning(f"Lease on post {post_id} was lost; stopping before {platform}")
+                    return
+                started = time.perf_counter()
                 result = self.post_handler.post_to_platform(
                     platform=platform,
                     content=post.content,
                     media_url=post.media_url,
-                    user_id=post.user_id
+                    user_id=post.user_id,
+                    idempotency_key=delivery_key(post_id, platform)
                 )
-                if not result:
+                self.platform_latency.observe(time.perf_counter() - started, platform)
+                self.deliveries.inc(platform, 'success' if result else 'failure')
+                if result:
+                    self.delivery_lag.observe(max(0.0, (datetime.utcnow() - due_time).total_seconds()), platform)
+                    delivered.append(platform)
+                    if not self._record_delivery(post_id, delivered):
+                        logger.warning(f"Lease on post {post_id} was lost after publishing to {platform}")
+                        return
+                else:
                     success = False
                     logger.error(f"Failed to post to {platform} for post {post_id}")
             
             # Update post status
-            post.status = 'posted' if success else 'failed'
-            post.posted_at = datetime.utcnow()
-            self.db.session.commit()
+            status = 'posted' if success else 'failed'
+            if self._complete_post(post_id, status):
+                self.completed.inc(status)
+                self.db.session.refresh(post)
+                self._publish_status(post, status)
             
-            logger.info(f"Executed post {post_id} with status: {post.status}")
+            logger.info(f"Executed post {post_id} with status: {status}")
             
         except Exception as e:
             logger.error(f"Error executing post {post_id}: {str(e)}")
             # Update post status to failed
             try:
-                post = self.db.session.query(ScheduledPost).get(post_id)
-                if post:
-                    post.status = 'failed'
-                    self.db.session.commit()
+                self.db.session.rollback()
+                if self._complete_post(post_id, 'failed'):
+                    self.completed.inc('failed')
+                    post = self.db.session.query(ScheduledPost).get(post_id)
+                    self._publish_status(post, 'failed')
             except:
                 pass
     
+    def _publish_status(self, post, status):
+        """
+        Notify subscribers of a post status change.
+        
+        Args:
+            post: ScheduledPost instance
+            status: New delivery status
+        """
+        if not self.event_hub:
+            return
+        self.event_hub.publish(post.user_id, 'post.status', {
+            'post_id': post.id,
+            'status': status,
+            'posted_at': post.posted_at.isoformat() if post.posted_at else None
+        })
+    
     def get_scheduled_jobs(self):
         """Get all scheduled jobs."""
+        if not self.scheduler.running:
+            return []
         jobs = self.scheduler.get_jobs()
         return [{
             'job_id': job.id,
@@ -125,5 +855,27 @@ class PostScheduler:
     
     def shutdown(self):
         """Shutdown the scheduler."""
-        self.scheduler.shutdown()
+        if self.scheduler.running:
+            self.scheduler.shutdown()
+        self.queue.close()
+        if self.media_prefetcher:
+            self.media_prefetcher.shutdown()
+        for worker in self._workers:
+            worker.join(timeout=5)
         logger.info("Scheduler shut down")
+
+
+def delivery_key(post_id, platform):
+    """
+    Build the idempotency key for delivering a post to one platform.
+    
+    The key is deterministic so every retry of the same delivery carries it.
+    """
+    return f"post-{post_id}-{platform}"
+
+
+def effective_time():
+    """SQL expression for when a post is due: its planned time if smoothed."""
+    from backend.models.database import ScheduledPost
+    
+    return func.coalesce(ScheduledPost.planned_time, ScheduledPost.scheduled_time)
@@ -0,0 +1,143 @@
+"""
+JSON API of the Instagram dashboard.
+
+Uploaded images are streamed to disk in chunks under a size cap, and posts
+are published through a PublishQueue: POST /api/create-post answers 202 with
+a job ID and a Location header, and GET /api/jobs/<job_id> reports the job.
+"""
+import logging
+import os
+import uuid
+
+from flask import Blueprint, jsonify, request
+from werkzeug.exceptions import HTTPException
+from werkzeug.utils import secure_filename
+
+logger = logging.getLogger(__name__)
+
+ALLOWED_EXTENSIONS = {'png', 'jpg', 'jpeg', 'gif', 'bmp'}
+MAX_UPLOAD_BYTES = 16 * 1024 * 1024
+UPLOAD_CHUNK_BYTES = 64 * 1024
+
+
+class UploadTooLarge(Exception):
+    """Raised when an uploaded file exceeds the size cap."""
+
+
+def allowed_file(filename):
+    """Check whether a file name has an accepted image extension."""
+    return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
+
+
+def save_upload(file, upload_folder, max_bytes=MAX_UPLOAD_BYTES, prefix=''):
+    """
+    Stream an uploaded image to disk in chunks.
+
+    Args:
+        file: werkzeug FileStorage
+        upload_folder: Directory to write to
+        max_bytes: Largest file accepted
+        prefix: File name prefix
+
+    Returns:
+        str: Saved path, or None if there is no usable image
+
+    Raises:
+        UploadTooLarge: If the file exceeds max_bytes; nothing is left on disk
+    """
+    if not file or not file.filename or not allowed_file(file.filename):
+        return None
+    os.makedirs(upload_folder, exist_ok=True)
+    # A unique name per upload; timestamps collide between concurrent users
+    filename = f"{prefix}{uuid.uuid4().hex}_{secure_filename(file.filename)}"
+    image_path = os.path.join(upload_folder, filename)
+    written = 0
+    try:
+        with open(image_path, 'wb') as output:
+            while True:
+                chunk = file.stream.read(UPLOAD_CHUNK_BYTES)
+                if not chunk:
+                    break
+                written += len(chunk)
+                if written > max_bytes:
+                    raise UploadTooLarge()
+                output.write(chunk)
+    except Exception:
+        os.remove(image_path)
+        raise
+    logger.info(f"Image uploaded: {filename} ({written} bytes)")
+    return image_path
+
+
+def create_dashboard_api(publish_queue, upload_folder='uploads', max_upload_bytes=MAX_UPLOAD_BYTES):
+    """
+    Create the dashboard API blueprint.
+
+    The app should set MAX_CONTENT_LENGTH a little above max_upload_bytes so
+    oversized requests are refused before they are read.
+
+    Args:
+        publish_queue: PublishQueue publishing posts
+        upload_folder: Directory for uploaded images
+        max_upload_bytes: Largest image accepted
+
+    Returns:
+        Blueprint: Routes and error handlers to register on the app
+    """
+    api = Blueprint('dashboard_api', __name__)
+
+    @api.app_errorhandler(413)
+    @api.app_errorhandler(UploadTooLarge)
+    def upload_too_large(error):
+        return jsonify({
+            'success': False,
+            'error': f'File too large (max {max_upload_bytes // (1024 * 1024)}MB)'
+        }), 413
+
+    def queued_response(job_id):
+        status_url = f'/api/jobs/{job_id}'
+        return jsonify({
+            'success': True,
+            'job_id': job_id,
+            'status': 'queued',
+            'status_url': status_url
+        }), 202, {'Location': status_url}
+
+    @api.route('/api/create-post', methods=['POST'])
+    def create_post():
+        """Queue a post for publishing."""
+        try:
+            # Handle form data (with file upload)
+            if 'content' in request.form:
+                content = request.form.get('content', '')
+                image_path = None
+                if 'image' in request.files:
+                    image_path = save_upload(request.files['image'], upload_folder, max_upload_bytes)
+                # Publish in the background; the client polls the job status
+                return queued_response(publish_queue.submit(content, image_path))
+
+            # Handle JSON data (backward compatibility)
+            data = request.get_json(silent=True)
+            if data:
+                content = data.get('content', '')
+                if not content:
+                    return jsonify({'success': False, 'error': 'No content provided'})
+                return queued_response(publish_queue.submit(content))
+
+            return jsonify({'success': False, 'error': 'No content or image provided'})
+        except (UploadTooLarge, HTTPException):
+            # Rendered by the 413 handlers
+            raise
+        except Exception as e:
+            logger.error(f"Error creating post: {str(e)}")
+            return jsonify({'success': False, 'error': str(e)})
+
+    @api.route('/api/jobs/<job_id>', methods=['GET'])
+    def get_job(job_id):
+        """Get the status of a queued post."""
+        job = publish_queue.get(job_id)
+        if not job:
+            return jsonify({'success': False, 'error': 'Job not found'}), 404
+        return jsonify({'success': True, 'job': job})
+
+    return api
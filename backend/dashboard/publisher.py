@@ -0,0 +1,121 @@
+"""
+Background publishing for the Instagram dashboard.
+
+Requests hand posts to a PublishQueue and return at once with a job ID; the
+queue's worker threads publish them and record the outcome, which clients
+poll. Every publish in the dashboard goes through one queue, so the number
+of concurrent calls into the shared Instagram client is the number of
+workers.
+"""
+import logging
+import os
+import queue
+import threading
+import uuid
+from collections import OrderedDict
+from datetime import datetime
+
+logger = logging.getLogger(__name__)
+
+
+class PublishQueue:
+    """
+    Publishes posts on background threads and tracks them as jobs.
+    """
+
+    def __init__(self, publish, workers=1, max_jobs=1000):
+        """
+        Start the worker threads.
+
+        Args:
+            publish: Callable (content, image_path) returning a result dict with
+                'success' (and 'error' or post details); any other value counts
+                as a failed login
+            workers: Worker threads; keep 1 while the publish client is not thread-safe
+            max_jobs: Finished jobs remembered for status lookups
+        """
+        self.publish = publish
+        self.max_jobs = max_jobs
+        self.jobs = OrderedDict()  # job ID -> job, oldest first
+        self._lock = threading.Lock()
+        self._queue = queue.Queue()
+        self._workers = [threading.Thread(target=self._run_worker, name=f'publisher-{index}', daemon=True)
+                         for index in range(workers)]
+        for worker in self._workers:
+            worker.start()
+
+    def submit(self, content, image_path=None, on_done=None):
+        """
+        Queue a post.
+
+        Args:
+            content: Caption
+            image_path: Uploaded image, deleted once the post is published or fails
+            on_done: Optional callable receiving the result dict after publishing
+
+        Returns:
+            str: Job ID
+        """
+        job_id = str(uuid.uuid4())
+        with self._lock:
+            self.jobs[job_id] = {
+                'id': job_id,
+                'status': 'queued',
+                'created_at': datetime.now().isoformat(),
+                'finished_at': None
+            }
+            self._evict_finished()
+        self._queue.put((job_id, content, image_path, on_done))
+        logger.info(f"Post queued: {job_id}")
+        return job_id
+
+    def get(self, job_id):
+        """Get a copy of a job, or None if it is unknown or was forgotten."""
+        with self._lock:
+            job = self.jobs.get(job_id)
+            return dict(job) if job else None
+
+    def _evict_finished(self):
+        """Forget the oldest finished jobs; queued and running ones are kept."""
+        for job_id in list(self.jobs):
+            if len(self.jobs) <= self.max_jobs:
+                break
+            if self.jobs[job_id]['finished_at']:
+                del self.jobs[job_id]
+
+    def _run_worker(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            job_id, content, image_path, on_done = item
+            with self._lock:
+                self.jobs[job_id]['status'] = 'publishing'
+            try:
+                result = self.publish(content, image_path)
+                if not isinstance(result, dict):
+                    result = {'success': False, 'error': 'Instagram login failed'}
+            except Exception as e:
+                result = {'success': False, 'error': str(e)}
+            finally:
+                if image_path and os.path.exists(image_path):
+                    os.remove(image_path)
+            with self._lock:
+                job = self.jobs[job_id]
+                job['status'] = 'posted' if result.get('success') else 'failed'
+                job['finished_at'] = datetime.now().isoformat()
+                job['result'] = result
+            logger.info(f"Job {job_id} {job['status']}")
+            if on_done:
+                try:
+                    on_done(result)
+                except Exception as e:
+                    logger.error(f"Error finishing job {job_id}: {str(e)}")
+
+    def shutdown(self, wait=True):
+        """Stop the workers after the jobs already queued."""
+        for _ in self._workers:
+            self._queue.put(None)
+        if wait:
+            for worker in self._workers:
+                worker.join()
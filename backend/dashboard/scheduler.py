@@ -0,0 +1,291 @@
+"""
+Scheduled posts for the Instagram dashboard.
+
+Scheduled posts are kept in SQLite, so the schedule survives restarts, and
+the earliest ones are cached in a min-heap keyed by due time. A single
+scheduler thread sleeps until the earliest post is due, claims it in the
+store and hands it to the dashboard's PublishQueue, so scheduled and
+immediate posts share the same publisher threads.
+"""
+import functools
+import heapq
+import logging
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta
+
+logger = logging.getLogger(__name__)
+
+POST_COLUMNS = ('id', 'content', 'image_path', 'scheduled_time', 'due', 'status',
+                'created_at', 'finished_at', 'post_url', 'error')
+
+
+class ScheduledPostStore:
+    """
+    SQLite store for scheduled posts.
+
+    Pending posts live in scheduled_posts, indexed by due time; finished and
+    cancelled ones are moved to archived_posts so the active table stays small.
+    WAL mode lets the dashboard read while the scheduler writes.
+    """
+
+    def __init__(self, db_path='dashboard_posts.db', archive_days=90):
+        """
+        Open the database and create the tables.
+
+        Args:
+            db_path: SQLite file
+            archive_days: Days finished posts are kept in the archive
+        """
+        self.db_path = db_path
+        self.archive_days = archive_days
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('PRAGMA synchronous=NORMAL')
+        self.init_database()
+
+    def init_database(self):
+        """Create the tables and indexes if they do not exist."""
+        with self.lock, self.conn:
+            for table in ('scheduled_posts', 'archived_posts'):
+                self.conn.execute(f'''
+                    CREATE TABLE IF NOT EXISTS {table} (
+                        id TEXT PRIMARY KEY,
+                        content TEXT,
+                        image_path TEXT,
+                        scheduled_time TEXT NOT NULL,
+                        due REAL NOT NULL,
+                        status TEXT NOT NULL,
+                        created_at TEXT NOT NULL,
+                        finished_at TEXT,
+                        post_url TEXT,
+                        error TEXT
+                    )
+                ''')
+            self.conn.execute('CREATE INDEX IF NOT EXISTS idx_scheduled_posts_status_due ON scheduled_posts (status, due)')
+            self.conn.execute('CREATE INDEX IF NOT EXISTS idx_archived_posts_finished_at ON archived_posts (finished_at)')
+
+    def add(self, post):
+        """Insert a post; keys missing from the dict are stored as NULL."""
+        with self.lock, self.conn:
+            self.conn.execute(
+                f"INSERT INTO scheduled_posts ({', '.join(POST_COLUMNS)}) VALUES ({', '.join('?' * len(POST_COLUMNS))})",
+                tuple(post.get(column) for column in POST_COLUMNS)
+            )
+
+    def next_due(self, limit):
+        """Earliest scheduled posts, plus any sharing the due time of the last one."""
+        with self.lock:
+            rows = self.conn.execute(
+                "SELECT * FROM scheduled_posts WHERE status = 'scheduled' ORDER BY due LIMIT ?", (limit,)
+            ).fetchall()
+            if len(rows) == limit:
+                loaded = {row['id'] for row in rows}
+                rows += [row for row in self.conn.execute(
+                    "SELECT * FROM scheduled_posts WHERE status = 'scheduled' AND due = ?", (rows[-1]['due'],)
+                ) if row['id'] not in loaded]
+        return [dict(row) for row in rows]
+
+    def claim(self, post_id):
+        """Mark a post as publishing; False if it was cancelled meanwhile."""
+        with self.lock, self.conn:
+            cursor = self.conn.execute(
+                "UPDATE scheduled_posts SET status = 'publishing' WHERE id = ? AND status = 'scheduled'", (post_id,)
+            )
+            return cursor.rowcount == 1
+
+    def archive(self, post_id, status, post_url=None, error=None, expected='publishing'):
+        """Move a post to the archive with its final status; False if it was not in the expected state."""
+        with self.lock, self.conn:
+            cursor = self.conn.execute(
+                "UPDATE scheduled_posts SET status = ?, finished_at = ?, post_url = ?, error = ? "
+                "WHERE id = ? AND status = ?",
+                (status, datetime.now().isoformat(), post_url, error, post_id, expected)
+            )
+            if cursor.rowcount != 1:
+                return False
+            self.conn.execute("INSERT INTO archived_posts SELECT * FROM scheduled_posts WHERE id = ?", (post_id,))
+            self.conn.execute("DELETE FROM scheduled_posts WHERE id = ?", (post_id,))
+            return True
+
+    def get(self, post_id):
+        """Get a pending post, or None if it is unknown or archived."""
+        with self.lock:
+            row = self.conn.execute("SELECT * FROM scheduled_posts WHERE id = ?", (post_id,)).fetchone()
+        return dict(row) if row else None
+
+    def list_posts(self, upcoming=500, recent=200):
+        """Pending posts by due time, then the most recently finished ones."""
+        with self.lock:
+            pending = self.conn.execute(
+                "SELECT * FROM scheduled_posts ORDER BY due LIMIT ?", (upcoming,)
+            ).fetchall()
+            finished = self.conn.execute(
+                "SELECT * FROM archived_posts ORDER BY finished_at DESC LIMIT ?", (recent,)
+            ).fetchall()
+        return [dict(row) for row in pending + finished]
+
+    def recover(self):
+        """
+        Fail posts interrupted mid-publish by a crash and prune old archive entries.
+
+        Interrupted posts are not retried: Instagram may already have published them.
+        """
+        with self.lock:
+            interrupted = [row['id'] for row in self.conn.execute(
+                "SELECT id FROM scheduled_posts WHERE status = 'publishing'"
+            )]
+        for post_id in interrupted:
+            self.archive(post_id, 'failed', error='Interrupted by restart')
+        cutoff = (datetime.now() - timedelta(days=self.archive_days)).isoformat()
+        with self.lock, self.conn:
+            pruned = self.conn.execute("DELETE FROM archived_posts WHERE finished_at < ?", (cutoff,)).rowcount
+        if interrupted or pruned:
+            logger.info(f"Recovered scheduled posts: {len(interrupted)} interrupted, {pruned} archived pruned")
+
+    def close(self):
+        """Close the database connection."""
+        with self.lock:
+            self.conn.close()
+
+
+class PostScheduler:
+    """
+    Publishes scheduled posts at their due time.
+
+    The earliest posts (up to cache_size) are cached in a min-heap keyed by
+    due time; every scheduled post due no later than `horizon` is in the
+    cache, and the cache is refilled from the store when it runs dry. The
+    scheduler thread sleeps on a condition until the earliest post is due
+    (or a post is added or cancelled), then queues due posts for publishing.
+    """
+
+    def __init__(self, store, publish_queue, cache_size=1000):
+        """
+        Recover the store, fill the cache and start the scheduler thread.
+
+        Args:
+            store: ScheduledPostStore
+            publish_queue: PublishQueue publishing due posts
+            cache_size: Scheduled posts kept in memory
+        """
+        self.store = store
+        self.publish_queue = publish_queue
+        self.cache_size = cache_size
+        self.posts = {}  # post ID -> cached scheduled post
+        self.heap = []  # (due timestamp, sequence, post ID)
+        self.sequence = 0
+        self.horizon = float('inf')
+        self.condition = threading.Condition()
+        self.store.recover()
+        with self.condition:
+            self.reload()
+        self.running = True
+        self.scheduler_thread = threading.Thread(target=self.run_scheduler, name='post-scheduler', daemon=True)
+        self.scheduler_thread.start()
+
+    def schedule_post(self, content, post_time, image_path=None):
+        """
+        Store a post and wake the scheduler if it is due before the horizon.
+
+        Args:
+            content: Caption
+            post_time: Local ISO time to publish at
+            image_path: Uploaded image, deleted once the post is published or cancelled
+
+        Returns:
+            str: Post ID
+        """
+        post_id = str(uuid.uuid4())
+        scheduled_post = {
+            'id': post_id,
+            'content': content,
+            'image_path': image_path,
+            'scheduled_time': post_time,
+            'due': datetime.fromisoformat(post_time).timestamp(),
+            'status': 'scheduled',
+            'created_at': datetime.now().isoformat()
+        }
+        self.store.add(scheduled_post)
+        with self.condition:
+            if scheduled_post['due'] <= self.horizon:
+                self.cache(scheduled_post)
+                if len(self.posts) > 2 * self.cache_size:
+                    self.reload()
+                self.condition.notify()
+        logger.info(f"Post scheduled for {post_time}")
+        return post_id
+
+    def cancel_post(self, post_id):
+        """Cancel a post that has not been claimed for publishing yet."""
+        post = self.store.get(post_id)
+        if not post or not self.store.archive(post_id, 'cancelled', expected='scheduled'):
+            return False
+        with self.condition:
+            # The heap entry is skipped when it comes up
+            self.posts.pop(post_id, None)
+            if len(self.heap) > 2 * len(self.posts) + 64:
+                self.heap = [entry for entry in self.heap if entry[2] in self.posts]
+                heapq.heapify(self.heap)
+            self.condition.notify()
+        if post.get('image_path') and os.path.exists(post['image_path']):
+            os.remove(post['image_path'])
+        return True
+
+    def get_posts(self):
+        """Pending and recently finished posts."""
+        return self.store.list_posts()
+
+    def cache(self, post):
+        """Add a post to the heap; the caller holds the condition."""
+        self.posts[post['id']] = post
+        self.sequence += 1
+        heapq.heappush(self.heap, (post['due'], self.sequence, post['id']))
+
+    def reload(self):
+        """Refill the cache with the earliest scheduled posts; the caller holds the condition."""
+        self.posts = {}
+        self.heap = []
+        posts = self.store.next_due(self.cache_size)
+        for post in posts:
+            self.cache(post)
+        self.horizon = posts[-1]['due'] if len(posts) >= self.cache_size else float('inf')
+
+    def run_scheduler(self):
+        with self.condition:
+            while self.running:
+                now = time.time()
+                while self.heap and self.heap[0][0] <= now:
+                    _, _, post_id = heapq.heappop(self.heap)
+                    post = self.posts.pop(post_id, None)
+                    if post and self.store.claim(post_id):
+                        logger.info(f"Executing scheduled post: {post_id}")
+                        self.publish_queue.submit(post['content'], post.get('image_path'),
+                                                  on_done=functools.partial(self.finish, post_id))
+                if not self.heap and self.horizon != float('inf'):
+                    # Everything up to the horizon is done; load the next batch
+                    self.reload()
+                    continue
+                timeout = self.heap[0][0] - now if self.heap else None
+                self.condition.wait(timeout)
+
+    def finish(self, post_id, result):
+        """Archive a published post with its outcome; called by the publish queue."""
+        if result.get('success'):
+            self.store.archive(post_id, 'posted', post_url=result.get('url', ''))
+            logger.info(f"Scheduled post {post_id} posted")
+        else:
+            self.store.archive(post_id, 'failed', error=result.get('error', 'Unknown error'))
+            logger.error(f"Error publishing scheduled post {post_id}: {result.get('error', 'Unknown error')}")
+
+    def stop(self):
+        """Stop the scheduler thread; posts already queued are still published."""
+        with self.condition:
+            self.running = False
+            self.condition.notify()
+        self.scheduler_thread.join()
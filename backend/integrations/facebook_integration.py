@@ -3,6 +3,10 @@ Facebook integration for posting to Facebook pages.
 """
 import logging
 
+from backend.integrations.fake_client import FakeGraphAPI, delivery_options, use_fake_platforms
+from backend.media.upload import is_video, upload_page_video
+from backend.utils.helpers import get_config_value
+
 logger = logging.getLogger(__name__)
 
 
@@ -24,11 +28,18 @@ class FacebookIntegration:
     
     def _initialize_client(self):
         """Initialize Facebook API client."""
+        if use_fake_platforms(self.config):
+            self.client = FakeGraphAPI(get_config_value(self.config, 'FAKE_PLATFORM_URL'),
+                                       access_token=get_config_value(self.config, 'FACEBOOK_ACCESS_TOKEN'),
+                                       timeout=get_config_value(self.config, 'FAKE_PLATFORM_TIMEOUT', 10))
+            logger.info("Facebook client using fake platform server")
+            return
+        
         try:
             # Check if credentials are available
             if not all([
-                self.config.FACEBOOK_ACCESS_TOKEN,
-                self.config.FACEBOOK_PAGE_ID
+                get_config_value(self.config, 'FACEBOOK_ACCESS_TOKEN'),
+                get_config_value(self.config, 'FACEBOOK_PAGE_ID')
             ]):
                 logger.warning("Facebook credentials not configured")
                 return
@@ -36,7 +47,7 @@ class FacebookIntegration:
             # Initialize Facebook SDK client
             try:
                 import facebook
-                self.client = facebook.GraphAPI(access_token=self.config.FACEBOOK_ACCESS_TOKEN)
+                self.client = facebook.GraphAPI(access_token=get_config_value(self.config, 'FACEBOOK_ACCESS_TOKEN'))
                 logger.info("Facebook client initialized successfully")
             except ImportError:
                 logger.warning("Facebook SDK library not installed")
@@ -45,14 +56,16 @@ class FacebookIntegration:
         except Exception as e:
             logger.error(f"Error in Facebook initialization: {str(e)}")
     
-    def post(self, content, media_url=None, user_id=None):
+    def post(self, content, media_url=None, user_id=None, idempotency_key=None, media_path=None):
         """
         Post to Facebook page.
         
         Args:
             content: Post content
             media_url: Optional media URL
+            media_path: Local media file: the cached copy of media_url, or a file from an internal caller
             user_id: User ID for account-specific credentials
+            idempotency_key: Token identifying this delivery across retries
             
         Returns:
             bool: True if successful, False otherwise
@@ -62,22 +75,44 @@ class FacebookIntegration:
             return False
         
         try:
-            page_id = self.config.FACEBOOK_PAGE_ID
+            page_id = get_config_value(self.config, 'FACEBOOK_PAGE_ID')
+            options = delivery_options(self.client, idempotency_key)
             
             # Post with or without media
-            if media_url:
+            if media_path and is_video(media_path):
+                # Chunked upload; only one chunk of the video is in memory at a time
+                upload_page_video(
+                    self.client,
+                    page_id,
+                    media_path,
+                    chunk_size=get_config_value(self.config, 'MEDIA_UPLOAD_CHUNK_KB', 4096) * 1024,
+                    options=options,
+                    description=content
+                )
+            elif media_path:
+                # Upload the cached file rather than having Facebook fetch the URL
+                with open(media_path, 'rb') as image:
+                    self.client.put_photo(
+                        image=image,
+                        message=content,
+                        album_path=f"{page_id}/photos",
+                        **options
+                    )
+            elif media_url:
                 # Post with photo
                 self.client.put_photo(
                     image=media_url,
                     message=content,
-                    album_path=f"{page_id}/photos"
+                    album_path=f"{page_id}/photos",
+                    **options
                 )
             else:
                 # Post text only
                 self.client.put_object(
                     parent_object=page_id,
                     connection_name="feed",
-                    message=content
+                    message=content,
+                    **options
                 )
             
             logger.info("Facebook post published successfully")
@@ -102,7 +137,7 @@ class FacebookIntegration:
         
         try:
             # Try to get page info
-            self.client.get_object(id=self.config.FACEBOOK_PAGE_ID)
+            self.client.get_object(id=get_config_value(self.config, 'FACEBOOK_PAGE_ID'))
             return True
         except Exception as e:
             logger.error(f"Facebook credentials validation failed: {str(e)}")
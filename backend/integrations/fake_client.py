@@ -0,0 +1,178 @@
+"""
+HTTP clients for the fake platform server.
+
+Each client mirrors the methods the integrations call on the real SDK client
+(tweepy.API, facebook.GraphAPI, instagrapi.Client) and accepts an extra
+idempotency_key, sent as an Idempotency-Key header. Each client keeps a
+requests.Session per thread so connections are reused across posts.
+"""
+import logging
+import os
+import threading
+from types import SimpleNamespace
+
+import requests
+
+from backend.media.upload import DEFAULT_CHUNK_SIZE, MediaSource
+from backend.utils.helpers import get_config_value
+
+logger = logging.getLogger(__name__)
+
+
+class FakePlatformError(Exception):
+    """Non-2xx response from the fake platform server."""
+
+    def __init__(self, status_code, body):
+        super().__init__(f"HTTP {status_code}: {body}")
+        self.status_code = status_code
+        self.body = body
+
+
+class FakePlatformSession:
+    """
+    Shared HTTP plumbing for the fake platform clients.
+    """
+
+    supports_idempotency = True
+
+    def __init__(self, base_url, platform, timeout=10):
+        """
+        Initialize the session.
+
+        Args:
+            base_url: Fake platform server URL
+            platform: Platform prefix on the server (twitter, facebook, instagram)
+            timeout: Request timeout in seconds
+        """
+        self.base_url = f"{base_url.rstrip('/')}/{platform}"
+        self.timeout = timeout
+        self.rate_limit = {}
+        self._local = threading.local()
+
+    @property
+    def session(self):
+        """Per-thread requests.Session (Session is not thread-safe)."""
+        session = getattr(self._local, 'session', None)
+        if session is None:
+            session = self._local.session = requests.Session()
+        return session
+
+    def send(self, method, path, idempotency_key=None, **kwargs):
+        """
+        Send a request and return the decoded JSON body.
+
+        Raises:
+            FakePlatformError: On a non-2xx response
+        """
+        headers = kwargs.pop('headers', {})
+        if idempotency_key:
+            headers['Idempotency-Key'] = idempotency_key
+        response = self.session.request(method, f"{self.base_url}{path}", headers=headers,
+                                        timeout=self.timeout, **kwargs)
+        self.rate_limit = {k.lower(): v for k, v in response.headers.items()
+                           if 'rate-limit' in k.lower() or 'usage' in k.lower()}
+        if response.status_code >= 400:
+            raise FakePlatformError(response.status_code, response.text)
+        return response.json() if response.content else {}
+
+
+class FakeTwitterAPI(FakePlatformSession):
+    """Stand-in for tweepy.API."""
+
+    def __init__(self, base_url, timeout=10, chunk_size=DEFAULT_CHUNK_SIZE):
+        super().__init__(base_url, 'twitter', timeout)
+        self.chunk_size = chunk_size
+
+    def media_upload(self, filename, chunked=False, media_category=None):
+        if not chunked:
+            with open(filename, 'rb') as handle:
+                body = self.send('POST', '/1.1/media/upload.json', files={'media': handle})
+            return SimpleNamespace(**body)
+
+        # INIT / APPEND / FINALIZE, one chunk in memory at a time
+        with MediaSource(filename) as source:
+            media = self.send('POST', '/1.1/media/upload.json', data={
+                'command': 'INIT',
+                'total_bytes': source.size,
+                'media_type': source.media_type,
+                'media_category': media_category or ''
+            })
+            media_id = media['media_id_string']
+            for index, (_, chunk) in enumerate(source.chunks(self.chunk_size)):
+                self.send('POST', '/1.1/media/upload.json', files={'media': chunk},
+                          data={'command': 'APPEND', 'media_id': media_id, 'segment_index': index})
+        body = self.send('POST', '/1.1/media/upload.json', data={'command': 'FINALIZE', 'media_id': media_id})
+        return SimpleNamespace(**body)
+
+    def update_status(self, status, media_ids=None, idempotency_key=None):
+        data = {'status': status}
+        if media_ids:
+            data['media_ids'] = ','.join(str(media_id) for media_id in media_ids)
+        return self.send('POST', '/1.1/statuses/update.json', idempotency_key, data=data)
+
+    def verify_credentials(self):
+        return self.send('GET', '/1.1/account/verify_credentials.json')
+
+
+class FakeGraphAPI(FakePlatformSession):
+    """Stand-in for facebook.GraphAPI."""
+
+    def __init__(self, base_url, access_token=None, version='v18.0', timeout=10):
+        super().__init__(base_url, 'facebook', timeout)
+        self.access_token = access_token
+        self.version = version
+
+    def put_object(self, parent_object, connection_name, idempotency_key=None, **data):
+        return self.send('POST', f'/{self.version}/{parent_object}/{connection_name}', idempotency_key,
+                         data=dict(data, access_token=self.access_token))
+
+    def put_photo(self, image, album_path, idempotency_key=None, **data):
+        data['access_token'] = self.access_token
+        if isinstance(image, str):
+            return self.send('POST', f'/{self.version}/{album_path}', idempotency_key, data=dict(data, url=image))
+        return self.send('POST', f'/{self.version}/{album_path}', idempotency_key, data=data,
+                         files={'source': image})
+
+    def get_object(self, id):
+        return self.send('GET', f'/{self.version}/{id}', params={'access_token': self.access_token})
+
+    def request(self, path, args=None, post_args=None, files=None, method=None, idempotency_key=None):
+        method = method or ('POST' if post_args or files else 'GET')
+        return self.send(method, f'/{self.version}/{path}', idempotency_key,
+                         params=dict(args or {}, access_token=self.access_token), data=post_args, files=files)
+
+
+class FakeInstagramClient(FakePlatformSession):
+    """Stand-in for instagrapi.Client."""
+
+    def __init__(self, base_url, timeout=10):
+        super().__init__(base_url, 'instagram', timeout)
+
+    def login(self, username, password):
+        self.send('POST', '/api/v1/accounts/login/', data={'username': username, 'password': password})
+        return True
+
+    def photo_upload(self, path, caption, idempotency_key=None):
+        if not os.path.isfile(path):
+            return self.send('POST', '/api/v1/media/configure/', idempotency_key,
+                             data={'upload': str(path), 'caption': caption})
+        with open(path, 'rb') as handle:
+            return self.send('POST', '/api/v1/media/configure/', idempotency_key,
+                             data={'caption': caption}, files={'photo': handle})
+
+
+def delivery_options(client, idempotency_key):
+    """
+    Get extra keyword arguments for a publish call.
+
+    Only clients that accept an idempotency key (the fake platform clients)
+    receive it; the real SDK methods do not take one.
+    """
+    if idempotency_key and getattr(client, 'supports_idempotency', False):
+        return {'idempotency_key': idempotency_key}
+    return {}
+
+
+def use_fake_platforms(config):
+    """Check whether integrations should talk to the fake platform server."""
+    return get_config_value(config, 'PLATFORM_API_MODE', 'live') == 'fake'
@@ -0,0 +1,362 @@
+"""
+Fake Twitter, Facebook Graph and Instagram API server for offline testing.
+
+Emulates the endpoints the integrations call, with configurable latency,
+error rate and request quotas, and returns each platform's rate-limit
+headers. Requests carrying an Idempotency-Key are answered once and replayed
+afterwards, so duplicate deliveries show up in /__stats.
+
+Point the app at it with PLATFORM_API_MODE=fake and FAKE_PLATFORM_URL:
+
+    python -m backend.integrations.fake_server --port 8090 --latency 50 --error-rate 0.01
+    PLATFORM_API_MODE=fake FAKE_PLATFORM_URL=http://127.0.0.1:8090 python app.py
+
+Settings can be changed while running (for chaos tests) by POSTing JSON such
+as {"twitter": {"error_rate": 0.5}} to /__config; /__reset clears counters.
+/media/<name>.jpg?w=&h= serves generated JPEGs to use as offline media URLs.
+"""
+import argparse
+import hashlib
+import io
+import itertools
+import json
+import random
+import threading
+import time
+
+from flask import Flask, Response, jsonify, request
+
+PLATFORMS = ('twitter', 'facebook', 'instagram')
+
+DEFAULT_SETTINGS = {
+    'latency_ms': 0,
+    'jitter_ms': 0,
+    'error_rate': 0.0,
+    'quota': 0,  # Requests allowed per window; 0 = unlimited
+    'window_seconds': 900,
+    'upload_chunk_bytes': 1024 * 1024,  # Range requested per Graph video transfer
+}
+
+
+class PlatformState:
+    """
+    Settings, quota window and counters for one fake platform.
+    """
+
+    def __init__(self, name, settings):
+        self.name = name
+        self.settings = dict(DEFAULT_SETTINGS, **settings)
+        self.lock = threading.Lock()
+        self.responses = {}  # Idempotency-Key -> (body, status)
+        self.uploads = {}  # Chunked upload session -> {'total': bytes, 'received': bytes}
+        self.reset()
+
+    def reset(self):
+        """Clear counters, stored responses and the quota window."""
+        with self.lock:
+            self.window_start = time.time()
+            self.window_count = 0
+            self.responses.clear()
+            self.uploads.clear()
+            self.stats = {'requests': 0, 'published': 0, 'errors': 0, 'throttled': 0, 'replayed': 0,
+                          'uploads': 0, 'upload_bytes': 0, 'max_chunk_bytes': 0}
+
+    def admit(self):
+        """
+        Count a request against the quota window.
+
+        Returns:
+            tuple: (allowed, remaining, reset_epoch)
+        """
+        with self.lock:
+            now = time.time()
+            window = self.settings['window_seconds']
+            if now - self.window_start >= window:
+                self.window_start = now
+                self.window_count = 0
+            self.stats['requests'] += 1
+            quota = self.settings['quota']
+            reset_at = int(self.window_start + window)
+            if quota and self.window_count >= quota:
+                self.stats['throttled'] += 1
+                return False, 0, reset_at
+            self.window_count += 1
+            remaining = quota - self.window_count if quota else 1000000
+            return True, remaining, reset_at
+
+    def rate_limit_headers(self, remaining, reset_at):
+        """Build the rate-limit headers this platform returns."""
+        quota = self.settings['quota']
+        if self.name == 'twitter':
+            return {
+                'x-rate-limit-limit': str(quota or 1000000),
+                'x-rate-limit-remaining': str(remaining),
+                'x-rate-limit-reset': str(reset_at),
+            }
+        usage = int(100 * (quota - remaining) / quota) if quota else 0
+        header = 'X-App-Usage' if self.name == 'facebook' else 'X-Business-Use-Case-Usage'
+        return {header: json.dumps({'call_count': usage, 'total_time': usage, 'total_cputime': usage})}
+
+
+def create_fake_platform_app(settings=None, seed=None):
+    """
+    Create the fake platform server application.
+
+    Args:
+        settings: Defaults for all platforms, and/or per-platform overrides
+            keyed by platform name
+        seed: Random seed for reproducible latency and errors
+
+    Returns:
+        Flask: WSGI application
+    """
+    settings = settings or {}
+    shared = {k: v for k, v in settings.items() if k not in PLATFORMS}
+    app = Flask(__name__)
+    app.platforms = {name: PlatformState(name, dict(shared, **settings.get(name, {}))) for name in PLATFORMS}
+    ids = itertools.count(10 ** 15)
+    rng = random.Random(seed)
+    rng_lock = threading.Lock()
+
+    def error_body(platform, message, code):
+        """Format an error the way each platform does."""
+        if platform == 'twitter':
+            return {'errors': [{'code': code, 'message': message}]}
+        if platform == 'facebook':
+            return {'error': {'message': message, 'type': 'OAuthException', 'code': code}}
+        return {'message': message, 'status': 'fail'}
+
+    def handle(platform, build_response, publishes=True):
+        """Apply latency, quota, errors and idempotency around a handler."""
+        state = app.platforms[platform]
+        key = request.headers.get('Idempotency-Key')
+        allowed, remaining, reset_at = state.admit()
+        headers = state.rate_limit_headers(remaining, reset_at)
+
+        with rng_lock:
+            delay = state.settings['latency_ms'] + rng.uniform(-state.settings['jitter_ms'],
+                                                               state.settings['jitter_ms'])
+            failed = rng.random() < state.settings['error_rate']
+        time.sleep(max(0.0, delay) / 1000)
+
+        if not allowed:
+            code = 88 if platform == 'twitter' else 4
+            return jsonify(error_body(platform, 'Rate limit exceeded', code)), 429, headers
+
+        if key:
+            with state.lock:
+                stored = state.responses.get(key)
+                if stored:
+                    state.stats['replayed'] += 1
+            if stored:
+                body, status = stored
+                return jsonify(body), status, dict(headers, **{'Idempotent-Replayed': 'true'})
+
+        if failed:
+            with state.lock:
+                state.stats['errors'] += 1
+            return jsonify(error_body(platform, 'Internal error', 131)), 500, headers
+
+        body = build_response(next(ids))
+        if publishes:
+            with state.lock:
+                state.stats['published'] += 1
+                if key:
+                    state.responses[key] = (body, 200)
+        return jsonify(body), 200, headers
+
+    def payload():
+        """Read a JSON or form request body."""
+        return request.get_json(silent=True) or request.form.to_dict()
+
+    def count_upload(platform):
+        """Count a multipart media file received by a platform."""
+        if request.files:
+            with app.platforms[platform].lock:
+                app.platforms[platform].stats['uploads'] += 1
+
+    def start_upload(platform, session_id, total):
+        """Open a chunked upload session."""
+        state = app.platforms[platform]
+        with state.lock:
+            state.uploads[session_id] = {'total': total, 'received': 0}
+
+    def receive_chunk(platform, session_id, field):
+        """
+        Append a multipart chunk to an upload session.
+
+        Returns:
+            int: Bytes received so far, or None if the session is unknown
+        """
+        state = app.platforms[platform]
+        data = request.files[field].read() if field in request.files else b''
+        with state.lock:
+            upload = state.uploads.get(session_id)
+            if upload is None:
+                return None
+            upload['received'] += len(data)
+            state.stats['upload_bytes'] += len(data)
+            state.stats['max_chunk_bytes'] = max(state.stats['max_chunk_bytes'], len(data))
+            return upload['received']
+
+    def finish_upload(platform, session_id):
+        """Check that a chunked upload is complete and count it."""
+        state = app.platforms[platform]
+        with state.lock:
+            upload = state.uploads.get(session_id)
+            if upload is None or upload['received'] != upload['total']:
+                return False
+            if not upload.get('finished'):
+                upload['finished'] = True
+                state.stats['uploads'] += 1
+            return True
+
+    # Twitter API v1.1
+    @app.route('/twitter/1.1/statuses/update.json', methods=['POST'])
+    def twitter_update_status():
+        text = payload().get('status', '')
+        return handle('twitter', lambda id_: {'id': id_, 'id_str': str(id_), 'text': text})
+
+    @app.route('/twitter/1.1/media/upload.json', methods=['POST'])
+    def twitter_media_upload():
+        fields = payload()
+        command = fields.get('command')
+        media_id = fields.get('media_id')
+        if command == 'INIT':
+            def init(id_):
+                start_upload('twitter', str(id_), int(fields['total_bytes']))
+                return {'media_id': id_, 'media_id_string': str(id_), 'expires_after_secs': 86400}
+            return handle('twitter', init, publishes=False)
+        if command == 'APPEND':
+            if receive_chunk('twitter', media_id, 'media') is None:
+                return jsonify(error_body('twitter', 'Invalid media_id', 324)), 400
+            return '', 204
+        if command == 'FINALIZE':
+            if not finish_upload('twitter', media_id):
+                return jsonify(error_body('twitter', 'Segments do not add up to provided total file size', 324)), 400
+            return handle('twitter', lambda id_: {'media_id': int(media_id), 'media_id_string': media_id},
+                          publishes=False)
+        count_upload('twitter')
+        return handle('twitter', lambda id_: {'media_id': id_, 'media_id_string': str(id_)}, publishes=False)
+
+    @app.route('/twitter/1.1/account/verify_credentials.json', methods=['GET'])
+    def twitter_verify_credentials():
+        return handle('twitter', lambda id_: {'id': 1, 'id_str': '1', 'screen_name': 'fake_account'},
+                      publishes=False)
+
+    # Facebook Graph API
+    @app.route('/facebook/<version>/<page_id>/feed', methods=['POST'])
+    def facebook_feed(version, page_id):
+        return handle('facebook', lambda id_: {'id': f'{page_id}_{id_}'})
+
+    @app.route('/facebook/<version>/<page_id>/photos', methods=['POST'])
+    def facebook_photos(version, page_id):
+        count_upload('facebook')
+        return handle('facebook', lambda id_: {'id': str(id_), 'post_id': f'{page_id}_{id_}'})
+
+    @app.route('/facebook/<version>/<page_id>/videos', methods=['POST'])
+    def facebook_videos(version, page_id):
+        fields = payload()
+        phase = fields.get('upload_phase')
+        session_id = fields.get('upload_session_id')
+        chunk = int(app.platforms['facebook'].settings['upload_chunk_bytes'])
+        if phase == 'start':
+            total = int(fields['file_size'])
+
+            def start(id_):
+                start_upload('facebook', str(id_), total)
+                return {'upload_session_id': str(id_), 'video_id': str(id_), 'start_offset': '0',
+                        'end_offset': str(min(chunk, total))}
+            return handle('facebook', start, publishes=False)
+        if phase == 'transfer':
+            upload = app.platforms['facebook'].uploads.get(session_id)
+            if upload is None or int(fields.get('start_offset', -1)) != upload['received']:
+                return jsonify(error_body('facebook', 'Invalid upload session or offset', 100)), 400
+            received = receive_chunk('facebook', session_id, 'video_file_chunk')
+            return jsonify({'start_offset': str(received), 'end_offset': str(min(received + chunk, upload['total']))})
+        if phase == 'finish':
+            if not finish_upload('facebook', session_id):
+                return jsonify(error_body('facebook', 'Upload incomplete', 100)), 400
+            return handle('facebook', lambda id_: {'success': True, 'video_id': session_id})
+        return jsonify(error_body('facebook', 'Unsupported upload_phase', 100)), 400
+
+    @app.route('/facebook/<version>/<object_id>', methods=['GET'])
+    def facebook_object(version, object_id):
+        return handle('facebook', lambda id_: {'id': object_id, 'name': 'Fake Page'}, publishes=False)
+
+    # Instagram private API (as used by instagrapi)
+    @app.route('/instagram/api/v1/accounts/login/', methods=['POST'])
+    def instagram_login():
+        username = payload().get('username', 'fake_account')
+        return handle('instagram', lambda id_: {'logged_in_user': {'pk': 1, 'username': username},
+                                                'status': 'ok'}, publishes=False)
+
+    @app.route('/instagram/api/v1/media/configure/', methods=['POST'])
+    def instagram_configure():
+        count_upload('instagram')
+        caption = payload().get('caption', '')
+        return handle('instagram', lambda id_: {'media': {'pk': id_, 'id': f'{id_}_1', 'caption': caption},
+                                                'status': 'ok'})
+
+    # Media host
+    @app.route('/media/<name>', methods=['GET'])
+    def media(name):
+        from PIL import Image
+
+        width = min(request.args.get('w', 640, type=int), 4096)
+        height = min(request.args.get('h', 480, type=int), 4096)
+        # Same name and size always give the same bytes
+        color = tuple(hashlib.sha256(name.encode()).digest()[:3])
+        buffer = io.BytesIO()
+        Image.new('RGB', (width, height), color).save(buffer, 'JPEG', quality=90)
+        return Response(buffer.getvalue(), content_type='image/jpeg')
+
+    # Control endpoints
+    @app.route('/__stats', methods=['GET'])
+    def stats():
+        return jsonify({name: dict(state.stats) for name, state in app.platforms.items()})
+
+    @app.route('/__config', methods=['GET', 'POST'])
+    def config():
+        if request.method == 'POST':
+            updates = request.get_json(force=True) or {}
+            for name, state in app.platforms.items():
+                changes = {k: v for k, v in updates.items() if k in DEFAULT_SETTINGS}
+                changes.update(updates.get(name, {}))
+                with state.lock:
+                    state.settings.update(changes)
+        return jsonify({name: state.settings for name, state in app.platforms.items()})
+
+    @app.route('/__reset', methods=['POST'])
+    def reset():
+        for state in app.platforms.values():
+            state.reset()
+        return jsonify({'status': 'ok'})
+
+    return app
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8090)
+    parser.add_argument('--latency', type=float, default=0, help='Response latency in ms')
+    parser.add_argument('--jitter', type=float, default=0, help='Latency jitter in ms')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='Fraction of 500 responses')
+    parser.add_argument('--quota', type=int, default=0, help='Requests per window per platform (0 = unlimited)')
+    parser.add_argument('--window', type=int, default=900, help='Quota window in seconds')
+    parser.add_argument('--seed', type=int)
+    args = parser.parse_args()
+
+    app = create_fake_platform_app({
+        'latency_ms': args.latency,
+        'jitter_ms': args.jitter,
+        'error_rate': args.error_rate,
+        'quota': args.quota,
+        'window_seconds': args.window,
+    }, seed=args.seed)
+    app.run(host=args.host, port=args.port, threaded=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -7,6 +7,10 @@ with access tokens instead. See: https://developers.facebook.com/docs/instagram-
 """
 import logging
 
+from backend.integrations.fake_client import FakeInstagramClient, delivery_options, use_fake_platforms
+from backend.media.upload import is_video
+from backend.utils.helpers import get_config_value
+
 logger = logging.getLogger(__name__)
 
 
@@ -28,11 +32,17 @@ class InstagramIntegration:
     
     def _initialize_client(self):
         """Initialize Instagram API client."""
+        if use_fake_platforms(self.config):
+            self.client = FakeInstagramClient(get_config_value(self.config, 'FAKE_PLATFORM_URL'),
+                                              get_config_value(self.config, 'FAKE_PLATFORM_TIMEOUT', 10))
+            logger.info("Instagram client using fake platform server")
+            return
+        
         try:
             # Check if credentials are available
             if not all([
-                self.config.INSTAGRAM_USERNAME,
-                self.config.INSTAGRAM_PASSWORD
+                get_config_value(self.config, 'INSTAGRAM_USERNAME'),
+                get_config_value(self.config, 'INSTAGRAM_PASSWORD')
             ]):
                 logger.warning("Instagram credentials not configured")
                 return
@@ -51,7 +61,7 @@ class InstagramIntegration:
         except Exception as e:
             logger.error(f"Error in Instagram initialization: {str(e)}")
     
-    def post(self, content, media_url=None, user_id=None):
+    def post(self, content, media_url=None, user_id=None, idempotency_key=None, media_path=None):
         """
         Post to Instagram.
         
@@ -61,7 +71,9 @@ class InstagramIntegration:
         Args:
             content: Post caption
             media_url: Media URL (required for Instagram)
+            media_path: Local media file: the cached copy of media_url, or a file from an internal caller
             user_id: User ID for account-specific credentials
+            idempotency_key: Token identifying this delivery across retries
             
         Returns:
             bool: True if successful, False otherwise
@@ -71,7 +83,7 @@ class InstagramIntegration:
             return False
         
         # Instagram requires media for posts
-        if not media_url:
+        if not media_url and not media_path:
             logger.error("Instagram posts require media_url")
             return False
         
@@ -79,15 +91,24 @@ class InstagramIntegration:
             # WARNING: Direct login approach - use Business API in production
             logger.warning("Using direct login for Instagram - consider switching to Business API for production")
             self.client.login(
-                self.config.INSTAGRAM_USERNAME,
-                self.config.INSTAGRAM_PASSWORD
+                get_config_value(self.config, 'INSTAGRAM_USERNAME'),
+                get_config_value(self.config, 'INSTAGRAM_PASSWORD')
             )
             
-            # Upload photo with caption
-            # In production, you'd download the media_url first
-            # This is a simplified version
-            logger.info("Instagram post would be published here")
-            # self.client.photo_upload(path=local_media_path, caption=content)
+            if isinstance(self.client, FakeInstagramClient):
+                self.client.photo_upload(path=media_path or media_url, caption=content,
+                                         **delivery_options(self.client, idempotency_key))
+                return True
+            
+            if not media_path:
+                logger.error("Instagram posts need a local media file; set MEDIA_CACHE_DIR")
+                return False
+            
+            # Upload with caption; instagrapi streams videos in chunks itself
+            if is_video(media_path):
+                self.client.video_upload(path=media_path, caption=content)
+            else:
+                self.client.photo_upload(path=media_path, caption=content)
             
             return True
             
@@ -111,8 +132,8 @@ class InstagramIntegration:
         try:
             # Try to login
             self.client.login(
-                self.config.INSTAGRAM_USERNAME,
-                self.config.INSTAGRAM_PASSWORD
+                get_config_value(self.config, 'INSTAGRAM_USERNAME'),
+                get_config_value(self.config, 'INSTAGRAM_PASSWORD')
             )
             return True
         except Exception as e:
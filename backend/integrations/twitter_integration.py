@@ -3,6 +3,10 @@ Twitter integration for posting tweets.
 """
 import logging
 
+from backend.integrations.fake_client import FakeTwitterAPI, delivery_options, use_fake_platforms
+from backend.media.upload import twitter_media_category
+from backend.utils.helpers import get_config_value
+
 logger = logging.getLogger(__name__)
 
 
@@ -24,13 +28,20 @@ class TwitterIntegration:
     
     def _initialize_client(self):
         """Initialize Twitter API client."""
+        if use_fake_platforms(self.config):
+            self.client = FakeTwitterAPI(get_config_value(self.config, 'FAKE_PLATFORM_URL'),
+                                         get_config_value(self.config, 'FAKE_PLATFORM_TIMEOUT', 10),
+                                         get_config_value(self.config, 'MEDIA_UPLOAD_CHUNK_KB', 4096) * 1024)
+            logger.info("Twitter client using fake platform server")
+            return
+        
         try:
             # Check if credentials are available
             if not all([
-                self.config.TWITTER_API_KEY,
-                self.config.TWITTER_API_SECRET,
-                self.config.TWITTER_ACCESS_TOKEN,
-                self.config.TWITTER_ACCESS_SECRET
+                get_config_value(self.config, 'TWITTER_API_KEY'),
+                get_config_value(self.config, 'TWITTER_API_SECRET'),
+                get_config_value(self.config, 'TWITTER_ACCESS_TOKEN'),
+                get_config_value(self.config, 'TWITTER_ACCESS_SECRET')
             ]):
                 logger.warning("Twitter credentials not configured")
                 return
@@ -39,12 +50,12 @@ class TwitterIntegration:
             try:
                 import tweepy
                 auth = tweepy.OAuthHandler(
-                    self.config.TWITTER_API_KEY,
-                    self.config.TWITTER_API_SECRET
+                    get_config_value(self.config, 'TWITTER_API_KEY'),
+                    get_config_value(self.config, 'TWITTER_API_SECRET')
                 )
                 auth.set_access_token(
-                    self.config.TWITTER_ACCESS_TOKEN,
-                    self.config.TWITTER_ACCESS_SECRET
+                    get_config_value(self.config, 'TWITTER_ACCESS_TOKEN'),
+                    get_config_value(self.config, 'TWITTER_ACCESS_SECRET')
                 )
                 self.client = tweepy.API(auth)
                 logger.info("Twitter client initialized successfully")
@@ -55,14 +66,16 @@ class TwitterIntegration:
         except Exception as e:
             logger.error(f"Error in Twitter initialization: {str(e)}")
     
-    def post(self, content, media_url=None, user_id=None):
+    def post(self, content, media_url=None, user_id=None, idempotency_key=None, media_path=None):
         """
         Post a tweet to Twitter.
         
         Args:
             content: Tweet content
             media_url: Optional media URL
+            media_path: Local media file: the cached copy of media_url, or a file from an internal caller
             user_id: User ID for account-specific credentials
+            idempotency_key: Token identifying this delivery across retries
             
         Returns:
             bool: True if successful, False otherwise
@@ -72,13 +85,15 @@ class TwitterIntegration:
             return False
         
         try:
+            options = delivery_options(self.client, idempotency_key)
             # Post tweet with or without media
-            if media_url:
-                # Download and upload media
-                # This is a simplified version - production would handle media properly
-                self.client.update_status(status=content)
+            if media_path:
+                # Chunked INIT/APPEND/FINALIZE upload keeps one chunk in memory
+                media = self.client.media_upload(filename=media_path, chunked=True,
+                                                 media_category=twitter_media_category(media_path))
+                self.client.update_status(status=content, media_ids=[media.media_id], **options)
             else:
-                self.client.update_status(status=content)
+                self.client.update_status(status=content, **options)
             
             logger.info("Tweet posted successfully")
             return True
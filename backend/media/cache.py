@@ -0,0 +1,375 @@
+"""
+Content-addressed cache for post media.
+
+Each media URL is downloaded once and stored under the SHA-256 of its
+content, so the same image attached to many posts (or by many users) is kept
+on disk once. A small index maps URL hashes to content hashes so later posts
+with the same URL skip the download entirely. Total size is capped; the least
+recently used objects are evicted first, except those currently in use.
+
+Derived files such as per-platform variants are stored alongside under a key
+built from the source hash, and share the size cap and eviction order.
+
+Media URLs come from users, so only http(s) URLs are fetched, and unless
+private hosts are allowed (tests, the fake platform server) every address a
+host resolves to must be public, on the first request and on each redirect.
+Local files never go through the cache; internal callers hand them to the
+post handler directly.
+
+Layout under the cache root:
+    objects/ab/abcdef...jpg   media content, named by SHA-256
+    objects/ab/abcdef...-<name>.jpg  derived files
+    urls/<sha256 of url>      content hash of the URL's media
+    tmp/                      partial downloads
+"""
+import hashlib
+import ipaddress
+import logging
+import mimetypes
+import os
+import socket
+import tempfile
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from urllib.parse import urljoin, urlparse
+
+import requests
+
+logger = logging.getLogger(__name__)
+
+CHUNK_SIZE = 64 * 1024
+MAX_REDIRECTS = 5
+
+
+class MediaFetchError(Exception):
+    """Media could not be downloaded or exceeded the size limit."""
+
+
+class MediaCache:
+    """
+    Disk cache of media files keyed by content hash, with an LRU size cap.
+    """
+
+    def __init__(self, root, max_bytes=1024 ** 3, max_file_bytes=512 * 1024 ** 2, timeout=30,
+                 allow_private_hosts=False):
+        """
+        Initialize the cache.
+
+        Args:
+            root: Cache directory
+            max_bytes: Total size cap for cached objects
+            max_file_bytes: Largest single file accepted
+            timeout: Download timeout in seconds
+            allow_private_hosts: Also fetch from loopback, private and link-local addresses
+        """
+        self.root = root
+        self.allow_private_hosts = allow_private_hosts
+        self.max_bytes = max_bytes
+        self.max_file_bytes = max_file_bytes
+        self.timeout = timeout
+        self.stats = {'hits': 0, 'misses': 0, 'deduplicated': 0, 'evictions': 0}
+        self._objects = OrderedDict()  # content hash or derived key -> (path, size), least recently used first
+        self._size = 0
+        self._pins = {}  # key -> number of active users
+        self._lock = threading.Lock()
+        self._url_locks = {}
+        self._session = requests.Session()
+        self._load()
+
+    def _load(self):
+        """Index existing objects, oldest access first."""
+        entries = []
+        objects_dir = os.path.join(self.root, 'objects')
+        for dirpath, _, filenames in os.walk(objects_dir):
+            for filename in filenames:
+                path = os.path.join(dirpath, filename)
+                stat = os.stat(path)
+                entries.append((stat.st_mtime, filename.split('.', 1)[0], path, stat.st_size))
+        for _, digest, path, size in sorted(entries):
+            self._objects[digest] = (path, size)
+            self._size += size
+
+    def _url_index(self, url):
+        return os.path.join(self.root, 'urls', hashlib.sha256(url.encode()).hexdigest())
+
+    def _lookup(self, url, pin=False):
+        """Get the cached (content hash, path) for a URL, marking it recently used."""
+        try:
+            with open(self._url_index(url)) as handle:
+                digest = handle.read().strip()
+        except OSError:
+            return None
+        with self._lock:
+            entry = self._objects.get(digest)
+            if not entry:
+                return None
+            self._objects.move_to_end(digest)
+            if pin:
+                self._pin(digest)
+        try:
+            os.utime(entry[0])
+        except OSError:
+            pass
+        return digest, entry[0]
+
+    def contains(self, url):
+        """
+        Check whether a URL's media is cached, without fetching or touching it.
+
+        Args:
+            url: Media URL
+
+        Returns:
+            bool: True if get() would not download anything
+        """
+        return self.content_hash(url) is not None
+
+    def content_hash(self, url):
+        """Get the content hash of a cached URL, or None if it is not cached."""
+        try:
+            with open(self._url_index(url)) as handle:
+                digest = handle.read().strip()
+        except OSError:
+            return None
+        return digest if digest in self._objects else None
+
+    def has(self, key):
+        """Check whether a content hash or derived key is stored."""
+        return key in self._objects
+
+    def get_derived(self, key, pin=False):
+        """
+        Get the path of a derived file, marking it recently used.
+
+        Args:
+            key: Derived key
+            pin: Also protect it from eviction until unpin(key)
+
+        Returns:
+            str: Path, or None if it is not stored
+        """
+        with self._lock:
+            entry = self._objects.get(key)
+            if not entry:
+                return None
+            self._objects.move_to_end(key)
+            if pin:
+                self._pin(key)
+        try:
+            os.utime(entry[0])
+        except OSError:
+            pass
+        return entry[0]
+
+    def store_derived(self, key, tmp_path, extension, pin=False):
+        """
+        Move a file produced in temp_path() into the cache under a derived key.
+
+        Args:
+            key: Derived key, usually '<content hash>-<name>'
+            tmp_path: File returned by temp_path()
+            extension: File extension including the dot
+            pin: Also protect it from eviction until unpin(key)
+
+        Returns:
+            str: Path of the stored file
+        """
+        return self._store(key, tmp_path, os.path.getsize(tmp_path), extension, pin)
+
+    def temp_path(self):
+        """Create an empty file in the cache's temp directory and return its path."""
+        self._make_dirs()
+        fd, path = tempfile.mkstemp(dir=os.path.join(self.root, 'tmp'))
+        os.close(fd)
+        return path
+
+    def _make_dirs(self):
+        # Directories are created on first write so an unused cache leaves no trace
+        for name in ('objects', 'urls', 'tmp'):
+            os.makedirs(os.path.join(self.root, name), exist_ok=True)
+
+    def get(self, url):
+        """
+        Get a local path for a media URL, downloading it on first use.
+
+        Args:
+            url: http(s) URL
+
+        Returns:
+            str: Path of the cached file
+
+        Raises:
+            MediaFetchError: If the media cannot be fetched or the URL is not allowed
+        """
+        return self._get(url)[1]
+
+    def _get(self, url, pin=False):
+        """Return (content hash, path), fetching under a per-URL lock."""
+        if urlparse(url).scheme not in ('http', 'https'):
+            raise MediaFetchError(f"Media URL must be http(s): {url}")
+
+        cached = self._lookup(url, pin)
+        if cached:
+            self.stats['hits'] += 1
+            return cached
+
+        with self._lock:
+            url_lock = self._url_locks.setdefault(url, threading.Lock())
+        with url_lock:
+            # Another thread may have fetched it while we waited
+            cached = self._lookup(url, pin)
+            if cached:
+                self.stats['hits'] += 1
+                return cached
+            self.stats['misses'] += 1
+            try:
+                return self._download(url, pin)
+            finally:
+                with self._lock:
+                    self._url_locks.pop(url, None)
+
+    def _download(self, url, pin):
+        """Stream a URL to disk, hashing it as it arrives."""
+        digest = hashlib.sha256()
+        size = 0
+        self._make_dirs()
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.join(self.root, 'tmp'))
+        try:
+            with os.fdopen(fd, 'wb') as handle:
+                with self._open(url) as response:
+                    response.raise_for_status()
+                    content_type = response.headers.get('Content-Type', '').split(';')[0].strip()
+                    for chunk in response.iter_content(CHUNK_SIZE):
+                        size += len(chunk)
+                        if size > self.max_file_bytes:
+                            raise MediaFetchError(f"Media larger than {self.max_file_bytes} bytes: {url}")
+                        digest.update(chunk)
+                        handle.write(chunk)
+            content_hash = digest.hexdigest()
+            path = self._store(content_hash, tmp_path, size, media_extension(url, content_type), pin)
+        except requests.RequestException as e:
+            raise MediaFetchError(f"Error downloading {url}: {str(e)}")
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+        with open(self._url_index(url), 'w') as handle:
+            handle.write(content_hash)
+        logger.info(f"Cached media {url} as {content_hash[:12]} ({size} bytes)")
+        return content_hash, path
+
+    def _open(self, url):
+        """Request a URL, following redirects only to allowed hosts."""
+        for _ in range(MAX_REDIRECTS + 1):
+            check_media_url(url, self.allow_private_hosts)
+            response = self._session.get(url, stream=True, timeout=self.timeout, allow_redirects=False)
+            if not response.is_redirect:
+                return response
+            response.close()
+            url = urljoin(url, response.headers['Location'])
+        raise MediaFetchError(f"Too many redirects fetching media: {url}")
+
+    def _store(self, key, tmp_path, size, extension, pin):
+        """Move a file into the object store unless identical content exists."""
+        with self._lock:
+            if pin:
+                self._pin(key)
+            entry = self._objects.get(key)
+            if entry and os.path.exists(entry[0]):
+                # Same bytes under a different URL
+                self.stats['deduplicated'] += 1
+                self._objects.move_to_end(key)
+                return entry[0]
+            if entry:
+                # The file was deleted behind our back; replace the stale entry
+                self._size -= entry[1]
+            path = os.path.join(self.root, 'objects', key[:2], key + extension)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            os.replace(tmp_path, path)
+            self._objects[key] = (path, size)
+            self._size += size
+            self._evict(keep=key)
+            return path
+
+    def _pin(self, key):
+        """Protect an object from eviction; the caller holds the lock."""
+        self._pins[key] = self._pins.get(key, 0) + 1
+
+    def unpin(self, key):
+        """Release a pin taken by local_path() or a pin=True call."""
+        with self._lock:
+            self._pins[key] -= 1
+            if not self._pins[key]:
+                del self._pins[key]
+
+    def _evict(self, keep=None):
+        """Remove least recently used unpinned objects until under the cap."""
+        for digest in list(self._objects):
+            if self._size <= self.max_bytes:
+                break
+            if digest == keep or self._pins.get(digest):
+                continue
+            path, size = self._objects.pop(digest)
+            self._size -= size
+            self.stats['evictions'] += 1
+            try:
+                os.remove(path)
+            except OSError as e:
+                logger.error(f"Error evicting cached media {path}: {str(e)}")
+
+    @contextmanager
+    def local_path(self, url):
+        """
+        Context manager yielding a local path that is not evicted while in use.
+
+        Args:
+            url: Media URL
+        """
+        digest, path = self._get(url, pin=True)
+        try:
+            yield path
+        finally:
+            self.unpin(digest)
+
+    def size(self):
+        """Get the total size of cached objects in bytes."""
+        return self._size
+
+
+def check_media_url(url, allow_private_hosts=False):
+    """
+    Make sure the server may fetch a media URL.
+
+    Args:
+        url: User-supplied media URL
+        allow_private_hosts: Skip the address check
+
+    Raises:
+        MediaFetchError: If the URL is not http(s) or its host resolves to a
+            loopback, private, link-local or otherwise non-public address
+    """
+    parsed = urlparse(url)
+    if parsed.scheme not in ('http', 'https') or not parsed.hostname:
+        raise MediaFetchError(f"Media URL must be http(s): {url}")
+    if allow_private_hosts:
+        return
+    try:
+        addresses = socket.getaddrinfo(parsed.hostname, parsed.port or parsed.scheme, proto=socket.IPPROTO_TCP)
+    except (OSError, UnicodeError, ValueError) as e:
+        raise MediaFetchError(f"Cannot resolve media host {parsed.hostname}: {str(e)}")
+    for address in addresses:
+        ip = ipaddress.ip_address(address[4][0].split('%')[0])
+        ip = getattr(ip, 'ipv4_mapped', None) or ip
+        if not ip.is_global or ip.is_multicast:
+            raise MediaFetchError(f"Media host {parsed.hostname} resolves to a non-public address")
+
+
+def media_extension(url, content_type):
+    """Pick a file extension from the Content-Type, falling back to the URL."""
+    extension = mimetypes.guess_extension(content_type) if content_type else None
+    if extension == '.jpe':
+        extension = '.jpg'
+    if not extension:
+        extension = os.path.splitext(urlparse(url).path)[1].lower()
+    return extension if extension and len(extension) <= 6 else ''
@@ -0,0 +1,118 @@
+"""
+Background media prefetching.
+
+The scheduler hands over media URLs of posts due soon; they are downloaded
+into the media cache, and transcoded for the posts' platforms, on a small
+thread pool so that publishing only has to upload the local file. A URL
+already cached or already being fetched is skipped, and a publish that needs
+a URL still downloading waits for that download instead of starting a second
+one.
+"""
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait
+
+
+logger = logging.getLogger(__name__)
+
+
+class MediaPrefetcher:
+    """
+    Fetches media into a MediaCache ahead of publishing.
+    """
+
+    def __init__(self, cache, max_workers=4, transcoder=None):
+        """
+        Initialize the prefetcher.
+
+        Args:
+            cache: MediaCache to fill
+            max_workers: Concurrent downloads
+            transcoder: Optional MediaTranscoder producing platform variants
+        """
+        self.cache = cache
+        self.transcoder = transcoder
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='media-prefetch')
+        self.stats = {'queued': 0, 'fetched': 0, 'failed': 0}
+        self._pending = {}  # url -> Future
+        self._lock = threading.Lock()
+
+    def prefetch(self, url, platforms=()):
+        """
+        Queue a URL for download unless it is ready or already queued.
+
+        Args:
+            url: Media URL
+            platforms: Platforms the media will be published to
+
+        Returns:
+            bool: True if a download was queued
+        """
+        if self.is_ready(url, platforms):
+            return False
+        with self._lock:
+            if url in self._pending:
+                return False
+            self.stats['queued'] += 1
+            self._pending[url] = self.executor.submit(self._fetch, url, tuple(platforms))
+        return True
+
+    def is_ready(self, url, platforms=()):
+        """Check whether a URL and its platform variants are already cached."""
+        if not self.cache.contains(url):
+            return False
+        if not self.transcoder or not platforms:
+            return True
+        digest = self.cache.content_hash(url)
+        return digest is None or all(self.transcoder.has_variant(digest, p) for p in platforms)
+
+    def _fetch(self, url, platforms):
+        """Download one URL into the cache and transcode it."""
+        try:
+            path = self.cache.get(url)
+            if self.transcoder:
+                for platform in platforms:
+                    self.transcoder.prepare(path, platform)
+            self.stats['fetched'] += 1
+        except Exception as e:
+            # Download and transcoding errors alike; nothing reads the future
+            self.stats['failed'] += 1
+            logger.warning(f"Error prefetching media {url}: {str(e)}")
+        finally:
+            with self._lock:
+                self._pending.pop(url, None)
+
+    def is_cached(self, url):
+        """Check whether a URL's media is already on disk."""
+        return self.cache.contains(url)
+
+    def pending(self):
+        """Get the number of queued or running downloads."""
+        return len(self._pending)
+
+    def wait(self, timeout=None):
+        """Block until the currently queued downloads finish."""
+        with self._lock:
+            futures = list(self._pending.values())
+        wait(futures, timeout=timeout)
+
+    def shutdown(self):
+        """Stop the download pool without waiting for queued downloads."""
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+
+def create_media_prefetcher(config, post_handler):
+    """
+    Create the prefetcher for a post handler's media cache.
+
+    Args:
+        config: Application configuration
+        post_handler: PostHandler whose cache publishing reads from
+
+    Returns:
+        MediaPrefetcher: Prefetcher, or None when the cache or prefetching is disabled
+    """
+    cache = post_handler.get_media_cache()
+    if not cache or not config.get('MEDIA_PREFETCH_MINUTES'):
+        return None
+    return MediaPrefetcher(cache, config.get('MEDIA_PREFETCH_WORKERS', 4), post_handler.get_transcoder())
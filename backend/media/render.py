@@ -0,0 +1,216 @@
+"""
+Text-to-image rendering for caption-only posts.
+
+Instagram needs an image for every post, so a post with only a caption is
+published as the caption drawn on a plain background. Rendered images are
+stored in the media cache under the hash of the text and template, so the
+same caption is drawn once however often it is posted, and concurrent
+renders never share a temp file. Fonts are loaded once per process.
+
+Single captions are drawn on the calling thread (a few milliseconds each);
+batches are spread over a process pool.
+"""
+import functools
+import hashlib
+import io
+import logging
+import multiprocessing
+import os
+import threading
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+
+logger = logging.getLogger(__name__)
+
+TextTemplate = namedtuple('TextTemplate', [
+    'name',         # Cache key suffix; change it whenever the settings change
+    'width',
+    'height',
+    'background',
+    'color',
+    'fonts',        # TrueType files to try in order; Pillow's default font if none load
+    'font_size',
+    'top',          # y of the first line
+    'line_height',
+    'max_lines',
+    'quality',      # JPEG quality
+])
+
+DEFAULT_TEMPLATE = TextTemplate('caption-1080', 1080, 1080, 'white', 'black',
+                                ('arial.ttf', 'DejaVuSans.ttf'), 48, 400, 60, 5, 90)
+
+
+@functools.lru_cache(maxsize=None)
+def load_font(fonts, size):
+    """Load the first available font of a template; cached per process."""
+    from PIL import ImageFont
+
+    for name in fonts:
+        try:
+            return ImageFont.truetype(name, size)
+        except OSError:
+            continue
+    return ImageFont.load_default(size)
+
+
+def render_text_image(text, template=DEFAULT_TEMPLATE):
+    """
+    Draw text centered line by line on a blank image.
+
+    Runs in worker processes for batches, so it only takes picklable arguments.
+
+    Args:
+        text: Caption; blank lines are skipped and at most max_lines are drawn
+        template: TextTemplate
+
+    Returns:
+        bytes: JPEG image
+    """
+    from PIL import Image, ImageDraw
+
+    font = load_font(template.fonts, template.font_size)
+    image = Image.new('RGB', (template.width, template.height), color=template.background)
+    draw = ImageDraw.Draw(image)
+
+    y_pos = template.top
+    for line in text.split('\n')[:template.max_lines]:
+        if line.strip():
+            left, _, right, _ = draw.textbbox((0, 0), line, font=font)
+            draw.text(((template.width - (right - left)) // 2, y_pos), line, fill=template.color, font=font)
+            y_pos += template.line_height
+
+    buffer = io.BytesIO()
+    image.save(buffer, 'JPEG', quality=template.quality)
+    return buffer.getvalue()
+
+
+class TextRenderer:
+    """
+    Renders captions to images and caches them in a MediaCache.
+    """
+
+    def __init__(self, cache, max_workers=2, template=DEFAULT_TEMPLATE):
+        """
+        Initialize the renderer.
+
+        Args:
+            cache: MediaCache holding rendered images
+            max_workers: Rendering processes for render_many()
+            template: TextTemplate
+        """
+        self.cache = cache
+        self.max_workers = max_workers
+        self.template = template
+        self.stats = {'rendered': 0, 'reused': 0}
+        self.executor = None
+        self._lock = threading.Lock()
+        self._key_locks = {}
+
+    def _get_executor(self):
+        """Get the process pool, starting it on first use."""
+        with self._lock:
+            if self.executor is None:
+                # spawn: forking a process full of web server threads can deadlock
+                self.executor = ProcessPoolExecutor(max_workers=self.max_workers,
+                                                    mp_context=multiprocessing.get_context('spawn'))
+            return self.executor
+
+    def render_key(self, text):
+        """Get the cache key of a caption's image."""
+        digest = hashlib.sha256(f"{self.template.name}\0{text}".encode()).hexdigest()
+        return f"{digest}-{self.template.name}"
+
+    @contextmanager
+    def image(self, text):
+        """
+        Context manager yielding the path of a caption's image.
+
+        The image is protected from eviction until the block exits.
+
+        Args:
+            text: Caption
+        """
+        key = self.render_key(text)
+        path = self._ensure(key, text, pin=True)
+        try:
+            yield path
+        finally:
+            self.cache.unpin(key)
+
+    def render(self, text):
+        """
+        Render a caption unless it is cached.
+
+        Returns:
+            str: Path of the image
+        """
+        return self._ensure(self.render_key(text), text, pin=False)
+
+    def render_many(self, texts):
+        """
+        Render captions in the process pool, skipping cached ones.
+
+        Args:
+            texts: Captions
+
+        Returns:
+            list: Image paths in the order of texts
+        """
+        keys = [self.render_key(text) for text in texts]
+        missing = {}
+        for key, text in zip(keys, texts):
+            if self.cache.get_derived(key):
+                self.stats['reused'] += 1
+            else:
+                missing.setdefault(key, text)
+
+        if missing:
+            executor = self._get_executor()
+            futures = {key: executor.submit(render_text_image, text, self.template)
+                       for key, text in missing.items()}
+            for key, future in futures.items():
+                self._store(key, future.result(), pin=False)
+            logger.info(f"Rendered {len(missing)} caption images")
+        return [self.cache.get_derived(key) for key in keys]
+
+    def _ensure(self, key, text, pin):
+        """Return the image path, rendering under a per-key lock."""
+        path = self.cache.get_derived(key, pin=pin)
+        if path:
+            self.stats['reused'] += 1
+            return path
+
+        with self._lock:
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+        with key_lock:
+            try:
+                # Another thread may have rendered it while we waited
+                path = self.cache.get_derived(key, pin=pin)
+                if path:
+                    self.stats['reused'] += 1
+                    return path
+                return self._store(key, render_text_image(text, self.template), pin)
+            finally:
+                with self._lock:
+                    self._key_locks.pop(key, None)
+
+    def _store(self, key, data, pin):
+        """Write rendered bytes into the cache."""
+        tmp_path = self.cache.temp_path()
+        try:
+            with open(tmp_path, 'wb') as handle:
+                handle.write(data)
+            path = self.cache.store_derived(key, tmp_path, '.jpg', pin=pin)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+        self.stats['rendered'] += 1
+        return path
+
+    def shutdown(self):
+        """Stop the rendering processes."""
+        with self._lock:
+            if self.executor:
+                self.executor.shutdown(wait=False, cancel_futures=True)
+                self.executor = None
@@ -0,0 +1,242 @@
+"""
+Per-platform image transcoding.
+
+Each platform gets a JPEG variant that satisfies its limits: Instagram at
+most 1080 px wide and cropped into its allowed 4:5 to 1.91:1 aspect ratios,
+Twitter and Facebook scaled and recompressed under their pixel and file size
+limits. Variants are produced once per (content hash, profile) and stored in
+the media cache next to the original, so the same image is transcoded once no
+matter how many posts or users publish it.
+
+Resizing is CPU-bound, so it runs in a process pool rather than on the
+scheduler's publisher threads. Files Pillow cannot read (video) and animated
+images are passed through unchanged.
+"""
+import hashlib
+import io
+import logging
+import multiprocessing
+import os
+import threading
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+
+logger = logging.getLogger(__name__)
+
+ImageProfile = namedtuple('ImageProfile', [
+    'name',         # Cache key suffix; change it whenever the settings change
+    'max_width',
+    'max_height',
+    'min_aspect',   # width / height bounds; None for no crop
+    'max_aspect',
+    'max_bytes',
+    'quality',      # Starting JPEG quality
+])
+
+PROFILES = {
+    'instagram': ImageProfile('instagram-1080', 1080, 1350, 4 / 5, 1.91, 8 * 1024 ** 2, 90),
+    'twitter': ImageProfile('twitter-4096', 4096, 4096, None, None, 5 * 1024 ** 2, 90),
+    'facebook': ImageProfile('facebook-2048', 2048, 2048, None, None, 4 * 1024 ** 2, 90),
+}
+
+MIN_QUALITY = 60
+
+
+def crop_to_aspect(image, min_aspect, max_aspect):
+    """Center-crop an image into an aspect ratio range."""
+    width, height = image.size
+    aspect = width / height
+    if min_aspect and aspect < min_aspect:
+        new_height = int(width / min_aspect)
+        top = (height - new_height) // 2
+        return image.crop((0, top, width, top + new_height))
+    if max_aspect and aspect > max_aspect:
+        new_width = int(height * max_aspect)
+        left = (width - new_width) // 2
+        return image.crop((left, 0, left + new_width, height))
+    return image
+
+
+def transcode_image(source_path, dest_path, profile):
+    """
+    Write a JPEG of source_path that satisfies profile.
+
+    Runs in a worker process, so it only takes picklable arguments.
+
+    Args:
+        source_path: Original image
+        dest_path: Output file
+        profile: ImageProfile
+
+    Returns:
+        bool: False if the source is not a still image Pillow can read
+    """
+    from PIL import Image, ImageOps, UnidentifiedImageError
+
+    try:
+        image = Image.open(source_path)
+    except UnidentifiedImageError:
+        return False
+    with image:
+        if getattr(image, 'is_animated', False):
+            return False
+        image = ImageOps.exif_transpose(image)
+        if image.mode in ('RGBA', 'LA', 'P'):
+            # Flatten transparency onto white; JPEG has no alpha channel
+            rgba = image.convert('RGBA')
+            image = Image.new('RGB', rgba.size, 'white')
+            image.paste(rgba, mask=rgba.getchannel('A'))
+        elif image.mode != 'RGB':
+            image = image.convert('RGB')
+        image = crop_to_aspect(image, profile.min_aspect, profile.max_aspect)
+        image.thumbnail((profile.max_width, profile.max_height), Image.LANCZOS)
+
+        quality = profile.quality
+        while True:
+            buffer = io.BytesIO()
+            image.save(buffer, 'JPEG', quality=quality, optimize=True, progressive=True)
+            if buffer.tell() <= profile.max_bytes or min(image.size) <= 64:
+                break
+            if quality > MIN_QUALITY:
+                quality -= 10
+            else:
+                image = image.resize((int(image.width * 0.8), int(image.height * 0.8)), Image.LANCZOS)
+
+    with open(dest_path, 'wb') as handle:
+        handle.write(buffer.getvalue())
+    return True
+
+
+class MediaTranscoder:
+    """
+    Produces and caches per-platform variants of cached media.
+    """
+
+    def __init__(self, cache, max_workers=2, profiles=None):
+        """
+        Initialize the transcoder.
+
+        Args:
+            cache: MediaCache holding originals and variants
+            max_workers: Transcoding processes
+            profiles: Platform -> ImageProfile (defaults to PROFILES)
+        """
+        self.cache = cache
+        self.max_workers = max_workers
+        self.profiles = profiles or PROFILES
+        self.stats = {'transcoded': 0, 'reused': 0, 'passed_through': 0}
+        self.executor = None
+        self._lock = threading.Lock()
+        self._key_locks = {}
+        self._not_images = set()  # content hashes Pillow cannot transcode
+
+    def _get_executor(self):
+        """Get the process pool, starting it on first use."""
+        with self._lock:
+            if self.executor is None:
+                # spawn: forking a process full of scheduler threads can deadlock
+                self.executor = ProcessPoolExecutor(max_workers=self.max_workers,
+                                                    mp_context=multiprocessing.get_context('spawn'))
+            return self.executor
+
+    def variant_key(self, digest, platform):
+        """Get the cache key of a platform variant, or None if the platform has no profile."""
+        profile = self.profiles.get(platform)
+        return f"{digest}-{profile.name}" if profile else None
+
+    def has_variant(self, digest, platform):
+        """Check whether a platform variant is ready, or none is needed."""
+        key = self.variant_key(digest, platform)
+        return key is None or digest in self._not_images or self.cache.has(key)
+
+    @contextmanager
+    def variant(self, source_path, platform):
+        """
+        Context manager yielding the file to upload to a platform.
+
+        The variant is protected from eviction until the block exits. The
+        source itself is yielded when no transcoding applies.
+
+        Args:
+            source_path: Local original, normally from MediaCache.local_path()
+            platform: Platform name
+        """
+        key, path = self._ensure(source_path, platform, pin=True)
+        try:
+            yield path
+        finally:
+            if key:
+                self.cache.unpin(key)
+
+    def prepare(self, source_path, platform):
+        """
+        Produce a platform variant ahead of publishing.
+
+        Returns:
+            str: Path of the variant (or the source if none applies)
+        """
+        return self._ensure(source_path, platform, pin=False)[1]
+
+    def _ensure(self, source_path, platform, pin):
+        """Return (pinned key or None, path), transcoding under a per-variant lock."""
+        profile = self.profiles.get(platform)
+        if not profile:
+            return None, source_path
+        digest = self._source_digest(source_path)
+        if digest in self._not_images:
+            return None, source_path
+        key = f"{digest}-{profile.name}"
+
+        path = self.cache.get_derived(key, pin=pin)
+        if path:
+            self.stats['reused'] += 1
+            return (key if pin else None), path
+
+        with self._lock:
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+        with key_lock:
+            try:
+                # Another thread may have produced it while we waited
+                path = self.cache.get_derived(key, pin=pin)
+                if path:
+                    self.stats['reused'] += 1
+                    return (key if pin else None), path
+
+                tmp_path = self.cache.temp_path()
+                try:
+                    transcoded = self._get_executor().submit(transcode_image, source_path, tmp_path,
+                                                             profile).result()
+                    if not transcoded:
+                        self._not_images.add(digest)
+                        self.stats['passed_through'] += 1
+                        return None, source_path
+                    path = self.cache.store_derived(key, tmp_path, '.jpg', pin=pin)
+                finally:
+                    if os.path.exists(tmp_path):
+                        os.remove(tmp_path)
+                self.stats['transcoded'] += 1
+                logger.info(f"Transcoded {os.path.basename(source_path)} for {platform}")
+                return (key if pin else None), path
+            finally:
+                with self._lock:
+                    self._key_locks.pop(key, None)
+
+    def _source_digest(self, source_path):
+        """Content hash of a source file; cached originals are named by it."""
+        name = os.path.basename(source_path).split('.', 1)[0]
+        if len(name) == 64 and os.path.dirname(os.path.dirname(source_path)) == os.path.join(
+                self.cache.root, 'objects'):
+            return name
+        digest = hashlib.sha256()
+        with open(source_path, 'rb') as handle:
+            for chunk in iter(lambda: handle.read(1024 * 1024), b''):
+                digest.update(chunk)
+        return digest.hexdigest()
+
+    def shutdown(self):
+        """Stop the transcoding processes."""
+        with self._lock:
+            if self.executor:
+                self.executor.shutdown(wait=False, cancel_futures=True)
+                self.executor = None
@@ -0,0 +1,118 @@
+"""
+Chunked media upload helpers.
+
+Media files are read through a memory map one chunk at a time, so an upload
+holds at most one chunk in memory however large the file is. The Graph API
+page video upload (upload_phase start / transfer / finish) is implemented
+here on top of any client with facebook-sdk's GraphAPI.request() signature,
+which both facebook.GraphAPI and the fake Graph client provide. Twitter's
+INIT / APPEND / FINALIZE upload is done by the client's media_upload(chunked=True).
+"""
+import mimetypes
+import mmap
+import os
+
+DEFAULT_CHUNK_SIZE = 4 * 1024 * 1024
+
+
+class MediaSource:
+    """
+    Read-only, memory-mapped view of a media file.
+
+    Usage:
+        with MediaSource(path) as source:
+            for offset, chunk in source.chunks(1024 * 1024):
+                ...
+    """
+
+    def __init__(self, path):
+        """
+        Open a file.
+
+        Args:
+            path: Local media file
+        """
+        self.path = path
+        self.size = os.path.getsize(path)
+        self.media_type = media_type(path)
+        self._file = None
+        self._map = None
+
+    def __enter__(self):
+        self._file = open(self.path, 'rb')
+        if self.size:
+            # Pages are loaded on demand and dropped by the OS, not held by us
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        return self
+
+    def __exit__(self, *exc_info):
+        if self._map:
+            self._map.close()
+        self._file.close()
+
+    def read(self, offset, length):
+        """Get up to length bytes starting at offset."""
+        if not self._map:
+            return b''
+        return self._map[offset:offset + length]
+
+    def chunks(self, chunk_size=DEFAULT_CHUNK_SIZE):
+        """Yield (offset, bytes) for consecutive chunks of the file."""
+        for offset in range(0, self.size, chunk_size):
+            yield offset, self.read(offset, chunk_size)
+
+
+def media_type(path):
+    """Guess a file's MIME type from its name."""
+    return mimetypes.guess_type(path)[0] or 'application/octet-stream'
+
+
+def is_video(path):
+    """Check whether a file is a video by its name."""
+    return media_type(path).startswith('video/')
+
+
+def twitter_media_category(path):
+    """Get the Twitter media_category for a file."""
+    kind = media_type(path)
+    if kind == 'image/gif':
+        return 'tweet_gif'
+    return 'tweet_video' if kind.startswith('video/') else 'tweet_image'
+
+
+def upload_page_video(client, page_id, path, chunk_size=DEFAULT_CHUNK_SIZE, options=None, **fields):
+    """
+    Publish a video to a Facebook page with the chunked upload protocol.
+
+    The server names the byte range it wants next, so an interrupted upload
+    can resume from the last acknowledged offset. Ranges larger than
+    chunk_size are sent in chunk_size pieces.
+
+    Args:
+        client: GraphAPI-like client with request(path, args, post_args, files, method)
+        page_id: Page to publish to
+        path: Local video file
+        chunk_size: Largest piece sent per request
+        options: Extra keyword arguments for the finish request (see delivery_options)
+        **fields: Extra fields for the finish phase, e.g. description
+
+    Returns:
+        dict: Response of the finish phase
+    """
+    endpoint = f'{page_id}/videos'
+    with MediaSource(path) as source:
+        session = client.request(endpoint, post_args={'upload_phase': 'start', 'file_size': source.size},
+                                 method='POST')
+        session_id = session['upload_session_id']
+        start, end = int(session['start_offset']), int(session['end_offset'])
+        while start < end:
+            piece = source.read(start, min(end - start, chunk_size))
+            response = client.request(
+                endpoint,
+                post_args={'upload_phase': 'transfer', 'upload_session_id': session_id, 'start_offset': start},
+                files={'video_file_chunk': (os.path.basename(path), piece, source.media_type)},
+                method='POST'
+            )
+            start, end = int(response['start_offset']), int(response['end_offset'])
+        return client.request(endpoint, post_args=dict(fields, upload_phase='finish', upload_session_id=session_id),
+                              method='POST', **(options or {}))
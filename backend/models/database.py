@@ -1,8 +1,12 @@
 """
 Database models for the Social Media Automation Bot.
 """
+import logging
 from datetime import datetime
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import inspect, literal, text
+
+logger = logging.getLogger(__name__)
 
 db = SQLAlchemy()
 
@@ -68,10 +72,21 @@ class ScheduledPost(db.Model):
     content = db.Column(db.Text, nullable=False)
     platforms = db.Column(db.String(200))  # Comma-separated list
     scheduled_time = db.Column(db.DateTime, nullable=False)
-    status = db.Column(db.String(20), default='pending')  # pending, posted, failed
+    status = db.Column(db.String(20), default='pending')  # pending, processing, posted, failed
     media_url = db.Column(db.String(500))
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     posted_at = db.Column(db.DateTime)
+    flex_window_seconds = db.Column(db.Integer, default=0)  # 0 = publish exactly at scheduled_time
+    planned_time = db.Column(db.DateTime)  # Load-smoothed publish time within the flexibility window
+    delivered_platforms = db.Column(db.String(200))  # Comma-separated platforms already published
+    claimed_by = db.Column(db.String(100))  # Scheduler holding the publish lease
+    lease_expires_at = db.Column(db.DateTime)
+    recurrence_id = db.Column(db.Integer, db.ForeignKey('recurring_schedules.id'))  # Rule that generated the post
+    
+    __table_args__ = (
+        db.Index('ix_scheduled_posts_status_time', 'status', 'scheduled_time'),
+        db.UniqueConstraint('recurrence_id', 'scheduled_time', name='uq_scheduled_posts_occurrence'),
+    )
     
     def to_dict(self):
         """Convert scheduled post to dictionary."""
@@ -83,10 +98,76 @@ class ScheduledPost(db.Model):
             'status': self.status,
             'media_url': self.media_url,
             'created_at': self.created_at.isoformat(),
-            'posted_at': self.posted_at.isoformat() if self.posted_at else None
+            'posted_at': self.posted_at.isoformat() if self.posted_at else None,
+            'flexibility_minutes': (self.flex_window_seconds or 0) // 60,
+            'planned_time': self.planned_time.isoformat() if self.planned_time else None,
+            'delivered_platforms': self.delivered_platforms.split(',') if self.delivered_platforms else [],
+            'recurrence_id': self.recurrence_id
         }
 
 
+class RecurringSchedule(db.Model):
+    """Recurrence rule materialized into scheduled posts a short horizon ahead."""
+    __tablename__ = 'recurring_schedules'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    content = db.Column(db.Text, nullable=False)
+    platforms = db.Column(db.String(200))  # Comma-separated list
+    media_url = db.Column(db.String(500))
+    rule = db.Column(db.String(500), nullable=False)  # RRULE or 5-field cron expression (UTC)
+    starts_at = db.Column(db.DateTime, nullable=False)
+    ends_at = db.Column(db.DateTime)
+    next_run_at = db.Column(db.DateTime, index=True)  # First occurrence not yet materialized; NULL when exhausted
+    is_active = db.Column(db.Boolean, default=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    posts = db.relationship('ScheduledPost', backref='recurrence', lazy=True)
+    
+    def to_dict(self):
+        """Convert recurring schedule to dictionary."""
+        return {
+            'id': self.id,
+            'content': self.content,
+            'platforms': self.platforms.split(',') if self.platforms else [],
+            'media_url': self.media_url,
+            'rule': self.rule,
+            'starts_at': self.starts_at.isoformat(),
+            'ends_at': self.ends_at.isoformat() if self.ends_at else None,
+            'next_run_at': self.next_run_at.isoformat() if self.next_run_at else None,
+            'is_active': self.is_active,
+            'created_at': self.created_at.isoformat()
+        }
+
+
+class IdempotencyKey(db.Model):
+    """Stored responses for requests sent with an Idempotency-Key header."""
+    __tablename__ = 'idempotency_keys'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    key = db.Column(db.String(255), nullable=False)
+    request_hash = db.Column(db.String(64), nullable=False)
+    status_code = db.Column(db.Integer)  # NULL while the first request is in progress
+    response_body = db.Column(db.Text)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    __table_args__ = (
+        db.UniqueConstraint('user_id', 'key', name='uq_idempotency_keys_user_key'),
+    )
+
+
+class PlatformDelivery(db.Model):
+    """Attempts to publish a post to one platform, keyed by their delivery key."""
+    __tablename__ = 'platform_deliveries'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    key = db.Column(db.String(255), unique=True, nullable=False)  # delivery_key(post_id, platform)
+    status = db.Column(db.String(20), default='pending')  # pending (outcome unknown until finished), delivered
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    delivered_at = db.Column(db.DateTime)
+
+
 class Analytics(db.Model):
     """Analytics data for posts."""
     __tablename__ = 'analytics'
@@ -115,3 +196,59 @@ class Analytics(db.Model):
             'engagement_rate': self.engagement_rate,
             'recorded_at': self.recorded_at.isoformat()
         }
+
+
+def upgrade_schema(engine):
+    """
+    Bring tables created by an older release up to date with the models.
+
+    create_all() only creates missing tables, so columns, indexes and unique
+    constraints added to an existing table are created here. Added columns
+    are nullable and take their scalar default on existing rows. Unique
+    constraints are created as unique indexes of the same name, since SQLite
+    cannot add constraints to a table. Safe to run on every start.
+
+    Args:
+        engine: SQLAlchemy engine
+
+    Returns:
+        list: Names of the columns added, as table.column
+    """
+    added = []
+    inspector = inspect(engine)
+    existing_tables = set(inspector.get_table_names())
+    with engine.begin() as conn:
+        for table in db.metadata.sorted_tables:
+            if table.name not in existing_tables:
+                continue
+            columns = {column['name'] for column in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name in columns:
+                    continue
+                conn.execute(text(f"ALTER TABLE {table.name} ADD COLUMN {_column_ddl(column, engine.dialect)}"))
+                added.append(f"{table.name}.{column.name}")
+                logger.info(f"Added column {table.name}.{column.name}")
+
+            indexes = {index['name'] for index in inspector.get_indexes(table.name)}
+            indexes.update(constraint['name'] for constraint in inspector.get_unique_constraints(table.name))
+            for index in table.indexes:
+                if index.name not in indexes:
+                    index.create(conn)
+                    logger.info(f"Created index {index.name}")
+            for constraint in table.constraints:
+                if isinstance(constraint, db.UniqueConstraint) and constraint.name and constraint.name not in indexes:
+                    column_names = ', '.join(column.name for column in constraint.columns)
+                    conn.execute(text(f"CREATE UNIQUE INDEX {constraint.name} ON {table.name} ({column_names})"))
+                    logger.info(f"Created unique index {constraint.name}")
+    return added
+
+
+def _column_ddl(column, dialect):
+    """Build the ADD COLUMN clause of a model column."""
+    ddl = f"{column.name} {column.type.compile(dialect=dialect)}"
+    if column.default is not None and column.default.is_scalar:
+        default = literal(column.default.arg, column.type)
+        ddl += f" DEFAULT {default.compile(dialect=dialect, compile_kwargs={'literal_binds': True})}"
+    for foreign_key in column.foreign_keys:
+        ddl += f" REFERENCES {foreign_key.column.table.name} ({foreign_key.column.name})"
+    return ddl
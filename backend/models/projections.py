@@ -0,0 +1,105 @@
+"""
+Column projections that turn raw result tuples into response dictionaries.
+
+Projections select only the columns an endpoint returns and zip each row
+with the keys, skipping ORM instance construction; only the few columns with
+a converter are touched again. Datetimes are left as-is for the response
+serializer.
+"""
+from sqlalchemy import select
+
+from backend.models.database import ScheduledPost, SocialAccount, Analytics
+
+
+def split_csv(value):
+    """Split a comma-separated column value into a list."""
+    return value.split(',') if value else []
+
+
+def seconds_to_minutes(value):
+    """Convert a nullable seconds column to whole minutes."""
+    return (value or 0) // 60
+
+
+class RowProjection:
+    """
+    Maps selected columns to dictionary keys.
+    """
+
+    def __init__(self, fields):
+        """
+        Initialize the projection.
+
+        Args:
+            fields: List of (key, column) or (key, column, converter) tuples
+        """
+        self.keys = tuple(field[0] for field in fields)
+        self.columns = [field[1] for field in fields]
+        self.converters = tuple((field[0], field[2]) for field in fields if len(field) > 2 and field[2])
+
+    def project(self, row):
+        """
+        Convert one result row to a dictionary.
+
+        Args:
+            row: Column tuple in projection order
+
+        Returns:
+            dict: Row dictionary
+        """
+        record = dict(zip(self.keys, row))
+        for key, convert in self.converters:
+            record[key] = convert(record[key])
+        return record
+
+    def select(self):
+        """Build a SELECT statement for the projected columns."""
+        return select(*self.columns)
+
+    def to_dicts(self, rows):
+        """
+        Convert result rows to dictionaries.
+
+        Args:
+            rows: Iterable of column tuples in projection order
+
+        Returns:
+            list: Row dictionaries
+        """
+        return list(map(self.project, rows))
+
+
+POST_PROJECTION = RowProjection([
+    ('id', ScheduledPost.id),
+    ('content', ScheduledPost.content),
+    ('platforms', ScheduledPost.platforms, split_csv),
+    ('scheduled_time', ScheduledPost.scheduled_time),
+    ('status', ScheduledPost.status),
+    ('media_url', ScheduledPost.media_url),
+    ('created_at', ScheduledPost.created_at),
+    ('posted_at', ScheduledPost.posted_at),
+    ('flexibility_minutes', ScheduledPost.flex_window_seconds, seconds_to_minutes),
+    ('planned_time', ScheduledPost.planned_time),
+    ('delivered_platforms', ScheduledPost.delivered_platforms, split_csv),
+    ('recurrence_id', ScheduledPost.recurrence_id),
+])
+
+ACCOUNT_PROJECTION = RowProjection([
+    ('id', SocialAccount.id),
+    ('platform', SocialAccount.platform),
+    ('account_name', SocialAccount.account_name),
+    ('is_active', SocialAccount.is_active),
+    ('created_at', SocialAccount.created_at),
+])
+
+ANALYTICS_PROJECTION = RowProjection([
+    ('id', Analytics.id),
+    ('post_id', Analytics.post_id),
+    ('platform', Analytics.platform),
+    ('likes', Analytics.likes),
+    ('shares', Analytics.shares),
+    ('comments', Analytics.comments),
+    ('reach', Analytics.reach),
+    ('engagement_rate', Analytics.engagement_rate),
+    ('recorded_at', Analytics.recorded_at),
+])
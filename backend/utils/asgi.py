@@ -0,0 +1,230 @@
+"""
+ASGI adapter for serving the Flask application from an asyncio server.
+
+Requests are translated to WSGI environs and handled on a bounded thread
+pool, so blocking database and platform calls never stall the event loop
+and concurrency is capped at the pool size. Long-lived streaming responses
+(server-sent events) are iterated on a separate pool once their handler has
+returned, so open event streams never starve ordinary requests.
+
+Routes registered with add_route() are served by a coroutine instead of the
+WSGI app, for endpoints that await platform calls rather than block on them.
+"""
+import asyncio
+import logging
+import sys
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+
+logger = logging.getLogger(__name__)
+
+_END = object()
+
+# Response types iterated on the stream pool instead of the request pool
+STREAMING_TYPES = ('text/event-stream',)
+
+
+class WsgiToAsgi:
+    """
+    Wraps a WSGI application as an ASGI 3 application.
+    """
+
+    def __init__(self, wsgi_app, max_workers=8, max_streams=256, spool_size=1024 * 1024, on_shutdown=None):
+        """
+        Initialize the adapter.
+
+        Args:
+            wsgi_app: WSGI application callable
+            max_workers: Maximum requests handled concurrently
+            max_streams: Maximum streaming responses iterated concurrently
+            spool_size: Request bodies larger than this are spooled to disk
+            on_shutdown: Optional callable run on ASGI lifespan shutdown
+        """
+        self.wsgi_app = wsgi_app
+        self.max_workers = max_workers
+        self.spool_size = spool_size
+        self.on_shutdown = on_shutdown
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='asgi-worker')
+        self.stream_executor = ThreadPoolExecutor(max_workers=max_streams, thread_name_prefix='asgi-stream')
+        self.routes = {}
+
+    async def __call__(self, scope, receive, send):
+        """Handle an ASGI connection."""
+        if scope['type'] == 'lifespan':
+            await self._lifespan(receive, send)
+        elif scope['type'] == 'http':
+            await self._handle_http(scope, receive, send)
+        else:
+            raise NotImplementedError(f"Unsupported ASGI scope type: {scope['type']}")
+
+    def add_route(self, method, path, handler):
+        """
+        Serve a route with a coroutine instead of the WSGI app.
+
+        Args:
+            method: HTTP method
+            path: Exact request path
+            handler: Coroutine function taking the WSGI environ and returning
+                a werkzeug Response; blocking steps belong on run_in_executor
+        """
+        self.routes[(method, path)] = handler
+
+    async def run_in_executor(self, func, *args):
+        """Run a blocking callable on the adapter's bounded executor."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, func, *args)
+
+    async def run_in_stream_executor(self, func, *args):
+        """Run a blocking step of a streaming response on the stream pool."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.stream_executor, func, *args)
+
+    async def _lifespan(self, receive, send):
+        """Handle ASGI lifespan startup and shutdown events."""
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                try:
+                    if self.on_shutdown:
+                        await self.run_in_executor(self.on_shutdown)
+                    self.executor.shutdown(wait=False)
+                    self.stream_executor.shutdown(wait=False, cancel_futures=True)
+                except Exception as e:
+                    logger.error(f"Error during ASGI shutdown: {str(e)}")
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+    async def _handle_http(self, scope, receive, send):
+        """Handle a single HTTP request."""
+        body = tempfile.SpooledTemporaryFile(max_size=self.spool_size)
+        while True:
+            message = await receive()
+            if message['type'] == 'http.disconnect':
+                body.close()
+                return
+            body.write(message.get('body', b''))
+            if not message.get('more_body'):
+                break
+        body.seek(0)
+
+        disconnected = asyncio.Event()
+
+        async def watch_disconnect():
+            while (await receive())['type'] != 'http.disconnect':
+                pass
+            disconnected.set()
+
+        watcher = asyncio.ensure_future(watch_disconnect())
+        response = {}
+
+        def start_response(status, headers, exc_info=None):
+            if exc_info and response.get('started'):
+                raise exc_info[1].with_traceback(exc_info[2])
+            response['status'] = int(status.split(' ', 1)[0])
+            response['headers'] = [(name.lower().encode('latin1'), value.encode('latin1'))
+                                   for name, value in headers]
+            return lambda data: None
+
+        environ = self.build_environ(scope, body)
+        handler = self.routes.get((scope['method'], scope['path']))
+        result = None
+        run = self.run_in_executor
+        try:
+            if handler:
+                await self._send_response(await handler(environ), send)
+                return
+            result = await self.run_in_executor(self.wsgi_app, environ, start_response)
+            if self.is_streaming(response.get('headers', [])):
+                # The body may never end; keep it off the request pool
+                run = self.run_in_stream_executor
+            iterator = iter(result)
+            first = await run(next, iterator, _END)
+
+            response['started'] = True
+            await send({
+                'type': 'http.response.start',
+                'status': response['status'],
+                'headers': response['headers']
+            })
+
+            chunk = first
+            while chunk is not _END and not disconnected.is_set():
+                if chunk:
+                    await send({'type': 'http.response.body', 'body': chunk, 'more_body': True})
+                chunk = await run(next, iterator, _END)
+
+            if not disconnected.is_set():
+                await send({'type': 'http.response.body', 'body': b'', 'more_body': False})
+        finally:
+            watcher.cancel()
+            if result is not None and hasattr(result, 'close'):
+                await run(result.close)
+            body.close()
+
+    @staticmethod
+    async def _send_response(response, send):
+        """Send a complete werkzeug Response returned by a route coroutine."""
+        await send({
+            'type': 'http.response.start',
+            'status': response.status_code,
+            'headers': [(name.lower().encode('latin1'), value.encode('latin1'))
+                        for name, value in response.headers.to_wsgi_list()]
+        })
+        await send({'type': 'http.response.body', 'body': response.get_data(), 'more_body': False})
+
+    @staticmethod
+    def is_streaming(headers):
+        """Check whether response headers describe a long-lived stream."""
+        for name, value in headers:
+            if name == b'content-type':
+                return value.split(b';', 1)[0].strip().decode('latin1') in STREAMING_TYPES
+        return False
+
+    @staticmethod
+    def build_environ(scope, body):
+        """
+        Build a WSGI environ dictionary from an ASGI HTTP scope.
+
+        Args:
+            scope: ASGI connection scope
+            body: File-like object with the request body
+
+        Returns:
+            dict: WSGI environ
+        """
+        server = scope.get('server') or ('localhost', 80)
+        environ = {
+            'REQUEST_METHOD': scope['method'],
+            'SCRIPT_NAME': scope.get('root_path', '').encode('utf8').decode('latin1'),
+            'PATH_INFO': scope['path'].encode('utf8').decode('latin1'),
+            'QUERY_STRING': scope.get('query_string', b'').decode('latin1'),
+            'SERVER_NAME': server[0],
+            'SERVER_PORT': str(server[1] or 80),
+            'SERVER_PROTOCOL': f"HTTP/{scope.get('http_version', '1.1')}",
+            'wsgi.version': (1, 0),
+            'wsgi.url_scheme': scope.get('scheme', 'http'),
+            'wsgi.input': body,
+            'wsgi.errors': sys.stderr,
+            'wsgi.multithread': True,
+            'wsgi.multiprocess': True,
+            'wsgi.run_once': False,
+        }
+        if scope.get('client'):
+            environ['REMOTE_ADDR'] = scope['client'][0]
+            environ['REMOTE_PORT'] = str(scope['client'][1])
+
+        for name, value in scope.get('headers', []):
+            name = name.decode('latin1')
+            value = value.decode('latin1')
+            if name == 'content-length':
+                key = 'CONTENT_LENGTH'
+            elif name == 'content-type':
+                key = 'CONTENT_TYPE'
+            else:
+                key = 'HTTP_' + name.upper().replace('-', '_')
+            if key in environ:
+                value = environ[key] + ',' + value
+            environ[key] = value
+        return environ
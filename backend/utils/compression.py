@@ -0,0 +1,226 @@
+"""
+Response compression and static asset caching for the Flask application.
+Compresses responses above a size threshold with brotli (when installed) or
+gzip, and serves static assets under content-hash URLs with long-lived
+cache headers.
+"""
+import gzip
+import hashlib
+import logging
+import os
+import threading
+import zlib
+
+from flask import request, url_for
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+logger = logging.getLogger(__name__)
+
+
+def compress(data, encoding, level=6):
+    """
+    Compress a byte string.
+
+    Args:
+        data: Bytes to compress
+        encoding: 'br' or 'gzip'
+        level: Compression level (gzip 1-9, brotli quality 0-11)
+
+    Returns:
+        bytes: Compressed data
+    """
+    if encoding == 'br':
+        return brotli.compress(data, quality=level)
+    return gzip.compress(data, compresslevel=level, mtime=0)
+
+
+def compress_stream(chunks, encoding, level=6):
+    """
+    Compress an iterable of chunks, flushing after each so clients can
+    decode streamed responses incrementally.
+
+    Args:
+        chunks: Iterable of bytes or str
+        encoding: 'br' or 'gzip'
+        level: Compression level
+
+    Yields:
+        bytes: Compressed chunks
+    """
+    if encoding == 'br':
+        compressor = brotli.Compressor(quality=level)
+        process, flush, finish = compressor.process, compressor.flush, compressor.finish
+    else:
+        compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+        process = compressor.compress
+        flush = lambda: compressor.flush(zlib.Z_SYNC_FLUSH)
+        finish = compressor.flush
+
+    try:
+        for chunk in chunks:
+            if isinstance(chunk, str):
+                chunk = chunk.encode()
+            data = process(chunk) + flush()
+            if data:
+                yield data
+        yield finish()
+    finally:
+        if hasattr(chunks, 'close'):
+            chunks.close()
+
+
+class Compressor:
+    """
+    Flask extension that compresses responses and versions static assets.
+    """
+
+    def __init__(self, app=None):
+        """
+        Initialize the compressor.
+
+        Args:
+            app: Optional Flask application to register with
+        """
+        self._static_cache = {}
+        self._hash_cache = {}
+        self._lock = threading.Lock()
+        self.app = None
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        """
+        Register the compressor with a Flask application.
+
+        Args:
+            app: Flask application
+        """
+        self.app = app
+        app.config.setdefault('COMPRESS_MIN_SIZE', 1024)
+        app.config.setdefault('COMPRESS_LEVEL', 6)
+        app.config.setdefault('COMPRESS_BR_LEVEL', 5)
+        app.config.setdefault('COMPRESS_MIMETYPES', [
+            'application/json', 'application/javascript', 'text/javascript',
+            'text/css', 'text/html', 'text/plain'
+        ])
+        app.config.setdefault('STATIC_MAX_AGE', 31536000)
+
+        app.after_request(self.after_request)
+        app.jinja_env.globals['asset_url'] = self.asset_url
+        app.compressor = self
+
+    def asset_url(self, filename):
+        """
+        Build a static asset URL that changes whenever the file content does.
+
+        Args:
+            filename: Path relative to the static folder
+
+        Returns:
+            str: URL with a content-hash version parameter
+        """
+        return url_for('static', filename=filename, v=self.asset_hash(filename))
+
+    def asset_hash(self, filename):
+        """Get a short content hash for a static file, cached by mtime."""
+        path = os.path.join(self.app.static_folder, filename)
+        try:
+            mtime = os.stat(path).st_mtime_ns
+        except OSError:
+            return None
+        cached = self._hash_cache.get(path)
+        if cached and cached[0] == mtime:
+            return cached[1]
+        with open(path, 'rb') as f:
+            digest = hashlib.sha256(f.read()).hexdigest()[:12]
+        self._hash_cache[path] = (mtime, digest)
+        return digest
+
+    def choose_encoding(self):
+        """Pick the best supported encoding from the request's Accept-Encoding."""
+        accepted = request.accept_encodings
+        if brotli is not None and accepted['br']:
+            return 'br'
+        if accepted['gzip']:
+            return 'gzip'
+        return None
+
+    def after_request(self, response):
+        """Apply cache headers and compression to a response."""
+        config = self.app.config
+        is_static = request.endpoint == 'static'
+
+        if is_static and response.status_code == 200:
+            self._set_static_cache_headers(response)
+
+        if (response.status_code != 200
+                or 'Content-Encoding' in response.headers
+                or response.mimetype not in config['COMPRESS_MIMETYPES']):
+            return response
+
+        encoding = self.choose_encoding()
+        response.vary.add('Accept-Encoding')
+        if encoding is None:
+            return response
+        level = config['COMPRESS_BR_LEVEL'] if encoding == 'br' else config['COMPRESS_LEVEL']
+
+        if is_static and response.direct_passthrough:
+            data = self._compressed_static(request.view_args['filename'], encoding, level)
+            if data is None:
+                return response
+            response.direct_passthrough = False
+            response.set_data(data)
+            etag, weak = response.get_etag()
+            if etag:
+                response.set_etag(f'{etag}-{encoding}', weak)
+                # The view compared If-None-Match with the file's own ETag, so
+                # a client revalidating its compressed copy never matched
+                response.make_conditional(request)
+                if response.status_code == 304:
+                    return response
+        elif response.is_streamed:
+            response.response = compress_stream(response.response, encoding, level)
+            response.headers.pop('Content-Length', None)
+        else:
+            data = response.get_data()
+            if len(data) < config['COMPRESS_MIN_SIZE']:
+                return response
+            response.set_data(compress(data, encoding, level))
+
+        response.headers['Content-Encoding'] = encoding
+        return response
+
+    def _set_static_cache_headers(self, response):
+        """Mark content-hash versioned assets as immutable."""
+        version = request.args.get('v')
+        if version and version == self.asset_hash(request.view_args['filename']):
+            response.cache_control.no_cache = None
+            response.cache_control.public = True
+            response.cache_control.max_age = self.app.config['STATIC_MAX_AGE']
+            response.cache_control.immutable = True
+
+    def _compressed_static(self, filename, encoding, level):
+        """Get the compressed form of a static file, cached until it changes."""
+        path = os.path.join(self.app.static_folder, filename)
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        if stat.st_size < self.app.config['COMPRESS_MIN_SIZE']:
+            return None
+
+        key = (path, encoding)
+        cached = self._static_cache.get(key)
+        if cached and cached[0] == stat.st_mtime_ns:
+            return cached[1]
+
+        with open(path, 'rb') as f:
+            data = compress(f.read(), encoding, level)
+        with self._lock:
+            self._static_cache[key] = (stat.st_mtime_ns, data)
+        logger.info(f"Cached {encoding} form of static asset {filename}")
+        return data
@@ -5,6 +5,7 @@ import hashlib
 import jwt
 from datetime import datetime, timedelta
 from functools import wraps
+from urllib.parse import urlparse
 from flask import request, jsonify
 import logging
 
@@ -96,13 +97,26 @@ def decode_token(token, secret_key):
         return None
 
 
-def require_auth(f):
+def require_auth(f=None, allow_query_token=False):
     """
     Decorator to require authentication for routes.
+    
+    Used bare (@require_auth) or with options (@require_auth(allow_query_token=True)).
+    
+    Args:
+        f: Route function
+        allow_query_token: Also accept the token as ?token=; only for routes
+            EventSource clients call, since they cannot set headers. Query
+            strings end up in access logs and browser history.
     """
+    if f is None:
+        return lambda route: require_auth(route, allow_query_token=allow_query_token)
+    
     @wraps(f)
     def decorated_function(*args, **kwargs):
         token = request.headers.get('Authorization')
+        if not token and allow_query_token:
+            token = request.args.get('token')
         
         if not token:
             return jsonify({'error': 'No token provided'}), 401
@@ -150,6 +164,26 @@ def validate_subscription(user, required_plan=None):
     return True, "Valid subscription"
 
 
+def validate_media_url(media_url):
+    """
+    Validate a user-supplied media URL.
+    
+    Only http(s) URLs are accepted; anything else could make the server
+    upload one of its own files. Hosts are checked when the media is fetched.
+    
+    Args:
+        media_url: URL from the request, or None
+        
+    Returns:
+        tuple: (is_valid, message)
+    """
+    if media_url is None:
+        return True, "No media"
+    if not isinstance(media_url, str) or urlparse(media_url).scheme not in ('http', 'https'):
+        return False, "media_url must be an http(s) URL"
+    return True, "Valid media URL"
+
+
 def format_error_response(message, status_code=400):
     """
     Format error response.
@@ -173,12 +207,15 @@ def format_success_response(data, message=None):
         message: Optional success message
         
     Returns:
-        dict: JSON response
+        Response: JSON response
     """
+    from flask import current_app
+    from backend.utils.serialization import get_serializer
+    
     response = {'success': True, 'data': data}
     if message:
         response['message'] = message
-    return jsonify(response)
+    return current_app.response_class(get_serializer().dumps(response), mimetype='application/json')
 
 
 def encrypt_credentials(credentials, secret_key):
@@ -237,3 +274,20 @@ def decrypt_credentials(encrypted_credentials, secret_key):
     except Exception as e:
         logger.error(f"Decryption error: {str(e)}")
         return encrypted_credentials  # Fallback to returning as-is
+
+
+def get_config_value(config, name, default=None):
+    """
+    Read a setting from a Flask config dict or a Config class.
+    
+    Args:
+        config: app.config or a Config object
+        name: Setting name
+        default: Value when unset
+        
+    Returns:
+        Setting value or default
+    """
+    if isinstance(config, dict):
+        return config.get(name, default)
+    return getattr(config, name, default)
@@ -0,0 +1,199 @@
+"""
+Idempotency-Key support for API routes.
+
+A client that retries a request with the same Idempotency-Key header gets
+the stored response of the first attempt instead of repeating its effects.
+Only successful (2xx) responses are stored: a rejected request had no effect,
+so the client may correct it and resend it under the same key. A key still
+reserved IDEMPOTENCY_LOCK_SECONDS after its request started belongs to a
+request that crashed, and is taken over by the next retry.
+
+DeliveryLog records platform deliveries by their idempotency key in the
+database, so a delivery finished before a restart or by another worker is
+not repeated.
+"""
+import hashlib
+import logging
+from datetime import datetime, timedelta
+from functools import wraps
+
+from flask import current_app, make_response, request
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm.exc import StaleDataError
+
+from backend.models.database import db, IdempotencyKey, PlatformDelivery
+from backend.utils.helpers import format_error_response
+
+logger = logging.getLogger(__name__)
+
+MAX_KEY_LENGTH = 255
+
+
+def request_fingerprint():
+    """Hash the method, path and body of the current request."""
+    digest = hashlib.sha256()
+    digest.update(request.method.encode())
+    digest.update(request.path.encode())
+    digest.update(request.get_data())
+    return digest.hexdigest()
+
+
+def idempotent(f):
+    """
+    Decorator that makes a route safe to retry with an Idempotency-Key header.
+
+    Must be applied below require_auth, since keys are scoped per user.
+    Requests without the header are handled normally.
+    """
+    @wraps(f)
+    def decorated_function(*args, **kwargs):
+        key = request.headers.get('Idempotency-Key')
+        if not key:
+            return f(*args, **kwargs)
+        if len(key) > MAX_KEY_LENGTH:
+            return format_error_response(f"Idempotency-Key must be at most {MAX_KEY_LENGTH} characters")
+
+        fingerprint = request_fingerprint()
+        ttl = timedelta(hours=current_app.config.get('IDEMPOTENCY_TTL_HOURS', 24))
+        lock = timedelta(seconds=current_app.config.get('IDEMPOTENCY_LOCK_SECONDS', 60))
+        existing = IdempotencyKey.query.filter_by(user_id=request.user_id, key=key).first()
+
+        now = datetime.utcnow()
+        if existing and (existing.created_at < now - ttl
+                         or existing.status_code is None and existing.created_at < now - lock):
+            # Expired, or reserved by a request that never finished
+            IdempotencyKey.query.filter_by(id=existing.id, status_code=existing.status_code).delete()
+            db.session.commit()
+            existing = None
+
+        if existing:
+            if existing.request_hash != fingerprint:
+                return format_error_response("Idempotency-Key was already used with a different request", 422)
+            if existing.status_code is None:
+                return format_error_response("A request with this Idempotency-Key is in progress", 409)
+            response = current_app.response_class(
+                existing.response_body, status=existing.status_code, mimetype='application/json'
+            )
+            response.headers['Idempotent-Replayed'] = 'true'
+            return response
+
+        # Reserve the key so concurrent retries see the request as in progress
+        record = IdempotencyKey(user_id=request.user_id, key=key, request_hash=fingerprint)
+        db.session.add(record)
+        try:
+            db.session.commit()
+        except IntegrityError:
+            db.session.rollback()
+            return format_error_response("A request with this Idempotency-Key is in progress", 409)
+
+        try:
+            response = make_response(f(*args, **kwargs))
+        except Exception:
+            db.session.rollback()
+            _release(record)
+            raise
+
+        if not 200 <= response.status_code < 300:
+            # Errors are not stored so a corrected or later retry is handled normally
+            _release(record)
+        else:
+            record.status_code = response.status_code
+            record.response_body = response.get_data(as_text=True)
+            try:
+                db.session.commit()
+            except StaleDataError:
+                # Ran past IDEMPOTENCY_LOCK_SECONDS and a retry took the key over
+                db.session.rollback()
+                logger.warning(f"Idempotency key {key} was taken over before its request finished")
+        return response
+
+    return decorated_function
+
+
+def _release(record):
+    """Delete a reserved key after a failed request."""
+    try:
+        db.session.delete(record)
+        db.session.commit()
+    except Exception as e:
+        logger.error(f"Error releasing idempotency key: {str(e)}")
+        db.session.rollback()
+
+
+def purge_expired_keys(ttl_hours=24):
+    """
+    Delete stored idempotency keys and delivery records older than the TTL.
+
+    Args:
+        ttl_hours: Key lifetime in hours
+
+    Returns:
+        int: Number of rows deleted
+    """
+    cutoff = datetime.utcnow() - timedelta(hours=ttl_hours)
+    deleted = IdempotencyKey.query.filter(IdempotencyKey.created_at < cutoff).delete()
+    deleted += PlatformDelivery.query.filter(PlatformDelivery.created_at < cutoff).delete()
+    db.session.commit()
+    return deleted
+
+
+class DeliveryLog:
+    """
+    Durable record of platform deliveries, shared by every process.
+
+    A delivery is recorded as pending before the platform is called and as
+    delivered once it succeeds; a failed attempt is forgotten so it can be
+    retried. A delivery left pending by a crash may or may not have reached
+    the platform, so it is not repeated.
+
+    Each call uses its own application context, so its commits never touch
+    the caller's session.
+    """
+
+    def __init__(self, app):
+        """
+        Initialize the log.
+
+        Args:
+            app: Flask application whose database holds the log
+        """
+        self.app = app
+
+    def start(self, key):
+        """
+        Record that a delivery is about to be attempted.
+
+        Args:
+            key: Delivery idempotency key
+
+        Returns:
+            str: None if the delivery may go ahead, else the recorded status
+                ('delivered', or 'pending' if an earlier attempt never finished)
+        """
+        with self.app.app_context():
+            db.session.add(PlatformDelivery(key=key))
+            try:
+                db.session.commit()
+                return None
+            except IntegrityError:
+                db.session.rollback()
+                return db.session.query(PlatformDelivery.status).filter_by(key=key).scalar() or 'pending'
+
+    def finish(self, key, delivered):
+        """
+        Record the outcome of an attempt started with start().
+
+        Args:
+            key: Delivery idempotency key
+            delivered: True if the platform accepted the post
+        """
+        try:
+            with self.app.app_context():
+                query = PlatformDelivery.query.filter_by(key=key, status='pending')
+                if delivered:
+                    query.update({'status': 'delivered', 'delivered_at': datetime.utcnow()})
+                else:
+                    query.delete()
+                db.session.commit()
+        except Exception as e:
+            logger.error(f"Error recording delivery {key}: {str(e)}")
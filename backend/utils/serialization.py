@@ -0,0 +1,97 @@
+"""
+JSON serializers for API responses.
+Uses orjson when it is installed and falls back to the standard library.
+"""
+import json
+import logging
+from datetime import date, datetime
+from decimal import Decimal
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+logger = logging.getLogger(__name__)
+
+
+def _default(obj):
+    """Serialize types the standard json module does not handle."""
+    if isinstance(obj, (datetime, date)):
+        return obj.isoformat()
+    if isinstance(obj, Decimal):
+        return float(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+class StdlibSerializer:
+    """Serializer backed by the standard library json module."""
+
+    name = 'json'
+
+    def dumps(self, obj):
+        """
+        Serialize an object to JSON.
+
+        Args:
+            obj: Object to serialize
+
+        Returns:
+            bytes: UTF-8 encoded JSON
+        """
+        return json.dumps(obj, default=_default, separators=(',', ':')).encode()
+
+
+class OrjsonSerializer:
+    """Serializer backed by orjson."""
+
+    name = 'orjson'
+
+    def dumps(self, obj):
+        """
+        Serialize an object to JSON.
+
+        Args:
+            obj: Object to serialize
+
+        Returns:
+            bytes: UTF-8 encoded JSON
+        """
+        return orjson.dumps(obj, default=_default, option=orjson.OPT_NON_STR_KEYS)
+
+
+def create_serializer(name='auto'):
+    """
+    Create a serializer by name.
+
+    Args:
+        name: 'auto', 'orjson' or 'json'
+
+    Returns:
+        Serializer instance
+    """
+    if name in ('auto', 'orjson'):
+        if orjson is not None:
+            return OrjsonSerializer()
+        if name == 'orjson':
+            logger.warning("orjson library not installed, using standard json serializer")
+    return StdlibSerializer()
+
+
+_default_serializer = create_serializer()
+
+
+def get_serializer(app=None):
+    """
+    Get the serializer configured for an application.
+
+    Args:
+        app: Flask application (defaults to the current app)
+
+    Returns:
+        Serializer instance
+    """
+    if app is None:
+        from flask import current_app
+        app = current_app
+    return getattr(app, 'serializer', None) or _default_serializer
@@ -0,0 +1,132 @@
+"""
+Benchmark: WSGI workers versus the ASGI serving mode under concurrent load.
+
+Both paths run in-process against the same application with the same number
+of handler threads (--workers), so the comparison measures the serving model
+rather than pool sizes. The WSGI path models synchronous workers (like
+`gunicorn -w N`) where each request holds a worker for its full duration; the
+ASGI path drives the WsgiToAsgi adapter from a single event loop with a
+request pool of the same size. A --delay simulates slow I/O (a slow SQLite
+write or platform call) inside each request.
+
+Usage:
+    python -m benchmarks.bench_asgi --requests 400 --concurrency 64 --workers 4 --delay 20
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+os.environ['DATABASE_URL'] = 'sqlite:///:memory:'
+
+from app import create_app
+from backend.models.database import db
+from backend.utils.asgi import WsgiToAsgi
+
+
+def percentile(values, pct):
+    """Get a percentile from a list of values."""
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def report(label, latencies, elapsed):
+    """Print throughput and latency for one run."""
+    print(f"  {label:<6} {len(latencies) / elapsed:8.1f} req/s  "
+          f"p50 {statistics.median(latencies):7.1f} ms  p99 {percentile(latencies, 99):7.1f} ms")
+
+
+def setup(delay, workers):
+    """Create the app, a user and a slow endpoint."""
+    app = create_app('production')
+    asgi_app = WsgiToAsgi(app, max_workers=workers)
+
+    @app.route('/bench/slow')
+    def slow():
+        time.sleep(delay / 1000)
+        return {'status': 'ok'}
+
+    client = app.test_client()
+    response = client.post('/api/auth/register', data=json.dumps({
+        'username': 'bench', 'email': 'bench@example.com', 'password': 'password123'
+    }), content_type='application/json')
+    token = response.get_json()['data']['token']
+    return app, asgi_app, token
+
+
+def run_wsgi(app, paths, token, workers):
+    """Run requests through a fixed pool of synchronous workers."""
+    client = app.test_client()
+    headers = {'Authorization': f'Bearer {token}'}
+
+    def request(path, queued_at):
+        client.get(path, headers=headers)
+        return (time.perf_counter() - queued_at) * 1000
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(request, path, time.perf_counter()) for path in paths]
+        latencies = [future.result() for future in futures]
+    return latencies, time.perf_counter() - start
+
+
+async def run_asgi(asgi_app, paths, token, concurrency):
+    """Run requests through the ASGI adapter from one event loop."""
+    semaphore = asyncio.Semaphore(concurrency)
+    headers = [(b'authorization', f'Bearer {token}'.encode())]
+
+    async def request(path):
+        async with semaphore:
+            queued_at = time.perf_counter()
+            incoming = [{'type': 'http.request', 'body': b'', 'more_body': False}]
+
+            async def receive():
+                if incoming:
+                    return incoming.pop(0)
+                await asyncio.sleep(3600)
+
+            async def send(message):
+                pass
+
+            await asgi_app({
+                'type': 'http', 'method': 'GET', 'path': path, 'query_string': b'',
+                'headers': headers, 'server': ('bench', 80)
+            }, receive, send)
+            return (time.perf_counter() - queued_at) * 1000
+
+    start = time.perf_counter()
+    latencies = await asyncio.gather(*[request(path) for path in paths])
+    return list(latencies), time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--requests', type=int, default=400)
+    parser.add_argument('--concurrency', type=int, default=64)
+    parser.add_argument('--workers', type=int, default=4, help='handler threads in both modes')
+    parser.add_argument('--delay', type=float, default=20, help='simulated I/O per slow request, ms')
+    args = parser.parse_args()
+
+    app, asgi_app, token = setup(args.delay, args.workers)
+    paths = ['/bench/slow' if i % 2 else '/api/posts' for i in range(args.requests)]
+
+    print(f"{args.requests} requests, concurrency {args.concurrency}, "
+          f"{args.workers} handler threads per mode, {args.delay} ms simulated I/O")
+    latencies, elapsed = run_wsgi(app, paths, token, args.workers)
+    report('wsgi', latencies, elapsed)
+    latencies, elapsed = asyncio.run(run_asgi(asgi_app, paths, token, args.concurrency))
+    report('asgi', latencies, elapsed)
+
+    with app.app_context():
+        db.session.remove()
+    app.scheduler.shutdown()
+    asgi_app.executor.shutdown()
+    asgi_app.stream_executor.shutdown()
+
+
+if __name__ == '__main__':
+    main()
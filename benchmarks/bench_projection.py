@@ -0,0 +1,81 @@
+"""
+Benchmark: zip-based row projection versus a per-projection generated function.
+
+RowProjection zips each row with its keys and then applies the converters.
+The alternative it replaced generated and exec'd a dict literal per
+projection. This times both on POST_PROJECTION with in-memory rows, so only
+the conversion is measured.
+
+Usage:
+    python -m benchmarks.bench_projection --rows 100000 --repeat 5
+"""
+import argparse
+import statistics
+import time
+from datetime import datetime, timedelta
+
+from backend.models.projections import POST_PROJECTION
+
+
+class CodegenProjection:
+    """
+    The exec-compiled projection, kept here for comparison only.
+    """
+
+    def __init__(self, projection):
+        namespace = {}
+        items = []
+        converters = dict(projection.converters)
+        for index, key in enumerate(projection.keys):
+            if key in converters:
+                namespace[f'_convert{index}'] = converters[key]
+                items.append(f'{key!r}: _convert{index}(row[{index}])')
+            else:
+                items.append(f'{key!r}: row[{index}]')
+        exec('def project(row):\n    return {' + ', '.join(items) + '}\n', namespace)
+        self.project = namespace['project']
+
+    def to_dicts(self, rows):
+        return list(map(self.project, rows))
+
+
+def make_rows(count):
+    """Build result tuples shaped like POST_PROJECTION.select() rows."""
+    start = datetime(2024, 1, 1, 9, 0)
+    return [(i, f'Benchmark post number {i} #automation', 'twitter,facebook,instagram',
+             start + timedelta(minutes=i), 'pending', None, start, None, 900, None,
+             'twitter' if i % 2 else None, None) for i in range(count)]
+
+
+def measure(func, rows, repeat):
+    """Run func over rows repeat times and return per-run timings in milliseconds."""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(rows)
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=100000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    rows = make_rows(args.rows)
+    codegen = CodegenProjection(POST_PROJECTION)
+    assert codegen.to_dicts(rows[:10]) == POST_PROJECTION.to_dicts(rows[:10])
+
+    print(f"{args.rows} rows, {args.repeat} runs each")
+    baseline = None
+    for label, func in (('codegen (exec)', codegen.to_dicts), ('zip + converters', POST_PROJECTION.to_dicts)):
+        timings = measure(func, rows, args.repeat)
+        median = statistics.median(timings)
+        baseline = baseline or median
+        print(f"  {label:<20} median {median:8.1f} ms  min {min(timings):8.1f} ms  "
+              f"relative {median / baseline:4.2f}x")
+
+
+if __name__ == '__main__':
+    main()
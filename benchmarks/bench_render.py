@@ -0,0 +1,89 @@
+"""
+Benchmark: caption image rendering, per-post versus cached and batched.
+
+The baseline repeats what the dashboard used to do for every caption-only
+post: load the font, draw a new image and write it to a temp file. The other
+cases use TextRenderer with a fresh cache (cold), the same captions again
+(warm), and render_many() over a process pool.
+
+Usage:
+    python -m benchmarks.bench_render --captions 500 --unique 100 --workers 4
+"""
+import argparse
+import os
+import shutil
+import tempfile
+import time
+
+from PIL import Image, ImageDraw, ImageFont
+
+from backend.media.cache import MediaCache
+from backend.media.render import DEFAULT_TEMPLATE, TextRenderer
+
+
+def baseline_render(text, directory, index):
+    """Uncached render: font loaded and a new file written every time."""
+    template = DEFAULT_TEMPLATE
+    try:
+        font = ImageFont.truetype(template.fonts[0], template.font_size)
+    except OSError:
+        font = ImageFont.load_default(template.font_size)
+    image = Image.new('RGB', (template.width, template.height), color=template.background)
+    draw = ImageDraw.Draw(image)
+    y_pos = template.top
+    for line in text.split('\n')[:template.max_lines]:
+        if line.strip():
+            left, _, right, _ = draw.textbbox((0, 0), line, font=font)
+            draw.text(((template.width - (right - left)) // 2, y_pos), line, fill=template.color, font=font)
+            y_pos += template.line_height
+    path = os.path.join(directory, f'temp_post_{index}.jpg')
+    image.save(path, 'JPEG')
+    os.remove(path)
+
+
+def captions(count, unique):
+    """Captions cycling through a number of distinct texts."""
+    return [f'Caption number {i % unique}\nNew post from the dashboard\n#automation' for i in range(count)]
+
+
+def timed(func):
+    """Run func and return elapsed seconds."""
+    start = time.perf_counter()
+    func()
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--captions', type=int, default=500)
+    parser.add_argument('--unique', type=int, default=100, help='distinct captions among them')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 2)
+    args = parser.parse_args()
+
+    texts = captions(args.captions, args.unique)
+    directory = tempfile.mkdtemp(prefix='bench_render_')
+    try:
+        renderer = TextRenderer(MediaCache(os.path.join(directory, 'single')))
+        batch = TextRenderer(MediaCache(os.path.join(directory, 'batch')), max_workers=args.workers)
+        # Start the pool outside the timings
+        batch._get_executor().submit(len, '').result()
+
+        cases = [
+            ('uncached per post', lambda: [baseline_render(text, directory, i) for i, text in enumerate(texts)]),
+            ('cached, cold', lambda: [renderer.render(text) for text in texts]),
+            ('cached, warm', lambda: [renderer.render(text) for text in texts]),
+            (f'render_many, {args.workers} workers', lambda: batch.render_many(texts)),
+        ]
+        print(f"{args.captions} captions, {args.unique} distinct")
+        baseline = None
+        for label, func in cases:
+            rate = args.captions / timed(func)
+            baseline = baseline or rate
+            print(f"  {label:<24} {rate:10.1f} renders/s  speedup {rate / baseline:6.1f}x")
+        batch.shutdown()
+    finally:
+        shutil.rmtree(directory)
+
+
+if __name__ == '__main__':
+    main()
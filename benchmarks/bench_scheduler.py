@@ -0,0 +1,194 @@
+"""
+Benchmark: end-to-end PostScheduler throughput with stub platforms.
+
+Seeds N users and M posts due over a short window, replaces the platform
+integrations with configurable-latency stubs, runs a publisher-role
+PostScheduler until every post is finished and reports posts/sec, publish lag
+percentiles (posted_at - scheduled_time) and peak memory.
+
+Runs against a temporary SQLite file unless --database is passed (e.g. to
+use PostgreSQL); DATABASE_URL is ignored because the benchmark drops and
+recreates every table. --json writes the results for comparing
+runs, and --min-throughput exits non-zero below a posts/sec floor.
+
+Usage:
+    python -m benchmarks.bench_scheduler --users 50 --posts 2000 --latency 50 --workers 10
+    python -m benchmarks.bench_scheduler --database postgresql://localhost/bench --json results.json
+"""
+import argparse
+import json
+import logging
+import os
+import resource
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--users', type=int, default=50)
+    parser.add_argument('--posts', type=int, default=2000)
+    parser.add_argument('--platforms', default='twitter,facebook', help='Platforms per post')
+    parser.add_argument('--spread', type=float, default=0, help='Seconds over which posts fall due')
+    parser.add_argument('--latency', type=float, default=50, help='Stub API latency in ms')
+    parser.add_argument('--jitter', type=float, default=10, help='Stub latency jitter in ms')
+    parser.add_argument('--error-rate', type=float, default=0.0)
+    parser.add_argument('--workers', type=int, default=10, help='Publisher threads')
+    parser.add_argument('--batch', type=int, default=100, help='Posts claimed per poll')
+    parser.add_argument('--poll', type=float, default=1.0, help='Seconds between polls')
+    parser.add_argument('--timeout', type=float, default=600)
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--database', help='Database URL to drop and reseed (default: temporary SQLite file)')
+    parser.add_argument('--json', help='Write results to this file')
+    parser.add_argument('--min-throughput', type=float, help='Fail if posts/sec is below this')
+    return parser.parse_args()
+
+
+def percentile(values, pct):
+    """Get a percentile from a list of values."""
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def seed(db, users, posts, platforms, start, spread):
+    """Bulk insert users and posts due from start over spread seconds."""
+    from backend.models.database import User, ScheduledPost
+
+    plans = ['basic', 'premium', 'enterprise']
+    db.session.execute(User.__table__.insert(), [{
+        'username': f'bench{i}',
+        'email': f'bench{i}@example.com',
+        'password_hash': 'x',
+        'subscription_plan': plans[i % len(plans)],
+        'subscription_active': True,
+        'created_at': start,
+    } for i in range(users)])
+    user_ids = [row[0] for row in db.session.execute(db.select(User.id).order_by(User.id))]
+
+    step = spread / posts if posts else 0
+    db.session.execute(ScheduledPost.__table__.insert(), [{
+        'user_id': user_ids[i % len(user_ids)],
+        'content': f'Benchmark post {i} #automation',
+        'platforms': platforms,
+        'scheduled_time': start + timedelta(seconds=i * step),
+        'status': 'pending',
+        'created_at': start,
+    } for i in range(posts)])
+    db.session.commit()
+
+
+def wait_for_completion(db, total, timeout):
+    """Poll until every post is posted or failed."""
+    from backend.models.database import ScheduledPost
+
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        done = db.session.execute(
+            db.select(db.func.count()).where(ScheduledPost.status.in_(['posted', 'failed']))
+        ).scalar()
+        db.session.commit()
+        if done >= total:
+            return True
+        time.sleep(0.2)
+    return False
+
+
+def collect(db):
+    """Read publish lag and final statuses."""
+    from backend.models.database import ScheduledPost
+
+    rows = db.session.execute(
+        db.select(ScheduledPost.scheduled_time, ScheduledPost.posted_at, ScheduledPost.status)
+    ).all()
+    lags = [(posted_at - scheduled).total_seconds() for scheduled, posted_at, _ in rows if posted_at]
+    failed = sum(1 for *_, status in rows if status == 'failed')
+    return lags, failed, max(posted_at for _, posted_at, _ in rows if posted_at)
+
+
+def main():
+    args = parse_args()
+    tmpdir = None
+    # Never fall back to an exported DATABASE_URL: the tables are dropped below
+    if args.database:
+        os.environ['DATABASE_URL'] = args.database
+    else:
+        tmpdir = tempfile.TemporaryDirectory()
+        os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(tmpdir.name, 'bench.db')}"
+
+    from app import create_app
+    from backend.core.scheduler import PostScheduler
+    from backend.models.database import db
+    from benchmarks.stub_platforms import install_stubs
+
+    # The API-role app only provides config, models and the post handler
+    app = create_app('production', scheduler_role='api')
+    logging.getLogger().setLevel(logging.WARNING)
+
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+        start = datetime.utcnow() + timedelta(seconds=1)
+        seed(db, args.users, args.posts, args.platforms, start, args.spread)
+        stubs = install_stubs(app.post_handler, args.latency, args.jitter, args.error_rate, args.seed)
+
+        began = time.monotonic()
+        scheduler = PostScheduler(
+            db, app.post_handler, app=app, role='worker',
+            poll_interval=args.poll,
+            batch_size=args.batch,
+            plan_weights={name: plan.get('weight', 1) for name, plan in app.config['SUBSCRIPTION_PLANS'].items()},
+            dispatch_workers=args.workers
+        )
+        try:
+            finished = wait_for_completion(db, args.posts, args.timeout)
+        finally:
+            scheduler.shutdown()
+        elapsed = time.monotonic() - began
+
+        lags, failed, last_posted = collect(db)
+        active = max((last_posted - start).total_seconds(), 1e-9)
+        results = {
+            'users': args.users,
+            'posts': args.posts,
+            'platform_calls': sum(stub.calls for stub in stubs.values()),
+            'workers': args.workers,
+            'latency_ms': args.latency,
+            'completed': len(lags),
+            'failed': failed,
+            'finished': finished,
+            'elapsed_seconds': round(elapsed, 3),
+            'posts_per_second': round(len(lags) / active, 2),
+            'lag_p50_seconds': round(percentile(lags, 50), 3) if lags else None,
+            'lag_p99_seconds': round(percentile(lags, 99), 3) if lags else None,
+            'lag_max_seconds': round(max(lags), 3) if lags else None,
+            'peak_rss_mb': round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+            'database': app.config['SQLALCHEMY_DATABASE_URI'].split(':', 1)[0],
+        }
+        db.session.remove()
+
+    print(f"{args.users} users, {args.posts} posts, {args.workers} publisher threads, "
+          f"{args.latency:.0f} ms stub latency ({results['database']})")
+    print(f"  throughput  {results['posts_per_second']:8.1f} posts/s   ({results['completed']} done, "
+          f"{failed} failed, {results['platform_calls']} platform calls)")
+    print(f"  lag         p50 {results['lag_p50_seconds']} s   p99 {results['lag_p99_seconds']} s   "
+          f"max {results['lag_max_seconds']} s")
+    print(f"  memory      peak RSS {results['peak_rss_mb']} MB")
+
+    if args.json:
+        with open(args.json, 'w') as handle:
+            json.dump(results, handle, indent=2)
+    if tmpdir:
+        tmpdir.cleanup()
+    if not finished:
+        print("  timed out before all posts finished", file=sys.stderr)
+        sys.exit(1)
+    if args.min_throughput and results['posts_per_second'] < args.min_throughput:
+        print(f"  below minimum throughput {args.min_throughput} posts/s", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,97 @@
+"""
+Benchmark: ORM to_dict + jsonify versus row projections + fast serializer.
+
+Seeds an in-memory SQLite database with scheduled posts and times building
+the /api/posts response body both ways.
+
+Usage:
+    python -m benchmarks.bench_serialization --rows 10000 --repeat 5
+"""
+import argparse
+import os
+import statistics
+import time
+from datetime import datetime, timedelta
+
+os.environ.setdefault('DATABASE_URL', 'sqlite:///:memory:')
+
+from flask import jsonify
+
+from app import create_app
+from backend.models.database import db, User, ScheduledPost
+from backend.models.projections import POST_PROJECTION
+from backend.utils.serialization import create_serializer
+
+
+def seed(rows):
+    """Insert one user and the given number of posts."""
+    user = User(username='bench', email='bench@example.com', password_hash='x')
+    db.session.add(user)
+    db.session.flush()
+
+    start = datetime(2024, 1, 1, 9, 0)
+    db.session.execute(ScheduledPost.__table__.insert(), [{
+        'user_id': user.id,
+        'content': f'Benchmark post number {i} #automation #socialmedia',
+        'platforms': 'twitter,facebook,instagram',
+        'scheduled_time': start + timedelta(minutes=i),
+        'status': 'pending',
+        'media_url': f'https://example.com/media/{i}.jpg' if i % 3 == 0 else None,
+        'created_at': start,
+    } for i in range(rows)])
+    db.session.commit()
+    return user.id
+
+
+def orm_path(user_id):
+    """Current baseline: ORM instances, to_dict and stdlib jsonify."""
+    posts = ScheduledPost.query.filter_by(user_id=user_id).all()
+    return jsonify({'success': True, 'data': [post.to_dict() for post in posts]}).get_data()
+
+
+def projection_path(user_id, serializer):
+    """Raw column tuples, row projection and the configured serializer."""
+    rows = db.session.execute(POST_PROJECTION.select().where(ScheduledPost.user_id == user_id))
+    return serializer.dumps({'success': True, 'data': POST_PROJECTION.to_dicts(rows)})
+
+
+def measure(func, repeat):
+    """Run func repeat times and return per-run timings in milliseconds."""
+    timings = []
+    for _ in range(repeat):
+        db.session.expunge_all()
+        start = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=10000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    app = create_app('production')
+    with app.test_request_context():
+        user_id = seed(args.rows)
+        cases = [('orm + to_dict + jsonify', lambda: orm_path(user_id))]
+        for name in ('json', 'orjson'):
+            serializer = create_serializer(name)
+            if serializer.name == name:
+                cases.append((f'projection + {name}', lambda s=serializer: projection_path(user_id, s)))
+
+        print(f"{args.rows} rows, {args.repeat} runs each")
+        baseline = None
+        for label, func in cases:
+            timings = measure(func, args.repeat)
+            median = statistics.median(timings)
+            baseline = baseline or median
+            print(f"  {label:<28} median {median:8.1f} ms  min {min(timings):8.1f} ms  "
+                  f"speedup {baseline / median:4.1f}x")
+
+        app.scheduler.shutdown()
+
+
+if __name__ == '__main__':
+    main()
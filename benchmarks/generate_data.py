@@ -0,0 +1,327 @@
+"""
+Synthetic data generator for users, social accounts, posts and analytics.
+
+Produces realistic shapes rather than uniform noise:
+
+    posts per user      Zipf-distributed (a few heavy users, a long tail)
+    schedule times      diurnal: weighted towards morning, lunch and evening
+                        hours, with most posts on round quarter hours
+    engagement          lognormal reach per post, approached along a saturating
+                        curve over several analytics snapshots
+
+Rows are generated lazily and written with bulk executemany inserts in
+chunks, so memory stays flat at millions of rows. IDs are assigned up front
+and the output is deterministic for a given --seed and --now. Running again
+without --drop appends users numbered after the existing ones.
+
+All posts are in the past (posted or failed) unless --days-ahead is given:
+pending posts would be published by any worker running against the database.
+
+Usage:
+    python -m benchmarks.generate_data --database sqlite:///big.db --users 100000 --posts 5000000
+    python -m benchmarks.generate_data --database postgresql://localhost/bench --users 20000 --posts 1000000 --drop
+    python -m benchmarks.generate_data --database sqlite:///big.db --users 1000 --posts 50000 --days-ahead 30
+"""
+import argparse
+import bisect
+import itertools
+import math
+import random
+import time
+from datetime import datetime, timedelta
+
+PLATFORMS = ('twitter', 'facebook', 'instagram')
+PLANS = (('basic', 0.7), ('premium', 0.25), ('enterprise', 0.05))
+PASSWORD = 'password123'
+
+# Relative posting volume per hour of day (UTC)
+HOUR_WEIGHTS = (1, 1, 1, 1, 1, 2, 4, 7, 10, 12, 9, 8, 11, 9, 7, 7, 8, 10, 12, 12, 10, 7, 4, 2)
+
+# Hours after publishing at which analytics snapshots are recorded
+SNAPSHOT_HOURS = (1, 6, 24, 72, 168)
+
+
+def cumulative(weights):
+    """Cumulative weights for bisect-based sampling."""
+    return list(itertools.accumulate(weights))
+
+
+def zipf_counts(total, users, exponent):
+    """
+    Split total posts over users following a Zipf law.
+
+    Returns:
+        list: Post count per user (sums to total), heaviest users first
+    """
+    weights = [1 / (rank ** exponent) for rank in range(1, users + 1)]
+    scale = total / sum(weights)
+    counts = [int(w * scale) for w in weights]
+    for index in range(total - sum(counts)):
+        counts[index % users] += 1
+    return counts
+
+
+class DataGenerator:
+    """
+    Deterministic generator of table rows.
+    """
+
+    def __init__(self, users, posts, seed=1, now=None, days_back=90, days_ahead=0, zipf=1.1,
+                 snapshots=3, prefix='user', first_ids=None, password_hash=None):
+        """
+        Configure the dataset.
+
+        Args:
+            users: Number of users
+            posts: Total number of posts
+            seed: Random seed
+            now: Reference time splitting past (published) and future (pending) posts
+            days_back: Days of history before now
+            days_ahead: Days of pending posts after now; 0 keeps every post in the past
+            zipf: Zipf exponent for posts per user
+            snapshots: Analytics snapshots per published post and platform
+            prefix: Username prefix (usernames are <prefix><user ID - 1>, so appended
+                batches do not clash)
+            first_ids: Dict of table name -> first ID to assign
+            password_hash: Password hash stored for every user
+        """
+        self.users = users
+        self.posts = posts
+        self.seed = seed
+        self.now = now or datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
+        self.start = self.now - timedelta(days=days_back)
+        self.days = days_back + days_ahead
+        self.zipf = zipf
+        self.snapshots = SNAPSHOT_HOURS[:snapshots]
+        self.prefix = prefix
+        self.first_ids = dict({'users': 1, 'social_accounts': 1, 'scheduled_posts': 1, 'analytics': 1},
+                              **(first_ids or {}))
+        self.password_hash = password_hash or 'synthetic'
+        self.hour_cdf = cumulative(HOUR_WEIGHTS)
+        self.plan_cdf = cumulative(weight for _, weight in PLANS)
+
+    def _profiles(self):
+        """Per-user (name index, id, plan, platforms, post count), deterministic in seed."""
+        rng = random.Random(self.seed)
+        counts = zipf_counts(self.posts, self.users, self.zipf)
+        # Heavy posters are spread across the ID range rather than being the first users
+        rng.shuffle(counts)
+        for index, count in enumerate(counts):
+            plan = PLANS[bisect.bisect(self.plan_cdf, rng.random() * self.plan_cdf[-1])][0]
+            platforms = tuple(p for p in PLATFORMS if rng.random() < 0.6) or (rng.choice(PLATFORMS),)
+            user_id = self.first_ids['users'] + index
+            yield user_id - 1, user_id, plan, platforms, count
+
+    def users_rows(self):
+        """Yield users rows."""
+        for index, user_id, plan, _, _ in self._profiles():
+            yield {
+                'id': user_id,
+                'username': f'{self.prefix}{index}',
+                'email': f'{self.prefix}{index}@example.com',
+                'password_hash': self.password_hash,
+                'subscription_plan': plan,
+                'subscription_active': True,
+                'created_at': self.start,
+            }
+
+    def social_account_rows(self):
+        """Yield social_accounts rows, one per user and platform."""
+        ids = itertools.count(self.first_ids['social_accounts'])
+        for index, user_id, _, platforms, _ in self._profiles():
+            for platform in platforms:
+                yield {
+                    'id': next(ids),
+                    'user_id': user_id,
+                    'platform': platform,
+                    'account_name': f'{self.prefix}{index}_{platform}',
+                    'credentials': 'synthetic',
+                    'is_active': True,
+                    'created_at': self.start,
+                }
+
+    def _schedule_time(self, rng):
+        """Draw a diurnal schedule time biased towards round quarter hours."""
+        day = rng.randrange(self.days)
+        hour = bisect.bisect(self.hour_cdf, rng.random() * self.hour_cdf[-1])
+        minute = rng.choice((0, 0, 0, 15, 30, 30, 45)) if rng.random() < 0.7 else rng.randrange(60)
+        return self.start + timedelta(days=day, hours=hour, minutes=minute)
+
+    def post_and_analytics_rows(self):
+        """
+        Yield ('scheduled_posts', row) and ('analytics', row) pairs.
+
+        Analytics follow each published post: reach is lognormal per post and
+        accumulates towards it along 1 - exp(-t / 24h) at each snapshot.
+        """
+        rng = random.Random(self.seed + 1)
+        post_ids = itertools.count(self.first_ids['scheduled_posts'])
+        analytics_ids = itertools.count(self.first_ids['analytics'])
+        for _, user_id, _, platforms, count in self._profiles():
+            for _ in range(count):
+                post_id = next(post_ids)
+                scheduled = self._schedule_time(rng)
+                targets = [p for p in platforms if rng.random() < 0.7] or [platforms[0]]
+                published = scheduled < self.now
+                status = ('failed' if rng.random() < 0.03 else 'posted') if published else 'pending'
+                yield 'scheduled_posts', {
+                    'id': post_id,
+                    'user_id': user_id,
+                    'content': f'Post {post_id} about topic {rng.randrange(500)} #socialmedia',
+                    'platforms': ','.join(targets),
+                    'scheduled_time': scheduled,
+                    'status': status,
+                    'media_url': f'https://cdn.example.com/media/{rng.randrange(10 ** 6)}.jpg'
+                    if rng.random() < 0.4 else None,
+                    'created_at': scheduled - timedelta(hours=rng.randint(1, 72)),
+                    'posted_at': scheduled + timedelta(seconds=rng.randint(0, 30)) if published else None,
+                    'delivered_platforms': ','.join(targets) if status == 'posted' else None,
+                }
+                if status != 'posted':
+                    continue
+                for platform in targets:
+                    reach = int(rng.lognormvariate(7, 1.2))
+                    rate = rng.betavariate(2, 40)
+                    for hours in self.snapshots:
+                        recorded = scheduled + timedelta(hours=hours)
+                        if recorded > self.now:
+                            break
+                        progress = 1 - math.exp(-hours / 24)
+                        seen = int(reach * progress)
+                        likes = int(seen * rate)
+                        yield 'analytics', {
+                            'id': next(analytics_ids),
+                            'user_id': user_id,
+                            'post_id': post_id,
+                            'platform': platform,
+                            'likes': likes,
+                            'shares': int(likes * 0.1),
+                            'comments': int(likes * 0.15),
+                            'reach': seen,
+                            'engagement_rate': round(100 * likes / seen, 2) if seen else 0.0,
+                            'recorded_at': recorded,
+                        }
+
+
+def next_ids(connection, tables):
+    """Get the first free ID of each table."""
+    from sqlalchemy import func, select
+
+    return {name: (connection.execute(select(func.max(table.c.id))).scalar() or 0) + 1
+            for name, table in tables.items()}
+
+
+def advance_sequences(connection, tables):
+    """Move PostgreSQL ID sequences past the explicitly inserted IDs."""
+    for table in tables.values():
+        connection.exec_driver_sql(
+            f"SELECT setval(pg_get_serial_sequence('{table.name}', 'id'), MAX(id)) FROM {table.name} "
+            f"HAVING MAX(id) IS NOT NULL"
+        )
+
+
+def bulk_insert(connection, tables, rows, chunk_size, counts):
+    """Insert (table name, row) pairs in executemany chunks per table."""
+    buffers = {name: [] for name in tables}
+    for name, row in rows:
+        buffer = buffers[name]
+        buffer.append(row)
+        if len(buffer) >= chunk_size:
+            connection.execute(tables[name].insert(), buffer)
+            counts[name] += len(buffer)
+            buffer.clear()
+    for name, buffer in buffers.items():
+        if buffer:
+            connection.execute(tables[name].insert(), buffer)
+            counts[name] += len(buffer)
+
+
+def generate(engine, users, posts, chunk_size=10000, **options):
+    """
+    Generate a dataset into a database.
+
+    Args:
+        engine: SQLAlchemy engine with the schema already created
+        users: Number of users
+        posts: Total number of posts
+        chunk_size: Rows per executemany batch
+        **options: DataGenerator options
+
+    Returns:
+        dict: Rows inserted per table
+    """
+    from backend.models.database import User, SocialAccount, ScheduledPost, Analytics
+
+    tables = {
+        'users': User.__table__,
+        'social_accounts': SocialAccount.__table__,
+        'scheduled_posts': ScheduledPost.__table__,
+        'analytics': Analytics.__table__,
+    }
+    counts = dict.fromkeys(tables, 0)
+    with engine.begin() as connection:
+        if engine.dialect.name == 'sqlite':
+            # Bulk load: skip per-statement fsyncs; the load is one transaction anyway
+            connection.exec_driver_sql('PRAGMA synchronous=OFF')
+        generator = DataGenerator(users, posts, first_ids=next_ids(connection, tables), **options)
+        bulk_insert(connection, tables, (('users', row) for row in generator.users_rows()), chunk_size, counts)
+        bulk_insert(connection, tables, (('social_accounts', row) for row in generator.social_account_rows()),
+                    chunk_size, counts)
+        bulk_insert(connection, tables, generator.post_and_analytics_rows(), chunk_size, counts)
+        if engine.dialect.name == 'postgresql':
+            # IDs were given explicitly, so the app's next insert would reuse them
+            advance_sequences(connection, tables)
+    return counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--database', required=True, help='Database URL to load into')
+    parser.add_argument('--users', type=int, default=10000)
+    parser.add_argument('--posts', type=int, default=500000)
+    parser.add_argument('--days-back', type=int, default=90)
+    parser.add_argument('--days-ahead', type=int, default=0,
+                        help='Days of pending posts after now (a running worker would publish them)')
+    parser.add_argument('--zipf', type=float, default=1.1, help='Zipf exponent for posts per user')
+    parser.add_argument('--snapshots', type=int, default=3, help='Analytics snapshots per published post')
+    parser.add_argument('--prefix', default='user', help='Username prefix')
+    parser.add_argument('--now', type=datetime.fromisoformat, help='Reference time (default: today 00:00 UTC)')
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--chunk-size', type=int, default=10000)
+    parser.add_argument('--drop', action='store_true', help='Drop and recreate the schema first')
+    parser.add_argument('--with-login', action='store_true',
+                        help=f'Give every user the password "{PASSWORD}" (for load tests)')
+    args = parser.parse_args()
+
+    from sqlalchemy import create_engine
+    from backend.models.database import db, upgrade_schema
+    from backend.utils.helpers import hash_password
+
+    engine = create_engine(args.database)
+    if args.drop:
+        db.metadata.drop_all(engine)
+    db.metadata.create_all(engine)
+    upgrade_schema(engine)
+
+    started = time.perf_counter()
+    counts = generate(
+        engine, args.users, args.posts,
+        chunk_size=args.chunk_size,
+        seed=args.seed,
+        now=args.now,
+        days_back=args.days_back,
+        days_ahead=args.days_ahead,
+        zipf=args.zipf,
+        snapshots=args.snapshots,
+        prefix=args.prefix,
+        password_hash=hash_password(PASSWORD) if args.with_login else None
+    )
+    elapsed = time.perf_counter() - started
+    total = sum(counts.values())
+    for name, count in counts.items():
+        print(f"  {name:<16} {count:>12,}")
+    print(f"  {total:,} rows in {elapsed:.1f} s ({total / elapsed:,.0f} rows/s)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,265 @@
+"""
+Load test: per-endpoint API latency under concurrent virtual users.
+
+Each virtual user logs in, then loops over a weighted task mix (list posts,
+create post, analytics summary, login) until the run ends, in the style of a
+locust user class. Results are reported per endpoint as requests/sec and
+p50/p95/p99 latency, and can be written as JSON and compared with a previous
+run.
+
+By default the app is served in-process over real HTTP against a temporary
+SQLite database seeded by benchmarks.generate_data; --database seeds (after
+dropping every table) the given database instead. DATABASE_URL is ignored. Use --url to load an
+already running server seeded the same way (generate_data --prefix loaduser
+--with-login).
+
+Usage:
+    python -m benchmarks.loadtest --users 20 --duration 30 --seed-users 200 --posts-per-user 50
+    python -m benchmarks.loadtest --json run.json --compare baseline.json
+"""
+import argparse
+import json
+import logging
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from collections import defaultdict
+from datetime import datetime, timedelta
+
+import requests
+
+PASSWORD = 'password123'
+
+# name -> weight of the task in each virtual user's loop
+TASKS = {
+    'list_posts': 5,
+    'create_post': 2,
+    'analytics_summary': 2,
+    'login': 1,
+}
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--url', help='Target an already running server instead of an in-process one')
+    parser.add_argument('--database', help='Database URL to drop and reseed (default: temporary SQLite file)')
+    parser.add_argument('--users', type=int, default=20, help='Concurrent virtual users')
+    parser.add_argument('--duration', type=float, default=30, help='Seconds to run')
+    parser.add_argument('--think', type=float, default=0, help='Pause between tasks in ms')
+    parser.add_argument('--seed-users', type=int, default=200, help='Synthetic users to create')
+    parser.add_argument('--posts-per-user', type=int, default=50, help='Mean posts per user (Zipf-distributed)')
+    parser.add_argument('--snapshots', type=int, default=3, help='Analytics snapshots per published post')
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--json', help='Write results to this file')
+    parser.add_argument('--compare', help='Compare with results from a previous --json run')
+    return parser.parse_args()
+
+
+def percentile(values, pct):
+    """Get a percentile from a list of values."""
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def start_server(args):
+    """Serve the app in-process on a free port against a seeded database."""
+    # Never fall back to an exported DATABASE_URL: the tables are dropped below
+    if args.database:
+        os.environ['DATABASE_URL'] = args.database
+    else:
+        tmpdir = tempfile.mkdtemp()
+        os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(tmpdir, 'loadtest.db')}"
+
+    from werkzeug.serving import make_server
+    from app import create_app
+    from backend.models.database import db
+    from backend.utils.helpers import hash_password
+    from benchmarks.generate_data import generate
+
+    app = create_app('production', scheduler_role='api')
+    logging.getLogger().setLevel(logging.WARNING)
+    logging.getLogger('werkzeug').setLevel(logging.WARNING)
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+        started = time.perf_counter()
+        counts = generate(db.engine, args.seed_users, args.seed_users * args.posts_per_user,
+                          seed=args.seed, now=datetime.utcnow(), snapshots=args.snapshots,
+                          prefix='loaduser', password_hash=hash_password(PASSWORD))
+        print(f"Seeded {counts['users']} users, {counts['scheduled_posts']} posts and "
+              f"{counts['analytics']} analytics rows in {time.perf_counter() - started:.1f} s")
+
+    server = make_server('127.0.0.1', 0, app, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f'http://127.0.0.1:{server.server_port}'
+
+
+class VirtualUser(threading.Thread):
+    """
+    One simulated client running the weighted task mix.
+    """
+
+    def __init__(self, index, base_url, args, results, stop):
+        super().__init__(daemon=True)
+        self.base_url = base_url
+        self.username = f'loaduser{index % args.seed_users}'
+        self.think = args.think / 1000
+        self.results = results
+        self.stop = stop
+        self.rng = random.Random(args.seed + index)
+        self.session = requests.Session()
+        self.token = None
+
+    def request(self, name, method, path, **kwargs):
+        """Time one request and record it under name."""
+        headers = {'Authorization': f'Bearer {self.token}'} if self.token else {}
+        started = time.perf_counter()
+        try:
+            response = self.session.request(method, f'{self.base_url}{path}', headers=headers, timeout=30, **kwargs)
+            ok = response.status_code < 400
+        except requests.RequestException:
+            response, ok = None, False
+        self.results.record(name, (time.perf_counter() - started) * 1000, ok)
+        return response if ok else None
+
+    def login(self):
+        response = self.request('login', 'POST', '/api/auth/login',
+                                json={'username': self.username, 'password': PASSWORD})
+        if response is not None:
+            self.token = response.json()['data']['token']
+
+    def list_posts(self):
+        self.request('list_posts', 'GET', '/api/posts')
+
+    def create_post(self):
+        scheduled = datetime.utcnow() + timedelta(days=self.rng.randint(1, 60))
+        self.request('create_post', 'POST', '/api/posts', json={
+            'content': f'Load test post {self.rng.random():.6f}',
+            'platforms': ['twitter'],
+            'scheduled_time': scheduled.replace(microsecond=0).isoformat(),
+        })
+
+    def analytics_summary(self):
+        self.request('analytics_summary', 'GET', '/api/analytics/summary')
+
+    def run(self):
+        self.login()
+        names = list(TASKS)
+        weights = [TASKS[name] for name in names]
+        while not self.stop.is_set():
+            getattr(self, self.rng.choices(names, weights)[0])()
+            if self.think:
+                time.sleep(self.think)
+
+
+class Results:
+    """
+    Thread-safe per-endpoint latency samples.
+    """
+
+    def __init__(self):
+        self.latencies = defaultdict(list)
+        self.failures = defaultdict(int)
+        self.lock = threading.Lock()
+
+    def record(self, name, latency_ms, ok):
+        with self.lock:
+            self.latencies[name].append(latency_ms)
+            if not ok:
+                self.failures[name] += 1
+
+    def summary(self, elapsed):
+        """Per-endpoint statistics."""
+        endpoints = {}
+        for name, values in sorted(self.latencies.items()):
+            endpoints[name] = {
+                'requests': len(values),
+                'failures': self.failures[name],
+                'rps': round(len(values) / elapsed, 2),
+                'p50_ms': round(percentile(values, 50), 2),
+                'p95_ms': round(percentile(values, 95), 2),
+                'p99_ms': round(percentile(values, 99), 2),
+                'max_ms': round(max(values), 2),
+            }
+        return endpoints
+
+
+def git_revision():
+    """Get the current commit, if run from a git checkout."""
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def print_table(endpoints, baseline=None):
+    """Print per-endpoint results, with deltas against a baseline."""
+    print(f"  {'endpoint':<18} {'reqs':>7} {'fail':>5} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} "
+          f"{'p99 ms':>8} {'max ms':>8}")
+    for name, stats in endpoints.items():
+        line = (f"  {name:<18} {stats['requests']:>7} {stats['failures']:>5} {stats['rps']:>8.1f} "
+                f"{stats['p50_ms']:>8.1f} {stats['p95_ms']:>8.1f} {stats['p99_ms']:>8.1f} {stats['max_ms']:>8.1f}")
+        previous = (baseline or {}).get(name)
+        if previous:
+            line += (f"   p95 {100 * (stats['p95_ms'] / previous['p95_ms'] - 1):+6.1f}%"
+                     f"  req/s {100 * (stats['rps'] / previous['rps'] - 1):+6.1f}%")
+        print(line)
+
+
+def main():
+    args = parse_args()
+    server = None
+    if args.url:
+        base_url = args.url.rstrip('/')
+    else:
+        server, base_url = start_server(args)
+
+    results = Results()
+    stop = threading.Event()
+    users = [VirtualUser(i, base_url, args, results, stop) for i in range(args.users)]
+    started = time.perf_counter()
+    for user in users:
+        user.start()
+    time.sleep(args.duration)
+    stop.set()
+    for user in users:
+        user.join(timeout=30)
+    elapsed = time.perf_counter() - started
+    if server:
+        server.shutdown()
+
+    endpoints = results.summary(elapsed)
+    report = {
+        'revision': git_revision(),
+        'timestamp': datetime.utcnow().isoformat(),
+        'target': args.url or 'in-process',
+        'virtual_users': args.users,
+        'duration_seconds': round(elapsed, 2),
+        'dataset': {'users': args.seed_users, 'posts_per_user': args.posts_per_user,
+                    'snapshots': args.snapshots},
+        'endpoints': endpoints,
+    }
+
+    baseline = None
+    if args.compare:
+        with open(args.compare) as handle:
+            baseline = json.load(handle)['endpoints']
+    total = sum(stats['requests'] for stats in endpoints.values())
+    print(f"{args.users} virtual users, {elapsed:.1f} s, {total / elapsed:.1f} req/s total")
+    print_table(endpoints, baseline)
+
+    if args.json:
+        with open(args.json, 'w') as handle:
+            json.dump(report, handle, indent=2)
+    if any(stats['failures'] for stats in endpoints.values()):
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
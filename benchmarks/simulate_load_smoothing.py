@@ -0,0 +1,103 @@
+"""
+Simulation: peak publish rate before and after load smoothing.
+
+Builds a bursty schedule (most posts on round minutes), places each post with
+the LoadPlanner in creation order, and reports the peak per-slot rate and the
+delay added to flexible posts. A schedule can also be read from a file with
+one ISO 8601 time per line, optionally followed by ",<flexibility minutes>".
+
+Usage:
+    python -m benchmarks.simulate_load_smoothing --posts 5000 --flexible 0.7 --window 15
+    python -m benchmarks.simulate_load_smoothing --file schedule.csv
+"""
+import argparse
+import random
+import statistics
+from collections import Counter
+from datetime import datetime, timedelta
+
+from backend.core.planner import LoadPlanner
+
+
+def synthetic_schedule(posts, flexible, window_minutes, hours, seed):
+    """Generate (scheduled_time, window_seconds) pairs clustered on round times."""
+    rng = random.Random(seed)
+    start = datetime(2024, 1, 1, 9, 0)
+    schedule = []
+    for _ in range(posts):
+        minute = rng.randrange(hours * 60)
+        if rng.random() < 0.8:
+            # Users favour the top of the hour and quarter hours
+            minute -= minute % rng.choice((60, 30, 15))
+            second = 0
+        else:
+            second = rng.randrange(60)
+        when = start + timedelta(minutes=minute, seconds=second)
+        window = window_minutes * 60 if rng.random() < flexible else 0
+        schedule.append((when, window))
+    return schedule
+
+
+def read_schedule(path, default_window_minutes):
+    """Read (scheduled_time, window_seconds) pairs from a file."""
+    schedule = []
+    with open(path) as handle:
+        for line in handle:
+            line = line.strip()
+            if not line or line.startswith('#'):
+                continue
+            when, _, window = line.partition(',')
+            minutes = int(window) if window.strip() else default_window_minutes
+            schedule.append((datetime.fromisoformat(when.strip()), minutes * 60))
+    return schedule
+
+
+def simulate(schedule, slot_seconds):
+    """
+    Place a schedule with and without smoothing.
+
+    Returns:
+        dict: Peak rates before and after and the added delay in seconds
+    """
+    before = Counter(int(when.timestamp()) // slot_seconds for when, _ in schedule)
+    planner = LoadPlanner(slot_seconds)
+    delays = []
+    for when, window in schedule:
+        planned = planner.place(when, window)
+        if window:
+            delays.append((planned - when).total_seconds())
+    return {
+        'posts': len(schedule),
+        'flexible': len(delays),
+        'peak_before': max(before.values(), default=0),
+        'peak_after': planner.peak(),
+        'mean_delay': statistics.mean(delays) if delays else 0.0,
+        'max_delay': max(delays, default=0.0),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--posts', type=int, default=5000)
+    parser.add_argument('--flexible', type=float, default=0.7, help='Fraction of posts with a window')
+    parser.add_argument('--window', type=int, default=15, help='Flexibility window in minutes')
+    parser.add_argument('--hours', type=int, default=8)
+    parser.add_argument('--slot', type=int, default=1, help='Slot width in seconds')
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--file', help='Read the schedule from a file instead')
+    args = parser.parse_args()
+
+    if args.file:
+        schedule = read_schedule(args.file, args.window)
+    else:
+        schedule = synthetic_schedule(args.posts, args.flexible, args.window, args.hours, args.seed)
+
+    result = simulate(schedule, args.slot)
+    print(f"{result['posts']} posts, {result['flexible']} flexible, {args.slot}s slots")
+    print(f"  peak per slot before  {result['peak_before']:6d}")
+    print(f"  peak per slot after   {result['peak_after']:6d}")
+    print(f"  added delay           mean {result['mean_delay']:7.1f} s  max {result['max_delay']:7.1f} s")
+
+
+if __name__ == '__main__':
+    main()
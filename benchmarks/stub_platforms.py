@@ -0,0 +1,67 @@
+"""
+In-process stand-ins for the platform integrations.
+
+StubIntegration has the same post()/validate_credentials() interface as
+TwitterIntegration and friends but only sleeps for a configurable latency and
+fails at a configurable rate, so scheduler benchmarks measure the scheduler
+rather than the network.
+"""
+import random
+import threading
+import time
+
+
+class StubIntegration:
+    """
+    Platform integration with simulated latency and errors.
+    """
+
+    def __init__(self, name, latency_ms=50, jitter_ms=0, error_rate=0.0, seed=None):
+        """
+        Initialize the stub.
+
+        Args:
+            name: Platform name, for reporting
+            latency_ms: Mean simulated API latency in milliseconds
+            jitter_ms: Uniform +/- jitter added to the latency
+            error_rate: Fraction of calls that fail (0.0 - 1.0)
+            seed: Random seed for reproducible runs
+        """
+        self.name = name
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.calls = 0
+        self.failures = 0
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def post(self, content, media_url=None, user_id=None, idempotency_key=None):
+        """Simulate publishing a post."""
+        with self._lock:
+            self.calls += 1
+            delay = self.latency_ms + self._random.uniform(-self.jitter_ms, self.jitter_ms)
+            failed = self._random.random() < self.error_rate
+            if failed:
+                self.failures += 1
+        time.sleep(max(0.0, delay) / 1000)
+        return not failed
+
+    def validate_credentials(self, user_id=None):
+        """Stub credentials are always valid."""
+        return True
+
+
+def install_stubs(post_handler, latency_ms=50, jitter_ms=0, error_rate=0.0, seed=None):
+    """
+    Replace every integration on a PostHandler with a StubIntegration.
+
+    Returns:
+        dict: Platform name -> StubIntegration
+    """
+    stubs = {}
+    for index, name in enumerate(list(post_handler.platforms)):
+        stub_seed = None if seed is None else seed + index
+        stubs[name] = StubIntegration(name, latency_ms, jitter_ms, error_rate, stub_seed)
+        post_handler.platforms[name] = stubs[name]
+    return stubs
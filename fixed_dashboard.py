@@ -15,7 +15,13 @@ from instagrapi import Client
 import schedule
 import uuid
 from PIL import Image, ImageDraw, ImageFont
-from werkzeug.utils import secure_filename
+from werkzeug.exceptions import HTTPException
+from backend.config import DEFAULT_MEDIA_CACHE_DIR
+from backend.media.cache import MediaCache
+from backend.media.render import TextRenderer
+from backend.dashboard.api import MAX_UPLOAD_BYTES, UploadTooLarge, create_dashboard_api, save_upload
+from backend.dashboard.publisher import PublishQueue
+from backend.dashboard.scheduler import PostScheduler, ScheduledPostStore
 import base64
 from io import BytesIO
 
@@ -24,16 +30,13 @@ CORS(app)
 
 # Configure upload folder
 UPLOAD_FOLDER = 'uploads'
-ALLOWED_EXTENSIONS = {'png', 'jpg', 'jpeg', 'gif', 'bmp'}
 app.config['UPLOAD_FOLDER'] = UPLOAD_FOLDER
-app.config['MAX_CONTENT_LENGTH'] = 16 * 1024 * 1024  # 16MB max file size
+# Whole request limit: the image plus form fields
+app.config['MAX_CONTENT_LENGTH'] = MAX_UPLOAD_BYTES + 64 * 1024
 
 # Create uploads directory if it doesn't exist
 os.makedirs(UPLOAD_FOLDER, exist_ok=True)
 
-def allowed_file(filename):
-    return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
-
 # Global Instagram client
 instagram_client = None
 instagram_credentials = {
@@ -67,29 +70,9 @@ class InstagramManager:
             if image_path and os.path.exists(image_path):
                 media = self.client.photo_upload(image_path, content)
             else:
-                # Create a simple text image
-                from PIL import Image, ImageDraw, ImageFont
-                img = Image.new('RGB', (1080, 1080), color='white')
-                draw = ImageDraw.Draw(img)
-                try:
-                    font = ImageFont.truetype("arial.ttf", 48)
-                except:
-                    font = ImageFont.load_default()
-                
-                # Add text to image
-                y_pos = 400
-                for line in content.split('\n')[:5]:  # Max 5 lines
-                    if line.strip():
-                        bbox = draw.textbbox((0, 0), line, font=font)
-                        text_width = bbox[2] - bbox[0]
-                        x = (1080 - text_width) // 2
-                        draw.text((x, y_pos), line, fill='black', font=font)
-                        y_pos += 60
-                
-                temp_path = f"temp_post_{int(time.time())}.jpg"
-                img.save(temp_path, "JPEG")
-                media = self.client.photo_upload(temp_path, content)
-                os.remove(temp_path)
+                # Caption-only post: upload the caption drawn on an image
+                with text_renderer.image(content) as text_image_path:
+                    media = self.client.photo_upload(text_image_path, content)
             
             print(f"✅ Post uploaded successfully! ID: {media.id}")
             return {
@@ -102,58 +85,21 @@ class InstagramManager:
             print(f"❌ Post upload failed: {e}")
             return {'success': False, 'error': str(e)}
 
+# Caption images are rendered once per distinct text and reused
+text_renderer = TextRenderer(MediaCache(os.getenv('MEDIA_CACHE_DIR', DEFAULT_MEDIA_CACHE_DIR),
+                                        max_bytes=int(os.getenv('MEDIA_CACHE_MAX_MB', 1024)) * 1024 * 1024))
+
 # Global Instagram manager and scheduler
 insta_manager = InstagramManager()
-scheduled_posts = []  # Store scheduled posts
 
-class PostScheduler:
-    def __init__(self):
-        self.scheduled_posts = []
-        self.running = True
-        self.scheduler_thread = threading.Thread(target=self.run_scheduler, daemon=True)
-        self.scheduler_thread.start()
-    
-    def schedule_post(self, content, post_time, image_path=None):
-        post_id = str(uuid.uuid4())
-        scheduled_post = {
-            'id': post_id,
-            'content': content,
-            'image_path': image_path,
-            'scheduled_time': post_time,
-            'status': 'scheduled',
-            'created_at': datetime.now().isoformat()
-        }
-        self.scheduled_posts.append(scheduled_post)
-        scheduled_posts.append(scheduled_post)  # Global list for API
-        print(f"📅 Post scheduled for {post_time}")
-        return post_id
-    
-    def run_scheduler(self):
-        while self.running:
-            current_time = datetime.now()
-            posts_to_remove = []
-            
-            for post in self.scheduled_posts:
-                scheduled_time = datetime.fromisoformat(post['scheduled_time'])
-                if current_time >= scheduled_time and post['status'] == 'scheduled':
-                    print(f"⏰ Executing scheduled post: {post['id']}")
-                    result = insta_manager.post_content(
-                        content=post['content'],
-                        image_path=post.get('image_path')
-                    )
-                    if result.get('success'):
-                        post['status'] = 'posted'
-                        post['post_url'] = result.get('url', '')
-                        print(f"✅ Scheduled post posted successfully!")
-                    else:
-                        post['status'] = 'failed'
-                        post['error'] = result.get('error', 'Unknown error')
-                        print(f"❌ Scheduled post failed: {post.get('error')}")
-            
-            time.sleep(30)  # Check every 30 seconds
+publish_queue = PublishQueue(insta_manager.post_content, workers=int(os.getenv('DASHBOARD_PUBLISH_WORKERS', 1)))
+app.register_blueprint(create_dashboard_api(publish_queue, UPLOAD_FOLDER, MAX_UPLOAD_BYTES))
 
 # Initialize scheduler
-post_scheduler = PostScheduler()
+post_store = ScheduledPostStore(os.getenv('DASHBOARD_DB_PATH', 'dashboard_posts.db'),
+                                archive_days=int(os.getenv('DASHBOARD_ARCHIVE_DAYS', 90)))
+post_scheduler = PostScheduler(post_store, publish_queue,
+                               cache_size=int(os.getenv('DASHBOARD_SCHEDULER_CACHE', 1000)))
 
 @app.route('/')
 def dashboard():
@@ -296,7 +242,7 @@ This is so cool and efficient!
                 return;
             }
 
-            showStatus('📤 Uploading post to Instagram...', 'success');
+            showStatus('📤 Sending post...', 'success');
             
             const formData = new FormData();
             formData.append('content', content);
@@ -311,17 +257,10 @@ This is so cool and efficient!
             .then(response => response.json())
             .then(data => {
                 if (data.success) {
-                    showStatus('🎉 Post uploaded successfully!', 'success');
-                    document.getElementById('post-result').innerHTML = `
-                        <div class="post-result">
-                            <h3>🎉 Post Created Successfully!</h3>
-                            <p><strong>Post ID:</strong> ${data.post_id}</p>
-                            <p><strong>URL:</strong> <a href="${data.url}" target="_blank">${data.url}</a></p>
-                            <p><strong>View on Instagram:</strong> <a href="https://www.instagram.com/rishyashrunga/" target="_blank">@rishyashrunga</a></p>
-                        </div>
-                    `;
+                    showStatus('📤 Post queued, uploading to Instagram...', 'success');
                     document.getElementById('post-content').value = '';
                     removeImage();
+                    pollJob(data.job_id);
                 } else {
                     showStatus('❌ Post failed: ' + data.error, 'error');
                 }
@@ -331,6 +270,34 @@ This is so cool and efficient!
             });
         }
 
+        function pollJob(jobId) {
+            fetch(`/api/jobs/${jobId}`)
+                .then(response => response.json())
+                .then(data => {
+                    if (!data.success) {
+                        showStatus('❌ ' + data.error, 'error');
+                    } else if (data.job.status === 'posted') {
+                        const result = data.job.result;
+                        showStatus('🎉 Post uploaded successfully!', 'success');
+                        document.getElementById('post-result').innerHTML = `
+                            <div class="post-result">
+                                <h3>🎉 Post Created Successfully!</h3>
+                                <p><strong>Post ID:</strong> ${result.post_id}</p>
+                                <p><strong>URL:</strong> <a href="${result.url}" target="_blank">${result.url}</a></p>
+                                <p><strong>View on Instagram:</strong> <a href="https://www.instagram.com/rishyashrunga/" target="_blank">@rishyashrunga</a></p>
+                            </div>
+                        `;
+                    } else if (data.job.status === 'failed') {
+                        showStatus('❌ Post failed: ' + data.job.result.error, 'error');
+                    } else {
+                        setTimeout(() => pollJob(jobId), 2000);
+                    }
+                })
+                .catch(error => {
+                    showStatus('❌ Status error: ' + error, 'error');
+                });
+        }
+
         function schedulePost() {
             const content = document.getElementById('post-content').value.trim();
             const scheduleTime = document.getElementById('schedule-time').value;
@@ -459,53 +426,6 @@ def test_connection():
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)})
 
-@app.route('/api/create-post', methods=['POST'])
-def create_post():
-    try:
-        # Handle form data (with file upload)
-        if 'content' in request.form:
-            content = request.form.get('content', '')
-            image_path = None
-            
-            # Handle uploaded image
-            if 'image' in request.files:
-                file = request.files['image']
-                if file and file.filename and allowed_file(file.filename):
-                    filename = secure_filename(file.filename)
-                    # Add timestamp to avoid filename conflicts
-                    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S_')
-                    filename = timestamp + filename
-                    image_path = os.path.join(app.config['UPLOAD_FOLDER'], filename)
-                    file.save(image_path)
-                    print(f"📷 Image uploaded: {filename}")
-            
-            # Post with uploaded image or text content
-            result = insta_manager.post_content(content, image_path)
-            
-            # Clean up uploaded file after posting
-            if image_path and os.path.exists(image_path):
-                os.remove(image_path)
-                
-            return jsonify(result)
-            
-        # Handle JSON data (backward compatibility)
-        elif request.json:
-            data = request.json
-            content = data.get('content', '')
-            
-            if not content:
-                return jsonify({'success': False, 'error': 'No content provided'})
-            
-            result = insta_manager.post_content(content)
-            return jsonify(result)
-            
-        else:
-            return jsonify({'success': False, 'error': 'No content or image provided'})
-        
-    except Exception as e:
-        print(f"🚫 Create post error: {str(e)}")
-        return jsonify({'success': False, 'error': str(e)})
-
 @app.route('/api/schedule-post', methods=['POST'])
 def schedule_post():
     try:
@@ -517,15 +437,7 @@ def schedule_post():
             
             # Handle uploaded image for scheduling
             if 'image' in request.files:
-                file = request.files['image']
-                if file and file.filename and allowed_file(file.filename):
-                    filename = secure_filename(file.filename)
-                    # Add timestamp to avoid filename conflicts
-                    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S_')
-                    filename = 'scheduled_' + timestamp + filename
-                    image_path = os.path.join(app.config['UPLOAD_FOLDER'], filename)
-                    file.save(image_path)
-                    print(f"📷 Image saved for scheduling: {filename}")
+                image_path = save_upload(request.files['image'], UPLOAD_FOLDER, MAX_UPLOAD_BYTES, prefix='scheduled_')
             
             if not content and not image_path:
                 return jsonify({
@@ -566,9 +478,9 @@ def schedule_post():
                 'post_id': post_id
             })
             
-        # Handle JSON data (backward compatibility)
-        elif request.json:
-            data = request.json
+        # Handle JSON data (backward compatibility); a non-JSON body is a 400, not a 415
+        data = request.get_json(silent=True)
+        if data:
             content = data.get('content', '')
             scheduled_time = data.get('scheduledTime', '')
             
@@ -602,12 +514,13 @@ def schedule_post():
                 'post_id': post_id
             })
         
-        else:
-            return jsonify({
-                'success': False,
-                'error': 'No data provided'
-            })
+        return jsonify({
+            'success': False,
+            'error': 'No data provided'
+        }), 400
         
+    except (UploadTooLarge, HTTPException):
+        raise
     except Exception as e:
         print(f"🚫 Schedule error: {str(e)}")
         return jsonify({
@@ -620,7 +533,7 @@ def get_scheduled_posts():
     try:
         return jsonify({
             'success': True,
-            'posts': scheduled_posts
+            'posts': post_scheduler.get_posts()
         })
     except Exception as e:
         return jsonify({
@@ -631,14 +544,11 @@ def get_scheduled_posts():
 @app.route('/api/cancel-post/<post_id>', methods=['DELETE'])
 def cancel_scheduled_post(post_id):
     try:
-        global scheduled_posts
-        for post in scheduled_posts:
-            if post['id'] == post_id and post['status'] == 'scheduled':
-                post['status'] = 'cancelled'
-                return jsonify({
-                    'success': True,
-                    'message': 'Post cancelled successfully'
-                })
+        if post_scheduler.cancel_post(post_id):
+            return jsonify({
+                'success': True,
+                'message': 'Post cancelled successfully'
+            })
         
         return jsonify({
             'success': False,
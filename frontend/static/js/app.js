@@ -3,6 +3,7 @@
 const API_BASE_URL = window.location.origin;
 let authToken = localStorage.getItem('authToken');
 let currentUser = null;
+let eventSource = null;
 
 // Initialize app
 document.addEventListener('DOMContentLoaded', function() {
@@ -121,6 +122,7 @@ async function loadUserProfile() {
             currentUser = result.data;
             showSection('dashboard');
             loadDashboard();
+            subscribeToEvents();
         } else {
             logout();
         }
@@ -131,12 +133,32 @@ async function loadUserProfile() {
 }
 
 function logout() {
+    unsubscribeFromEvents();
     authToken = null;
     currentUser = null;
     localStorage.removeItem('authToken');
     showLogin();
 }
 
+// Live updates
+function subscribeToEvents() {
+    unsubscribeFromEvents();
+    eventSource = new EventSource(`${API_BASE_URL}/api/events?token=${encodeURIComponent(authToken)}`);
+    
+    eventSource.addEventListener('post.status', function() {
+        if (document.getElementById('dashboard-section').classList.contains('active')) {
+            loadDashboard();
+        }
+    });
+}
+
+function unsubscribeFromEvents() {
+    if (eventSource) {
+        eventSource.close();
+        eventSource = null;
+    }
+}
+
 // Navigation functions
 function showSection(sectionName) {
     // Hide all sections
@@ -255,11 +277,18 @@ async function handleSchedulePost(e) {
         return;
     }
     
+    // Reused if this submission is retried so the server creates one post
+    if (!e.target.dataset.idempotencyKey) {
+        e.target.dataset.idempotencyKey = crypto.randomUUID();
+    }
+    const idempotencyKey = e.target.dataset.idempotencyKey;
+    
     const data = {
         content: formData.get('content'),
         platforms: platforms,
         scheduled_time: new Date(formData.get('scheduled_time')).toISOString(),
-        media_url: formData.get('media_url') || null
+        media_url: formData.get('media_url') || null,
+        flexibility_minutes: parseInt(formData.get('flexibility_minutes') || '0', 10)
     };
     
     try {
@@ -267,12 +296,15 @@ async function handleSchedulePost(e) {
             method: 'POST',
             headers: {
                 'Content-Type': 'application/json',
-                'Authorization': `Bearer ${authToken}`
+                'Authorization': `Bearer ${authToken}`,
+                'Idempotency-Key': idempotencyKey
             },
             body: JSON.stringify(data)
         });
         
         const result = await response.json();
+        // The server answered, so a resubmission is a new request (the form may have been corrected)
+        delete e.target.dataset.idempotencyKey;
         
         if (result.success) {
             alert('Post scheduled successfully!');
@@ -6,10 +6,14 @@ Works without Flask server - Direct Instagram posting and scheduling.
 
 import sys
 import os
+import argparse
+import csv
 import json
 import sqlite3
+import heapq
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
-from threading import Timer
 import time
 
 # Add current directory to path
@@ -17,76 +21,227 @@ sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
 from backend.integrations.instagram_integration import InstagramIntegration
 
+# Statements are kept as constants: sqlite3 caches the compiled statement per
+# connection keyed by the SQL text, so each one is prepared once per thread
+CREATE_TABLE = '''
+    CREATE TABLE IF NOT EXISTS scheduled_posts (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        content TEXT NOT NULL,
+        scheduled_time TEXT NOT NULL,
+        status TEXT DEFAULT 'pending',
+        created_at TEXT DEFAULT CURRENT_TIMESTAMP,
+        posted_at TEXT
+    )
+'''
+CREATE_STATUS_INDEX = "CREATE INDEX IF NOT EXISTS idx_scheduled_posts_status ON scheduled_posts (status, scheduled_time)"
+INSERT_POST = "INSERT INTO scheduled_posts (content, scheduled_time) VALUES (?, ?)"
+SELECT_PENDING = "SELECT id, scheduled_time FROM scheduled_posts WHERE status = 'pending'"
+CLAIM_POST = "UPDATE scheduled_posts SET status = 'posting' WHERE id = ? AND status = 'pending'"
+SELECT_CONTENT = "SELECT content FROM scheduled_posts WHERE id = ?"
+MARK_POSTED = "UPDATE scheduled_posts SET status = 'posted', posted_at = ? WHERE id = ? AND status = 'posting'"
+MARK_FAILED = "UPDATE scheduled_posts SET status = 'failed' WHERE id = ? AND status = 'posting'"
+# Not retried: Instagram may have published a post before the process died
+FAIL_INTERRUPTED = "UPDATE scheduled_posts SET status = 'failed' WHERE status = 'posting'"
+SELECT_ALL = "SELECT * FROM scheduled_posts ORDER BY scheduled_time"
+DELETE_PENDING = "DELETE FROM scheduled_posts WHERE id = ? AND status = 'pending'"
+
+PRAGMAS = (
+    "PRAGMA journal_mode=WAL",     # readers don't block the posting threads
+    "PRAGMA synchronous=NORMAL",   # durable at checkpoints; safe with WAL
+    "PRAGMA busy_timeout=5000",    # wait for other writers instead of failing
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA cache_size=-8000",     # 8 MB page cache per connection
+)
+
+def open_database(db_path):
+    """
+    Open a connection to the scheduler database, creating the table if needed.
+    
+    Args:
+        db_path: SQLite database file
+        
+    Returns:
+        sqlite3.Connection: Connection with the scheduler's pragmas applied
+    """
+    conn = sqlite3.connect(db_path, check_same_thread=False)
+    for pragma in PRAGMAS:
+        conn.execute(pragma)
+    with conn:
+        conn.execute(CREATE_TABLE)
+        conn.execute(CREATE_STATUS_INDEX)
+    return conn
+
+def insert_posts(conn, posts):
+    """
+    Store posts as pending in a single transaction.
+    
+    Args:
+        conn: Connection from open_database()
+        posts: (content, scheduled_time) pairs
+        
+    Returns:
+        list: New post IDs, in the order of posts
+    """
+    with conn:
+        return [conn.execute(INSERT_POST, (content, scheduled_time.isoformat())).lastrowid
+                for content, scheduled_time in posts]
+
 class StandaloneScheduler:
-    def __init__(self):
-        self.db_path = "standalone_scheduler.db"
-        self.init_database()
+    def __init__(self, db_path="standalone_scheduler.db", config=None, workers=1):
+        """
+        Initialize the scheduler; start() begins posting.
+        
+        Args:
+            db_path: SQLite database file
+            config: Integration config (defaults to the account below)
+            workers: Posting threads; one by default since the Instagram client is shared
+        """
+        self.db_path = db_path
+        self.local = threading.local()
+        self.connections = []
+        self.connections_lock = threading.Lock()
+        # Opening the first connection creates the table
+        self.connection()
         
         # Your Instagram credentials
         class Config:
             INSTAGRAM_USERNAME = "rishyashrunga"
             INSTAGRAM_PASSWORD = "1234Gangamma"
         
-        self.config = Config()
+        self.config = config or Config()
         self.instagram = InstagramIntegration(self.config)
         
-    def init_database(self):
-        """Initialize SQLite database for storing scheduled posts."""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS scheduled_posts (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                content TEXT NOT NULL,
-                scheduled_time TEXT NOT NULL,
-                status TEXT DEFAULT 'pending',
-                created_at TEXT DEFAULT CURRENT_TIMESTAMP,
-                posted_at TEXT
-            )
-        ''')
-        conn.commit()
-        conn.close()
+        # A single timer thread waits for the earliest post in a heap of
+        # (due timestamp, post id) and hands due posts to a bounded pool
+        self.timers = []
+        self.condition = threading.Condition()
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='standalone-post')
+        self.running = False
+        self.timer_thread = None
+    
+    def start(self):
+        """Start the timer thread and resume pending posts from the database."""
+        with self.condition:
+            # Posts scheduled before start() are reloaded from the database with the rest
+            self.timers = []
+        self.fail_interrupted()
+        self.running = True
+        self.timer_thread = threading.Thread(target=self.run_timers, daemon=True)
+        self.timer_thread.start()
+        self.load_pending()
         
+    def connection(self):
+        """Get this thread's database connection, opening it on first use."""
+        conn = getattr(self.local, 'conn', None)
+        if conn is None:
+            # Only this thread uses it; close() may run elsewhere at shutdown
+            conn = open_database(self.db_path)
+            self.local.conn = conn
+            with self.connections_lock:
+                self.connections.append(conn)
+        return conn
+    
+    def close(self):
+        """Close every thread's connection."""
+        with self.connections_lock:
+            for conn in self.connections:
+                conn.close()
+            self.connections = []
+        self.local = threading.local()
+    
     def schedule_post(self, content, scheduled_time):
         """Schedule a post for future posting."""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        cursor.execute(
-            "INSERT INTO scheduled_posts (content, scheduled_time) VALUES (?, ?)",
-            (content, scheduled_time.isoformat())
-        )
-        post_id = cursor.lastrowid
-        conn.commit()
-        conn.close()
-        
         # Calculate delay
         delay = (scheduled_time - datetime.now()).total_seconds()
-        if delay > 0:
-            timer = Timer(delay, self.execute_post, [post_id])
-            timer.start()
-            print(f"✅ Post scheduled for {scheduled_time}")
-            print(f"📝 Content: {content[:50]}...")
-            print(f"🆔 Post ID: {post_id}")
-        else:
+        if delay <= 0:
             print("❌ Cannot schedule posts in the past")
-            
+            return None
+        
+        conn = self.connection()
+        with conn:
+            post_id = conn.execute(INSERT_POST, (content, scheduled_time.isoformat())).lastrowid
+        
+        self.add_timer(post_id, scheduled_time)
+        print(f"✅ Post scheduled for {scheduled_time}")
+        print(f"📝 Content: {content[:50]}...")
+        print(f"🆔 Post ID: {post_id}")
         return post_id
     
+    def import_posts(self, posts):
+        """
+        Schedule many posts in a single transaction.
+        
+        Args:
+            posts: (content, scheduled_time) pairs, all in the future
+            
+        Returns:
+            int: Number of posts stored
+        """
+        post_ids = insert_posts(self.connection(), posts)
+        if self.running:
+            for post_id, (_, scheduled_time) in zip(post_ids, posts):
+                self.add_timer(post_id, scheduled_time)
+        return len(post_ids)
+    
+    def add_timer(self, post_id, scheduled_time):
+        """Queue a post for the timer thread."""
+        with self.condition:
+            heapq.heappush(self.timers, (scheduled_time.timestamp(), post_id))
+            # Wake the timer thread in case this post is now the earliest
+            self.condition.notify()
+    
+    def fail_interrupted(self):
+        """Mark posts left mid-publish by a previous run as failed."""
+        conn = self.connection()
+        with conn:
+            interrupted = conn.execute(FAIL_INTERRUPTED).rowcount
+        if interrupted:
+            print(f"⚠️ Marked {interrupted} interrupted posts as failed")
+        return interrupted
+    
+    def load_pending(self):
+        """Queue pending posts left in the database by a previous run."""
+        pending = self.connection().execute(SELECT_PENDING).fetchall()
+        
+        for post_id, scheduled_time in pending:
+            # Posts missed while the scheduler was down are published right away
+            self.add_timer(post_id, datetime.fromisoformat(scheduled_time))
+        if pending:
+            print(f"♻️ Resumed {len(pending)} pending posts")
+        return len(pending)
+    
+    def run_timers(self):
+        """Timer thread: sleep until the earliest post is due, then dispatch it."""
+        with self.condition:
+            while self.running:
+                now = time.time()
+                while self.timers and self.timers[0][0] <= now:
+                    _, post_id = heapq.heappop(self.timers)
+                    self.executor.submit(self.execute_post, post_id)
+                timeout = self.timers[0][0] - now if self.timers else None
+                self.condition.wait(timeout)
+    
+    def stop(self, wait=True):
+        """Stop the timer thread; pending posts resume on the next start."""
+        with self.condition:
+            self.running = False
+            self.condition.notify()
+        self.executor.shutdown(wait=wait)
+        if wait:
+            self.close()
+    
     def execute_post(self, post_id):
         """Execute a scheduled post."""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        # Get post details
-        cursor.execute("SELECT content FROM scheduled_posts WHERE id = ? AND status = 'pending'", (post_id,))
-        result = cursor.fetchone()
+        conn = self.connection()
         
-        if not result:
+        # Claim the post so a cancel or a second dispatch cannot race the publish
+        with conn:
+            claimed = conn.execute(CLAIM_POST, (post_id,)).rowcount == 1
+        if not claimed:
             print(f"❌ Post {post_id} not found or already posted")
-            conn.close()
             return
         
-        content = result[0]
+        content = conn.execute(SELECT_CONTENT, (post_id,)).fetchone()[0]
         
         try:
             print(f"📤 Posting to Instagram... (Post ID: {post_id})")
@@ -94,35 +249,22 @@ class StandaloneScheduler:
             
             if success:
                 # Update status
-                cursor.execute(
-                    "UPDATE scheduled_posts SET status = 'posted', posted_at = ? WHERE id = ?",
-                    (datetime.now().isoformat(), post_id)
-                )
+                with conn:
+                    conn.execute(MARK_POSTED, (datetime.now().isoformat(), post_id))
                 print(f"✅ Successfully posted to Instagram! Post ID: {post_id}")
             else:
-                cursor.execute(
-                    "UPDATE scheduled_posts SET status = 'failed' WHERE id = ?",
-                    (post_id,)
-                )
+                with conn:
+                    conn.execute(MARK_FAILED, (post_id,))
                 print(f"❌ Failed to post to Instagram. Post ID: {post_id}")
                 
         except Exception as e:
             print(f"❌ Error posting: {str(e)}")
-            cursor.execute(
-                "UPDATE scheduled_posts SET status = 'failed' WHERE id = ?",
-                (post_id,)
-            )
-        
-        conn.commit()
-        conn.close()
+            with conn:
+                conn.execute(MARK_FAILED, (post_id,))
     
     def list_posts(self):
         """List all scheduled posts."""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        cursor.execute("SELECT * FROM scheduled_posts ORDER BY scheduled_time")
-        posts = cursor.fetchall()
-        conn.close()
+        posts = self.connection().execute(SELECT_ALL).fetchall()
         
         if not posts:
             print("📋 No scheduled posts found.")
@@ -142,17 +284,97 @@ class StandaloneScheduler:
     
     def cancel_post(self, post_id):
         """Cancel a scheduled post."""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        cursor.execute("DELETE FROM scheduled_posts WHERE id = ? AND status = 'pending'", (post_id,))
+        conn = self.connection()
+        with conn:
+            cursor = conn.execute(DELETE_PENDING, (post_id,))
         if cursor.rowcount > 0:
             print(f"✅ Post {post_id} cancelled successfully")
         else:
             print(f"❌ Post {post_id} not found or already processed")
-        conn.commit()
+
+def read_import_file(path, file_format=None):
+    """
+    Read posts to schedule from a CSV or JSON file.
+    
+    CSV files need a header with content and scheduled_time columns; JSON
+    files hold a list of objects with the same keys. Times are ISO 8601 or
+    YYYY-MM-DD HH:MM; times with an offset (e.g. Z or +02:00) are converted
+    to local time, which is what the scheduler stores.
+    
+    Args:
+        path: File to read
+        file_format: 'csv' or 'json' (default: from the file extension)
+        
+    Returns:
+        list: (content, scheduled_time) pairs
+        
+    Raises:
+        ValueError: Listing the invalid rows, if any
+    """
+    file_format = file_format or ('json' if path.lower().endswith('.json') else 'csv')
+    with open(path, newline='', encoding='utf-8') as handle:
+        rows = json.load(handle) if file_format == 'json' else list(csv.DictReader(handle))
+    
+    posts = []
+    errors = []
+    now = datetime.now()
+    for number, row in enumerate(rows, 1):
+        if not isinstance(row, dict):
+            errors.append(f"row {number}: expected an object")
+            continue
+        content = (row.get('content') or '').strip()
+        try:
+            scheduled_time = datetime.fromisoformat((row.get('scheduled_time') or '').strip())
+        except ValueError:
+            errors.append(f"row {number}: invalid scheduled_time {row.get('scheduled_time')!r}")
+            continue
+        if scheduled_time.tzinfo is not None:
+            scheduled_time = scheduled_time.astimezone().replace(tzinfo=None)
+        if not content:
+            errors.append(f"row {number}: missing content")
+        elif scheduled_time <= now:
+            errors.append(f"row {number}: scheduled_time {scheduled_time} is in the past")
+        else:
+            posts.append((content, scheduled_time))
+    
+    if errors:
+        shown = errors[:10] + ([f"... and {len(errors) - 10} more"] if len(errors) > 10 else [])
+        raise ValueError("\n".join(shown))
+    return posts
+
+def import_command(args):
+    """Schedule every post in a file, or none if any row is invalid."""
+    try:
+        posts = read_import_file(args.file, args.format)
+    except (OSError, ValueError) as e:
+        print(f"❌ Import failed, nothing scheduled:\n{str(e)}")
+        return 1
+    
+    # Only the database is needed; no Instagram login
+    conn = open_database(args.db)
+    try:
+        count = len(insert_posts(conn, posts))
+    finally:
         conn.close()
+    print(f"✅ Imported {count} posts; they are published once the scheduler is running")
+    return 0
+
+def cli(argv=None):
+    """Parse the command line; without a command, start the interactive menu."""
+    parser = argparse.ArgumentParser(description="Standalone Instagram post scheduler")
+    parser.add_argument('--db', default="standalone_scheduler.db", help="SQLite database file")
+    commands = parser.add_subparsers(dest='command')
+    import_parser = commands.add_parser('import', help="schedule posts from a CSV or JSON file")
+    import_parser.add_argument('file', help="CSV or JSON file with content and scheduled_time")
+    import_parser.add_argument('--format', choices=('csv', 'json'), help="default: from the file extension")
+    args = parser.parse_args(argv)
+    
+    if args.command == 'import':
+        return import_command(args)
+    main(args.db)
+    return 0
 
-def main():
+def main(db_path="standalone_scheduler.db"):
     """Main interactive function."""
     print("🚀 Standalone Instagram Scheduler for @rishyashrunga")
     print("=" * 60)
@@ -160,13 +382,14 @@ def main():
     print("📱 Direct Instagram posting")
     print("=" * 60)
     
-    scheduler = StandaloneScheduler()
+    scheduler = StandaloneScheduler(db_path)
     
     if scheduler.instagram.client is None:
         print("❌ Failed to connect to Instagram. Please check your credentials.")
         return
     
     print("✅ Connected to Instagram successfully!")
+    scheduler.start()
     
     while True:
         print("\n📱 Instagram Scheduler Menu:")
@@ -227,14 +450,15 @@ def main():
                 print("❌ Invalid post ID")
                 
         elif choice == "5":
-            print("👋 Goodbye!")
+            scheduler.stop()
+            print("👋 Goodbye! Pending posts resume next time the scheduler starts.")
             break
         else:
             print("❌ Invalid choice. Please enter 1-5.")
 
 if __name__ == "__main__":
     try:
-        main()
+        sys.exit(cli())
     except KeyboardInterrupt:
         print("\n\n👋 Scheduler stopped by user")
     except Exception as e:
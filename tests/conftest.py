@@ -0,0 +1,114 @@
+"""
+Fixtures and helpers shared by the test modules.
+
+Modules needing a different variant of a fixture (an embedded scheduler, a
+fake server with other settings) define their own, which takes precedence.
+"""
+import json
+import os
+import threading
+import time
+import pytest
+from werkzeug.serving import make_server
+from app import create_app
+from backend.integrations.fake_server import create_fake_platform_app
+from backend.models.database import db
+
+
+def wait_for(condition, timeout=5):
+    """Poll until condition() is true or the timeout passes."""
+    deadline = time.monotonic() + timeout
+    while not condition() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return condition()
+
+
+class RecordingPublisher:
+    """
+    Dashboard publish callable recording what it was asked to post.
+
+    Blocks while `gate` is clear. Returns `result`, raising it if it is an
+    exception; without one, captions starting with 'fail' are rate limited
+    and the rest succeed. `max_active` is the peak number of concurrent calls.
+    """
+
+    def __init__(self, result=None):
+        self.result = result
+        self.posts = []
+        self.gate = threading.Event()
+        self.gate.set()
+        self.active = 0
+        self.max_active = 0
+        self.lock = threading.Lock()
+
+    @property
+    def captions(self):
+        """Captions in publishing order."""
+        return [content for content, _, _ in self.posts]
+
+    def __call__(self, content, image_path=None):
+        self.gate.wait(5)
+        with self.lock:
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+        time.sleep(0.01)
+        with self.lock:
+            self.active -= 1
+            self.posts.append((content, image_path, image_path is not None and os.path.exists(image_path)))
+        if isinstance(self.result, Exception):
+            raise self.result
+        if self.result is not None:
+            return self.result
+        if content.startswith('fail'):
+            return {'success': False, 'error': 'Rate limited'}
+        return {'success': True, 'url': f'https://instagram.com/p/{content}'}
+
+
+@pytest.fixture
+def app():
+    """Create a test application that only enqueues posts."""
+    app = create_app('development', scheduler_role='api')
+    app.config['TESTING'] = True
+
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+@pytest.fixture
+def client(app):
+    """Create a test client for the app."""
+    return app.test_client()
+
+
+@pytest.fixture
+def auth_headers(client):
+    """Register a user and return authorization headers."""
+    response = client.post('/api/auth/register', data=json.dumps({
+        'username': 'testuser', 'email': 'test@example.com', 'password': 'password123'
+    }), content_type='application/json')
+    return {'Authorization': f"Bearer {response.get_json()['data']['token']}"}
+
+
+@pytest.fixture
+def fake_platform_app():
+    """Fake platform application with a fixed seed."""
+    return create_fake_platform_app(seed=1)
+
+
+@pytest.fixture
+def fake_server(fake_platform_app):
+    """Run the fake platform server (which also hosts media) on a free local port."""
+    server = make_server('127.0.0.1', 0, fake_platform_app, threaded=True)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f'http://127.0.0.1:{server.server_port}'
+    server.shutdown()
+
+
+@pytest.fixture
+def publisher():
+    """Recording dashboard publisher."""
+    return RecordingPublisher()
@@ -18,16 +18,12 @@ def app():
     with app.app_context():
         db.create_all()
         yield app
+        # Stop the embedded scheduler's polling before its tables go away
+        app.scheduler.shutdown()
         db.session.remove()
         db.drop_all()
 
 
-@pytest.fixture
-def client(app):
-    """Create a test client for the app."""
-    return app.test_client()
-
-
 class TestAuthentication:
     """Test authentication endpoints."""
     
@@ -156,6 +152,24 @@ class TestPosts:
         assert response.status_code == 200
         result = response.get_json()
         assert result['success'] is True
+    
+    def test_schedule_post_rejects_local_media(self, client):
+        """Test that media_url must be an http(s) URL."""
+        token = self.get_auth_token(client)
+        from datetime import datetime, timedelta
+        
+        for media_url in ['/etc/passwd', 'file:///app/.env']:
+            data = {
+                'content': 'Test post content',
+                'platforms': ['facebook'],
+                'scheduled_time': (datetime.utcnow() + timedelta(hours=1)).isoformat(),
+                'media_url': media_url
+            }
+            response = client.post('/api/posts',
+                                  data=json.dumps(data),
+                                  content_type='application/json',
+                                  headers={'Authorization': f'Bearer {token}'})
+            assert response.status_code == 400
 
 
 class TestAnalytics:
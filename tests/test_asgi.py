@@ -0,0 +1,230 @@
+"""
+Tests for the ASGI serving mode.
+"""
+import asyncio
+import json
+import threading
+import pytest
+from concurrent.futures import ThreadPoolExecutor
+from app import create_asgi_app
+from backend.models.database import db
+from backend.utils.asgi import WsgiToAsgi
+
+
+@pytest.fixture
+def asgi_app():
+    """Create an ASGI-wrapped test application."""
+    asgi_app = create_asgi_app('development')
+    app = asgi_app.flask_app
+    app.config['TESTING'] = True
+
+    with app.app_context():
+        db.create_all()
+    yield asgi_app
+    with app.app_context():
+        db.session.remove()
+        db.drop_all()
+    app.scheduler.shutdown()
+    asgi_app.executor.shutdown()
+    asgi_app.stream_executor.shutdown()
+
+
+async def call(app, method, path, body=b'', headers=()):
+    """Send one HTTP request through an ASGI app and collect the response."""
+    scope = {
+        'type': 'http',
+        'method': method,
+        'path': path,
+        'query_string': b'',
+        'headers': [(b'content-type', b'application/json'),
+                    (b'content-length', str(len(body)).encode())] + list(headers),
+        'client': ('127.0.0.1', 50000),
+        'server': ('testserver', 80),
+    }
+    incoming = [{'type': 'http.request', 'body': body, 'more_body': False}]
+    sent = []
+
+    async def receive():
+        if incoming:
+            return incoming.pop(0)
+        await asyncio.sleep(3600)
+
+    async def send(message):
+        sent.append(message)
+
+    await app(scope, receive, send)
+    body = b''.join(m.get('body', b'') for m in sent if m['type'] == 'http.response.body')
+    return sent[0]['status'], body
+
+
+class TestAsgiApp:
+    """Test requests served through the ASGI adapter."""
+
+    def test_health(self, asgi_app):
+        status, body = asyncio.run(call(asgi_app, 'GET', '/api/health'))
+        assert status == 200
+        assert json.loads(body) == {'status': 'healthy'}
+
+    def test_register_with_body(self, asgi_app):
+        data = json.dumps({
+            'username': 'asgiuser',
+            'email': 'asgi@example.com',
+            'password': 'password123'
+        }).encode()
+        status, body = asyncio.run(call(asgi_app, 'POST', '/api/auth/register', data))
+        assert status == 200
+        assert json.loads(body)['data']['user']['username'] == 'asgiuser'
+
+    def test_concurrent_requests(self, asgi_app):
+        async def run():
+            return await asyncio.gather(*[call(asgi_app, 'GET', '/api/health') for _ in range(20)])
+
+        assert all(status == 200 for status, _ in asyncio.run(run()))
+
+    def test_lifespan_shutdown(self, asgi_app):
+        calls = []
+        asgi_app.on_shutdown = lambda: calls.append('shutdown')
+        messages = [{'type': 'lifespan.startup'}, {'type': 'lifespan.shutdown'}]
+        sent = []
+
+        async def receive():
+            return messages.pop(0)
+
+        async def send(message):
+            sent.append(message['type'])
+
+        asyncio.run(asgi_app({'type': 'lifespan'}, receive, send))
+        assert calls == ['shutdown']
+        assert sent == ['lifespan.startup.complete', 'lifespan.shutdown.complete']
+
+
+def register(asgi_app, username):
+    """Register a user through the ASGI app and return its auth header."""
+    data = json.dumps({
+        'username': username,
+        'email': f'{username}@example.com',
+        'password': 'password123'
+    }).encode()
+    _, body = asyncio.run(call(asgi_app, 'POST', '/api/auth/register', data))
+    return (b'authorization', f"Bearer {json.loads(body)['data']['token']}".encode())
+
+
+class TestAwaitablePlatformCalls:
+    """Test that credential checks await platform calls off the request pool."""
+
+    def test_validate_does_not_hold_request_thread(self, asgi_app):
+        auth = register(asgi_app, 'validator')
+        released = threading.Event()
+        calls = []
+
+        def validate_credentials(platform, user_id=None):
+            calls.append((platform, user_id))
+            released.wait(5)
+            return True
+
+        asgi_app.flask_app.post_handler.validate_credentials = validate_credentials
+        # A single request thread: a blocking platform call would hold it
+        asgi_app.executor.shutdown()
+        asgi_app.executor = ThreadPoolExecutor(max_workers=1)
+        body = json.dumps({'platform': 'twitter'}).encode()
+
+        async def run():
+            check = asyncio.ensure_future(call(asgi_app, 'POST', '/api/accounts/validate', body, [auth]))
+            while not calls:
+                await asyncio.sleep(0.01)
+            health, _ = await asyncio.wait_for(call(asgi_app, 'GET', '/api/health'), 2)
+            released.set()
+            return health, await asyncio.wait_for(check, 5)
+
+        health, (status, response) = asyncio.run(run())
+        assert health == 200
+        assert status == 200
+        assert json.loads(response)['data'] == {'platform': 'twitter', 'valid': True}
+        assert calls == [('twitter', 1)]
+
+    def test_validate_rejects_bad_requests(self, asgi_app):
+        auth = register(asgi_app, 'validator')
+        body = json.dumps({'platform': 'myspace'}).encode()
+
+        status, _ = asyncio.run(call(asgi_app, 'POST', '/api/accounts/validate', body))
+        assert status == 401
+        status, response = asyncio.run(call(asgi_app, 'POST', '/api/accounts/validate', body, [auth]))
+        assert status == 400
+        assert json.loads(response) == {'error': 'Unknown platform'}
+
+    def test_wsgi_route_matches(self, asgi_app):
+        app = asgi_app.flask_app
+        app.post_handler.validate_credentials = lambda platform, user_id=None: False
+        auth = register(asgi_app, 'validator')
+        response = app.test_client().post('/api/accounts/validate', json={'platform': 'Facebook'},
+                                          headers={'Authorization': auth[1].decode()})
+        assert response.status_code == 200
+        assert response.get_json()['data'] == {'platform': 'facebook', 'valid': False}
+
+
+class TestEventStreams:
+    """Test that open event streams do not occupy request threads."""
+
+    def test_streams_do_not_block_requests(self, asgi_app):
+        app = asgi_app.flask_app
+        # Streams block waiting for events until an event wakes them
+        app.config['SSE_KEEPALIVE_SECONDS'] = 60
+        data = json.dumps({
+            'username': 'streamer',
+            'email': 'streamer@example.com',
+            'password': 'password123'
+        }).encode()
+        _, body = asyncio.run(call(asgi_app, 'POST', '/api/auth/register', data))
+        user = json.loads(body)['data']
+        token = user['token']
+        # A single request thread: a stream holding it would block everything else
+        adapter = WsgiToAsgi(app, max_workers=1, max_streams=4)
+
+        async def open_stream(closed, sent):
+            incoming = [{'type': 'http.request', 'body': b'', 'more_body': False}]
+
+            async def receive():
+                if incoming:
+                    return incoming.pop(0)
+                await closed.wait()
+                return {'type': 'http.disconnect'}
+
+            async def send(message):
+                sent.append(message)
+
+            await adapter({
+                'type': 'http', 'method': 'GET', 'path': '/api/events', 'query_string': b'',
+                'headers': [(b'authorization', f'Bearer {token}'.encode())],
+                'server': ('testserver', 80),
+            }, receive, send)
+
+        async def run():
+            closed = asyncio.Event()
+            sent = [[], []]
+            streams = [asyncio.ensure_future(open_stream(closed, messages)) for messages in sent]
+            await asyncio.sleep(0.2)
+            status, _ = await asyncio.wait_for(call(adapter, 'GET', '/api/health'), 5)
+            subscribers = app.event_hub.subscriber_count()
+            closed.set()
+            app.event_hub.publish(user['user']['id'], 'post.status', {'post_id': 1, 'status': 'posted'})
+            await asyncio.wait_for(asyncio.gather(*streams), 5)
+            return status, subscribers, sent
+
+        try:
+            status, subscribers, sent = asyncio.run(run())
+        finally:
+            adapter.executor.shutdown()
+            adapter.stream_executor.shutdown()
+
+        assert status == 200
+        assert subscribers == 2
+        for messages in sent:
+            assert messages[0]['status'] == 200
+            assert (b'content-type', b'text/event-stream; charset=utf-8') in messages[0]['headers']
+            assert messages[1]['body'] == b'retry: 5000\n\n'
+        assert app.event_hub.subscriber_count() == 0
+
+    def test_is_streaming(self):
+        assert WsgiToAsgi.is_streaming([(b'content-type', b'text/event-stream; charset=utf-8')])
+        assert not WsgiToAsgi.is_streaming([(b'content-type', b'application/json')])
+        assert not WsgiToAsgi.is_streaming([])
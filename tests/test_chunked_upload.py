@@ -0,0 +1,149 @@
+"""
+Tests for streaming chunked media uploads.
+"""
+import json
+import os
+import threading
+import tracemalloc
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import pytest
+import requests
+from backend.core.post_handler import PostHandler
+from backend.integrations.fake_client import FakeGraphAPI, FakePlatformError, FakeTwitterAPI
+from backend.integrations.fake_server import create_fake_platform_app
+from backend.media.upload import MediaSource, upload_page_video
+
+CHUNK = 64 * 1024
+
+
+@pytest.fixture
+def fake_platform_app():
+    """Fake platform application that accepts 100 KB upload chunks."""
+    return create_fake_platform_app(seed=1, settings={'upload_chunk_bytes': 100 * 1024})
+
+
+@pytest.fixture
+def sink_server():
+    """
+    Minimal upload endpoint that discards request bodies as they arrive.
+
+    Keeps server-side buffering out of client memory measurements, since
+    both run in the test process.
+    """
+    class Handler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            remaining = int(self.headers['Content-Length'])
+            while remaining:
+                remaining -= len(self.rfile.read(min(remaining, 64 * 1024)))
+            body = json.dumps({'media_id': 1, 'media_id_string': '1'}).encode()
+            self.send_response(200)
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f'http://127.0.0.1:{server.server_port}'
+    server.shutdown()
+
+
+def make_file(path, size):
+    """Write size random bytes to path."""
+    with open(path, 'wb') as handle:
+        handle.write(os.urandom(size))
+    return str(path)
+
+
+def stats(url, platform):
+    """Get a platform's counters from the fake server."""
+    return requests.get(f'{url}/__stats').json()[platform]
+
+
+class TestMediaSource:
+    """Test memory-mapped chunk reads."""
+
+    def test_chunks_cover_file(self, tmp_path):
+        path = make_file(tmp_path / 'clip.mp4', 3 * CHUNK + 10)
+        with MediaSource(path) as source:
+            chunks = list(source.chunks(CHUNK))
+            assert source.media_type == 'video/mp4'
+
+        assert [offset for offset, _ in chunks] == [0, CHUNK, 2 * CHUNK, 3 * CHUNK]
+        with open(path, 'rb') as handle:
+            assert b''.join(chunk for _, chunk in chunks) == handle.read()
+
+    def test_empty_file(self, tmp_path):
+        path = make_file(tmp_path / 'empty.mp4', 0)
+        with MediaSource(path) as source:
+            assert list(source.chunks(CHUNK)) == []
+
+
+class TestTwitterChunkedUpload:
+    """Test INIT / APPEND / FINALIZE."""
+
+    def test_upload_sent_in_bounded_chunks(self, fake_server, tmp_path):
+        path = make_file(tmp_path / 'clip.mp4', 10 * CHUNK + 123)
+        client = FakeTwitterAPI(fake_server, chunk_size=CHUNK)
+        media = client.media_upload(path, chunked=True, media_category='tweet_video')
+
+        counts = stats(fake_server, 'twitter')
+        assert media.media_id_string
+        assert counts['uploads'] == 1
+        assert counts['upload_bytes'] == os.path.getsize(path)
+        assert counts['max_chunk_bytes'] == CHUNK
+
+    def test_incomplete_upload_rejected(self, fake_server):
+        client = FakeTwitterAPI(fake_server)
+        media = client.send('POST', '/1.1/media/upload.json', data={'command': 'INIT', 'total_bytes': 100})
+        with pytest.raises(FakePlatformError):
+            client.send('POST', '/1.1/media/upload.json',
+                        data={'command': 'FINALIZE', 'media_id': media['media_id_string']})
+
+    def test_memory_bounded_by_chunk_size(self, sink_server, tmp_path):
+        size = 16 * 1024 * 1024
+        path = make_file(tmp_path / 'large.mp4', size)
+        client = FakeTwitterAPI(sink_server, chunk_size=256 * 1024)
+
+        tracemalloc.start()
+        try:
+            client.media_upload(path, chunked=True)
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        # A few copies of one chunk while encoding the request, never the file
+        assert peak < 8 * 256 * 1024
+
+
+class TestGraphVideoUpload:
+    """Test start / transfer / finish uploads to a page."""
+
+    def test_video_published_in_server_ranges(self, fake_server, tmp_path):
+        path = make_file(tmp_path / 'clip.mp4', 5 * CHUNK + 7)
+        client = FakeGraphAPI(fake_server)
+        result = upload_page_video(client, '1234', path, chunk_size=CHUNK, description='hello')
+
+        counts = stats(fake_server, 'facebook')
+        assert result['success'] is True
+        assert counts['published'] == 1
+        assert counts['upload_bytes'] == os.path.getsize(path)
+        assert counts['max_chunk_bytes'] <= CHUNK
+
+    def test_post_handler_uploads_video(self, fake_server, tmp_path):
+        handler = PostHandler({
+            'PLATFORM_API_MODE': 'fake',
+            'FAKE_PLATFORM_URL': fake_server,
+            'FACEBOOK_PAGE_ID': '1234',
+            'MEDIA_CACHE_DIR': str(tmp_path / 'media'),
+            'MEDIA_TRANSCODE_WORKERS': 0,
+            'MEDIA_UPLOAD_CHUNK_KB': 64
+        })
+        path = make_file(tmp_path / 'clip.mp4', 4 * CHUNK)
+
+        assert handler.post_to_platform('facebook', 'video', media_path=path) is True
+        assert handler.post_to_platform('twitter', 'video', media_path=path) is True
+        assert stats(fake_server, 'facebook')['upload_bytes'] == 4 * CHUNK
+        assert stats(fake_server, 'twitter')['max_chunk_bytes'] == CHUNK
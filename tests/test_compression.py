@@ -0,0 +1,103 @@
+"""
+Tests for response compression and static asset caching.
+"""
+import gzip
+import json
+import zlib
+import pytest
+from app import create_app
+from backend.models.database import db
+from backend.utils.compression import compress_stream
+
+
+@pytest.fixture
+def app():
+    """Create and configure a test application instance."""
+    app = create_app('development')
+    app.config['TESTING'] = True
+
+    @app.route('/test/large')
+    def large():
+        return app.response_class(json.dumps({'data': 'x' * 5000}), mimetype='application/json')
+
+    @app.route('/test/stream')
+    def stream():
+        return app.response_class((f'chunk {i}\n' for i in range(3)), mimetype='text/plain')
+
+    with app.app_context():
+        db.create_all()
+        yield app
+        # Stop the embedded scheduler's polling before its tables go away
+        app.scheduler.shutdown()
+        db.session.remove()
+        db.drop_all()
+
+
+class TestCompression:
+    """Test dynamic response compression."""
+
+    def test_large_response_gzipped(self, client):
+        response = client.get('/test/large', headers={'Accept-Encoding': 'gzip'})
+        assert response.headers['Content-Encoding'] == 'gzip'
+        assert 'Accept-Encoding' in response.headers['Vary']
+        assert json.loads(gzip.decompress(response.data))['data'] == 'x' * 5000
+
+    def test_small_response_not_compressed(self, client):
+        response = client.get('/api/health', headers={'Accept-Encoding': 'gzip'})
+        assert 'Content-Encoding' not in response.headers
+
+    def test_no_accept_encoding(self, client):
+        response = client.get('/test/large')
+        assert 'Content-Encoding' not in response.headers
+
+    def test_streamed_response(self, client):
+        response = client.get('/test/stream', headers={'Accept-Encoding': 'gzip'})
+        assert response.headers['Content-Encoding'] == 'gzip'
+        assert gzip.decompress(response.data) == b'chunk 0\nchunk 1\nchunk 2\n'
+
+    def test_stream_chunks_decode_incrementally(self):
+        decoder = zlib.decompressobj(31)
+        chunks = compress_stream(iter([b'first', b'second']), 'gzip')
+        assert decoder.decompress(next(chunks)) == b'first'
+        assert decoder.decompress(next(chunks)) == b'second'
+
+
+class TestStaticAssets:
+    """Test static asset versioning and caching."""
+
+    def test_index_uses_versioned_urls(self, app, client):
+        html = client.get('/').get_data(as_text=True)
+        version = app.compressor.asset_hash('js/app.js')
+        assert f'/static/js/app.js?v={version}' in html
+
+    def test_versioned_asset_is_immutable(self, app, client):
+        version = app.compressor.asset_hash('css/styles.css')
+        response = client.get(f'/static/css/styles.css?v={version}', headers={'Accept-Encoding': 'gzip'})
+        assert response.cache_control.max_age == app.config['STATIC_MAX_AGE']
+        assert response.cache_control.immutable
+        assert response.headers['Content-Encoding'] == 'gzip'
+        with open(f'{app.static_folder}/css/styles.css', 'rb') as f:
+            assert gzip.decompress(response.data) == f.read()
+        response.close()
+
+    def test_compressed_asset_revalidates(self, client):
+        response = client.get('/static/css/styles.css', headers={'Accept-Encoding': 'gzip'})
+        etag = response.headers['ETag']
+        assert etag.endswith('-gzip"')
+        response.close()
+
+        response = client.get('/static/css/styles.css',
+                              headers={'Accept-Encoding': 'gzip', 'If-None-Match': etag})
+        assert response.status_code == 304
+        assert response.headers['ETag'] == etag
+        assert response.data == b''
+        response.close()
+
+        response = client.get('/static/css/styles.css', headers={'If-None-Match': etag})
+        assert response.status_code == 200
+        response.close()
+
+    def test_unversioned_asset_not_immutable(self, client):
+        response = client.get('/static/css/styles.css')
+        assert not response.cache_control.immutable
+        response.close()
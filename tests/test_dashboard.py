@@ -0,0 +1,169 @@
+"""
+Tests for the dashboard publish queue and upload API.
+"""
+import io
+import os
+import pytest
+from flask import Flask
+from backend.dashboard.api import create_dashboard_api
+from backend.dashboard.publisher import PublishQueue
+from conftest import wait_for
+
+MAX_UPLOAD_BYTES = 1024
+
+
+@pytest.fixture
+def publish_queue(publisher):
+    publish_queue = PublishQueue(publisher)
+    yield publish_queue
+    publisher.gate.set()
+    publish_queue.shutdown()
+
+
+@pytest.fixture
+def client(tmp_path, publish_queue):
+    app = Flask(__name__)
+    app.config['MAX_CONTENT_LENGTH'] = 4 * MAX_UPLOAD_BYTES
+    app.register_blueprint(create_dashboard_api(publish_queue, str(tmp_path / 'uploads'), MAX_UPLOAD_BYTES))
+    return app.test_client()
+
+
+def finished_job(client, location):
+    """Poll a job until it finishes and return it."""
+    jobs = []
+
+    def finished():
+        jobs.append(client.get(location).get_json()['job'])
+        return jobs[-1]['finished_at'] is not None
+
+    assert wait_for(finished)
+    return jobs[-1]
+
+
+class TestPublishQueue:
+    """Test background publishing."""
+
+    def test_job_reports_result(self, publish_queue, publisher):
+        job_id = publish_queue.submit('Hello')
+
+        assert wait_for(lambda: publish_queue.get(job_id)['finished_at'])
+        job = publish_queue.get(job_id)
+        assert job['status'] == 'posted'
+        assert job['result'] == {'success': True, 'url': 'https://instagram.com/p/Hello'}
+        assert publisher.posts == [('Hello', None, False)]
+
+    def test_failures_recorded(self, publisher, publish_queue):
+        publisher.result = RuntimeError('boom')
+        job_id = publish_queue.submit('Hello')
+
+        assert wait_for(lambda: publish_queue.get(job_id)['finished_at'])
+        assert publish_queue.get(job_id)['status'] == 'failed'
+        assert publish_queue.get(job_id)['result'] == {'success': False, 'error': 'boom'}
+
+    def test_non_dict_result_is_failed_login(self, publisher, publish_queue):
+        publisher.result = False
+        job_id = publish_queue.submit('Hello')
+
+        assert wait_for(lambda: publish_queue.get(job_id)['finished_at'])
+        assert publish_queue.get(job_id)['result']['error'] == 'Instagram login failed'
+
+    def test_image_removed_after_publishing(self, tmp_path, publisher, publish_queue):
+        image = tmp_path / 'photo.jpg'
+        image.write_bytes(b'jpeg')
+        job_id = publish_queue.submit('Hello', str(image))
+
+        assert wait_for(lambda: publish_queue.get(job_id)['finished_at'])
+        assert publisher.posts == [('Hello', str(image), True)]
+        assert not image.exists()
+
+    def test_unfinished_jobs_never_evicted(self, publisher):
+        publisher.gate.clear()
+        publish_queue = PublishQueue(publisher, max_jobs=2)
+        try:
+            job_ids = [publish_queue.submit(f'post {i}') for i in range(4)]
+            assert all(publish_queue.get(job_id) for job_id in job_ids)
+
+            publisher.gate.set()
+            assert wait_for(lambda: publish_queue.get(job_ids[-1])['finished_at'])
+            publish_queue.submit('one more')
+            assert publish_queue.get(job_ids[0]) is None
+        finally:
+            publisher.gate.set()
+            publish_queue.shutdown()
+
+
+class TestDashboardApi:
+    """Test the create-post and job endpoints."""
+
+    def test_create_post_accepted(self, client, publisher):
+        response = client.post('/api/create-post', data={'content': 'Hello'})
+
+        assert response.status_code == 202
+        body = response.get_json()
+        assert response.headers['Location'] == body['status_url'] == f"/api/jobs/{body['job_id']}"
+        job = finished_job(client, response.headers['Location'])
+        assert job['status'] == 'posted'
+        assert publisher.posts == [('Hello', None, False)]
+
+    def test_job_queued_until_published(self, client, publisher):
+        publisher.gate.clear()
+        response = client.post('/api/create-post', json={'content': 'Hello'})
+
+        job = client.get(response.headers['Location']).get_json()['job']
+        assert job['status'] in ('queued', 'publishing')
+        assert job['finished_at'] is None
+        publisher.gate.set()
+        assert finished_job(client, response.headers['Location'])['status'] == 'posted'
+
+    def test_failed_post_reported(self, client, publisher):
+        publisher.result = {'success': False, 'error': 'Rate limited'}
+        response = client.post('/api/create-post', json={'content': 'Hello'})
+
+        job = finished_job(client, response.headers['Location'])
+        assert job['status'] == 'failed'
+        assert job['result']['error'] == 'Rate limited'
+
+    def test_uploaded_image_published_and_removed(self, client, publisher):
+        response = client.post('/api/create-post', data={
+            'content': 'Hello',
+            'image': (io.BytesIO(b'x' * 100), 'photo.jpg')
+        })
+
+        assert finished_job(client, response.headers['Location'])['status'] == 'posted'
+        (content, image_path, existed), = publisher.posts
+        assert existed
+        assert image_path.endswith('_photo.jpg')
+        assert not os.path.exists(image_path)
+
+    def test_unknown_job_not_found(self, client):
+        response = client.get('/api/jobs/missing')
+
+        assert response.status_code == 404
+        assert response.get_json() == {'success': False, 'error': 'Job not found'}
+
+    def test_missing_content_rejected(self, client, publisher):
+        response = client.post('/api/create-post', json={'content': ''})
+
+        assert response.get_json() == {'success': False, 'error': 'No content provided'}
+        assert publisher.posts == []
+
+    def test_oversized_request_rejected(self, client, publisher):
+        response = client.post('/api/create-post', data={
+            'content': 'Hello',
+            'image': (io.BytesIO(b'x' * (8 * MAX_UPLOAD_BYTES)), 'photo.jpg')
+        })
+
+        assert response.status_code == 413
+        assert response.get_json()['success'] is False
+        assert publisher.posts == []
+
+    def test_oversized_image_rejected(self, tmp_path, client, publisher):
+        # Under the request limit, over the image cap: refused while streaming
+        response = client.post('/api/create-post', data={
+            'content': 'Hello',
+            'image': (io.BytesIO(b'x' * (2 * MAX_UPLOAD_BYTES)), 'photo.jpg')
+        })
+
+        assert response.status_code == 413
+        assert publisher.posts == []
+        assert os.listdir(tmp_path / 'uploads') == []
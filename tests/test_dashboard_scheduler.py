@@ -0,0 +1,243 @@
+"""
+Tests for dashboard post scheduling.
+"""
+import threading
+import time
+from datetime import datetime
+import pytest
+from backend.dashboard.publisher import PublishQueue
+from backend.dashboard.scheduler import PostScheduler, ScheduledPostStore
+from conftest import wait_for
+
+
+def at(seconds):
+    """Local ISO time `seconds` from now."""
+    return datetime.fromtimestamp(time.time() + seconds).isoformat()
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = ScheduledPostStore(str(tmp_path / 'posts.db'))
+    yield store
+    store.close()
+
+
+@pytest.fixture
+def publish_queue(publisher):
+    publish_queue = PublishQueue(publisher, workers=4)
+    yield publish_queue
+    publish_queue.shutdown()
+
+
+@pytest.fixture
+def make_scheduler(store, publish_queue):
+    schedulers = []
+
+    def make_scheduler(cache_size=1000):
+        scheduler = PostScheduler(store, publish_queue, cache_size=cache_size)
+        schedulers.append(scheduler)
+        return scheduler
+
+    yield make_scheduler
+    for scheduler in schedulers:
+        scheduler.stop()
+
+
+def statuses(store):
+    return {post['content']: post['status'] for post in store.list_posts()}
+
+
+class TestPostScheduler:
+    """Test publishing at the due time."""
+
+    def test_posts_published_in_due_order(self, make_scheduler, publisher, store):
+        scheduler = make_scheduler()
+        for content, delay in [('third', 0.3), ('first', 0.1), ('second', 0.2)]:
+            scheduler.schedule_post(content, at(delay))
+
+        assert wait_for(lambda: len(publisher.captions) == 3)
+        assert publisher.captions == ['first', 'second', 'third']
+        assert wait_for(lambda: set(statuses(store).values()) == {'posted'})
+
+    def test_nothing_published_early(self, make_scheduler, publisher):
+        scheduler = make_scheduler()
+        scheduler.schedule_post('later', at(60))
+
+        time.sleep(0.2)
+        assert publisher.captions == []
+        assert scheduler.store.next_due(10)[0]['status'] == 'scheduled'
+
+    def test_outcome_archived(self, make_scheduler, store):
+        scheduler = make_scheduler()
+        scheduler.schedule_post('ok', at(0))
+        scheduler.schedule_post('fail', at(0))
+
+        assert wait_for(lambda: statuses(store) == {'ok': 'posted', 'fail': 'failed'})
+        archived = {post['content']: post for post in store.list_posts()}
+        assert archived['ok']['post_url'] == 'https://instagram.com/p/ok'
+        assert archived['fail']['error'] == 'Rate limited'
+
+    def test_published_through_publish_queue(self, make_scheduler, publisher, publish_queue):
+        # Due posts share the queue's workers instead of a pool of their own
+        scheduler = make_scheduler()
+        for index in range(8):
+            scheduler.schedule_post(f'post {index}', at(0))
+
+        assert wait_for(lambda: len(publisher.captions) == 8)
+        assert publisher.max_active <= len(publish_queue._workers)
+        assert len(publish_queue.jobs) == 8
+
+    def test_cancelled_post_not_published(self, tmp_path, make_scheduler, publisher, store):
+        image = tmp_path / 'photo.jpg'
+        image.write_bytes(b'jpeg')
+        scheduler = make_scheduler()
+        post_id = scheduler.schedule_post('cancelled', at(0.2), str(image))
+        scheduler.schedule_post('kept', at(0.3))
+
+        assert scheduler.cancel_post(post_id)
+        assert wait_for(lambda: publisher.captions == ['kept'])
+        assert statuses(store)['cancelled'] == 'cancelled'
+        assert not image.exists()
+        assert not scheduler.cancel_post(post_id)
+
+
+def make_post(post_id, due, status='scheduled'):
+    return {
+        'id': post_id,
+        'content': post_id,
+        'scheduled_time': datetime.fromtimestamp(due).isoformat(),
+        'due': due,
+        'status': status,
+        'created_at': datetime.now().isoformat()
+    }
+
+
+class TestScheduledPostStore:
+    """Test the SQLite store of scheduled posts."""
+
+    def test_next_due_includes_ties(self, store):
+        for index, due in enumerate([3, 1, 2, 2, 2, 5]):
+            store.add(make_post(f'post {index}', due))
+
+        assert [post['due'] for post in store.next_due(2)] == [1, 2, 2, 2]
+        assert len(store.next_due(10)) == 6
+
+    def test_cancel_after_claim_fails(self, store):
+        store.add(make_post('a', 1))
+
+        assert store.claim('a')
+        assert not store.archive('a', 'cancelled', expected='scheduled')
+        assert store.get('a')['status'] == 'publishing'
+
+    def test_claim_after_cancel_fails(self, store):
+        store.add(make_post('a', 1))
+
+        assert store.archive('a', 'cancelled', expected='scheduled')
+        assert not store.claim('a')
+        assert store.get('a') is None
+
+    def test_cancel_racing_claim_has_one_winner(self, store):
+        for index in range(50):
+            store.add(make_post(f'post {index}', index))
+        barrier = threading.Barrier(2)
+        results = {}
+
+        def run(name, action):
+            barrier.wait()
+            results[name] = [action(f'post {index}') for index in range(50)]
+
+        threads = [
+            threading.Thread(target=run, args=('claimed', store.claim)),
+            threading.Thread(target=run, args=('cancelled', lambda post_id: store.archive(
+                post_id, 'cancelled', expected='scheduled')))
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        for claimed, cancelled in zip(results['claimed'], results['cancelled']):
+            assert claimed != cancelled
+        assert len(store.list_posts()) == 50
+
+    def test_recover_fails_interrupted_posts(self, tmp_path, store):
+        store.add(make_post('interrupted', 1))
+        store.add(make_post('waiting', 2))
+        store.claim('interrupted')
+        store.close()
+
+        reopened = ScheduledPostStore(str(tmp_path / 'posts.db'))
+        try:
+            reopened.recover()
+            posts = {post['id']: post for post in reopened.list_posts()}
+            assert posts['interrupted']['status'] == 'failed'
+            assert posts['interrupted']['error'] == 'Interrupted by restart'
+            assert posts['waiting']['status'] == 'scheduled'
+            assert reopened.get('interrupted') is None
+        finally:
+            reopened.close()
+
+    def test_recover_prunes_old_archive(self, store):
+        store.add(make_post('old', 1))
+        store.add(make_post('new', 2))
+        store.archive('old', 'cancelled', expected='scheduled')
+        store.archive('new', 'cancelled', expected='scheduled')
+        with store.conn:
+            store.conn.execute("UPDATE archived_posts SET finished_at = '2000-01-01T00:00:00' WHERE id = 'old'")
+
+        store.recover()
+        assert [post['id'] for post in store.list_posts()] == ['new']
+
+
+class TestSchedulerCache:
+    """Test refilling the in-memory heap from the store."""
+
+    def test_restart_fails_interrupted_and_publishes_pending(self, store, publisher, make_scheduler):
+        store.add(make_post('interrupted', time.time() - 10))
+        store.claim('interrupted')
+        store.add(make_post('pending', time.time() - 5))
+
+        make_scheduler()
+        assert wait_for(lambda: statuses(store) == {'interrupted': 'failed', 'pending': 'posted'})
+        assert publisher.captions == ['pending']
+
+    def test_cache_limited_to_earliest_posts(self, store, make_scheduler):
+        for index in range(10):
+            store.add(make_post(f'post {index}', time.time() + 60 + index))
+
+        scheduler = make_scheduler(cache_size=4)
+        assert sorted(scheduler.posts) == ['post 0', 'post 1', 'post 2', 'post 3']
+        assert scheduler.horizon == scheduler.posts['post 3']['due']
+
+    def test_reload_when_cache_drains(self, store, publisher, make_scheduler):
+        now = time.time()
+        for index in range(10):
+            store.add(make_post(f'post {index}', now + 0.05 + index * 0.02))
+
+        scheduler = make_scheduler(cache_size=3)
+        assert len(scheduler.posts) == 3
+        assert wait_for(lambda: len(publisher.captions) == 10)
+        assert sorted(publisher.captions) == sorted(f'post {index}' for index in range(10))
+        assert scheduler.horizon == float('inf')
+
+    def test_posts_past_horizon_left_in_store(self, store, make_scheduler):
+        for index in range(4):
+            store.add(make_post(f'post {index}', time.time() + 60 + index))
+
+        scheduler = make_scheduler(cache_size=2)
+        scheduler.schedule_post('late', at(600))
+        assert 'late' not in [post['content'] for post in scheduler.posts.values()]
+        assert statuses(store)['late'] == 'scheduled'
+
+    def test_reload_when_cache_overflows(self, store, make_scheduler):
+        for index in range(2):
+            store.add(make_post(f'post {index}', time.time() + 600 + index))
+
+        scheduler = make_scheduler(cache_size=2)
+        # Posts earlier than the horizon are cached until the cache passes 2 * cache_size
+        for index in range(5):
+            scheduler.schedule_post(f'early {index}', at(60 + index))
+
+        assert len(scheduler.posts) == 2
+        assert sorted(post['content'] for post in scheduler.posts.values()) == ['early 0', 'early 1']
+        assert len(store.next_due(100)) == 7
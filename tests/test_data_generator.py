@@ -0,0 +1,60 @@
+"""
+Tests for the synthetic data generator.
+"""
+from datetime import datetime
+from benchmarks.generate_data import DataGenerator, generate, zipf_counts
+from backend.models.database import db, User, ScheduledPost, Analytics
+
+
+NOW = datetime(2030, 1, 1)
+
+
+class TestDistributions:
+    """Test the shape of generated data."""
+
+    def test_zipf_counts_sum_and_skew(self):
+        counts = zipf_counts(10000, 100, 1.1)
+        assert sum(counts) == 10000
+        assert counts[0] > 10 * counts[-1]
+
+    def test_deterministic_by_seed(self):
+        first = list(DataGenerator(20, 500, seed=7, now=NOW).post_and_analytics_rows())
+        second = list(DataGenerator(20, 500, seed=7, now=NOW).post_and_analytics_rows())
+        other = list(DataGenerator(20, 500, seed=8, now=NOW).post_and_analytics_rows())
+        assert first == second
+        assert first != other
+
+    def test_past_posts_published_and_future_pending(self):
+        posts = [row for table, row in DataGenerator(20, 500, now=NOW, days_ahead=30).post_and_analytics_rows()
+                 if table == 'scheduled_posts']
+        assert all((row['status'] == 'pending') == (row['scheduled_time'] >= NOW) for row in posts)
+        assert any(row['status'] == 'pending' for row in posts)
+
+    def test_no_pending_posts_by_default(self):
+        posts = [row for table, row in DataGenerator(20, 500, now=NOW).post_and_analytics_rows()
+                 if table == 'scheduled_posts']
+        assert all(row['status'] in ('posted', 'failed') for row in posts)
+        assert all(row['scheduled_time'] < NOW for row in posts)
+
+
+class TestGenerate:
+    """Test bulk loading into the database."""
+
+    def test_generate_inserts_rows(self, app):
+        counts = generate(db.engine, 10, 200, chunk_size=50, now=NOW)
+
+        assert User.query.count() == counts['users'] == 10
+        assert ScheduledPost.query.count() == counts['scheduled_posts'] == 200
+        assert Analytics.query.count() == counts['analytics'] > 0
+
+    def test_generate_appends_after_existing_ids(self, app):
+        generate(db.engine, 5, 50, now=NOW, prefix='first')
+        generate(db.engine, 5, 50, now=NOW, prefix='second')
+        assert ScheduledPost.query.count() == 100
+
+    def test_rerun_appends_new_usernames(self, app):
+        generate(db.engine, 5, 50, now=NOW)
+        generate(db.engine, 5, 50, now=NOW)
+
+        usernames = [user.username for user in User.query.order_by(User.id)]
+        assert usernames == [f'user{index}' for index in range(10)]
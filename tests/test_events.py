@@ -0,0 +1,112 @@
+"""
+Tests for the post status event stream.
+"""
+import json
+from datetime import datetime
+from backend.core.events import EventHub, format_sse
+from backend.core.scheduler import PostScheduler
+from backend.models.database import db, ScheduledPost
+
+
+def get_auth_token(client):
+    """Helper to register a user and return their token."""
+    data = {
+        'username': 'testuser',
+        'email': 'test@example.com',
+        'password': 'password123'
+    }
+    response = client.post('/api/auth/register',
+                          data=json.dumps(data),
+                          content_type='application/json')
+    return response.get_json()['data']['token']
+
+
+class StubPostHandler:
+    """Post handler that returns a fixed result instead of publishing."""
+
+    def __init__(self, result=True):
+        self.result = result
+
+    def post_to_platform(self, platform, content, media_url=None, user_id=None, idempotency_key=None):
+        return self.result
+
+
+class TestEventHub:
+    """Test the in-process event hub."""
+
+    def test_publish_reaches_only_that_user(self):
+        hub = EventHub()
+        mine = hub.subscribe(1)
+        other = hub.subscribe(2)
+
+        hub.publish(1, 'post.status', {'post_id': 5, 'status': 'posted'})
+
+        assert mine.get_nowait() == {'type': 'post.status', 'data': {'post_id': 5, 'status': 'posted'}}
+        assert other.empty()
+
+    def test_full_queue_drops_events(self):
+        hub = EventHub(max_queue_size=1)
+        subscription = hub.subscribe(1)
+
+        hub.publish(1, 'post.status', {'n': 1})
+        hub.publish(1, 'post.status', {'n': 2})
+
+        assert subscription.get_nowait()['data'] == {'n': 1}
+        assert subscription.empty()
+
+    def test_unsubscribe(self):
+        hub = EventHub()
+        subscription = hub.subscribe(1)
+        hub.unsubscribe(1, subscription)
+        assert hub.subscriber_count() == 0
+
+    def test_format_sse(self):
+        message = format_sse({'a': 1}, event='post.status', event_id=3)
+        assert message == 'id: 3\nevent: post.status\ndata: {"a": 1}\n\n'
+
+
+class TestStatusEvents:
+    """Test that the scheduler and API surface status events."""
+
+    def test_execute_post_publishes_transitions(self, app):
+        hub = EventHub()
+        scheduler = PostScheduler(db, StubPostHandler(), hub)
+        try:
+            post = ScheduledPost(user_id=1, content='hello', platforms='twitter',
+                                 scheduled_time=datetime.utcnow())
+            db.session.add(post)
+            db.session.commit()
+            subscription = hub.subscribe(1)
+
+            scheduler._execute_post(post.id)
+
+            statuses = [subscription.get_nowait()['data']['status'] for _ in range(2)]
+            assert statuses == ['publishing', 'posted']
+        finally:
+            scheduler.shutdown()
+
+    def test_events_requires_auth(self, client):
+        response = client.get('/api/events')
+        assert response.status_code == 401
+
+    def test_query_token_only_accepted_for_events(self, client):
+        token = get_auth_token(client)
+        assert client.get(f'/api/posts?token={token}').status_code == 401
+        assert client.get('/api/posts', headers={'Authorization': f'Bearer {token}'}).status_code == 200
+
+    def test_events_stream(self, app, client):
+        token = get_auth_token(client)
+        response = client.get(f'/api/events?token={token}', buffered=False)
+        assert response.status_code == 200
+        assert response.mimetype == 'text/event-stream'
+
+        chunks = iter(response.response)
+        assert next(chunks).startswith(b'retry:')
+
+        app.event_hub.publish(1, 'post.status', {'post_id': 1, 'status': 'posted'})
+        message = next(chunks).decode()
+        assert 'event: post.status' in message
+        assert '"status": "posted"' in message
+
+        response.close()
+        assert app.event_hub.subscriber_count() == 0
@@ -0,0 +1,93 @@
+"""
+Tests for weighted fair dispatch across users.
+"""
+from datetime import datetime, timedelta
+from backend.core.fair_queue import FairQueue
+from backend.core.scheduler import PostScheduler
+from backend.models.database import db, ScheduledPost, User
+
+
+def add_user(username, plan):
+    """Insert a user with a subscription plan."""
+    user = User(username=username, email=f'{username}@example.com', password_hash='x', subscription_plan=plan)
+    db.session.add(user)
+    db.session.commit()
+    return user.id
+
+
+class TestFairQueue:
+    """Test the weighted fair queue."""
+
+    def test_late_tenant_is_not_starved(self):
+        queue = FairQueue()
+        for i in range(100):
+            queue.push('burst', i)
+        queue.push('small', 'only')
+
+        order = [queue.pop(timeout=0)[0] for _ in range(3)]
+        assert 'small' in order
+
+    def test_weights_split_service(self):
+        queue = FairQueue()
+        for i in range(30):
+            queue.push('heavy', i, weight=2)
+            queue.push('light', i, weight=1)
+
+        served = [queue.pop(timeout=0)[0] for _ in range(30)]
+        assert served.count('heavy') == 20
+        assert served.count('light') == 10
+
+    def test_fifo_within_tenant(self):
+        queue = FairQueue()
+        for i in range(5):
+            queue.push('a', i)
+        assert [queue.pop(timeout=0)[1] for _ in range(5)] == [0, 1, 2, 3, 4]
+
+    def test_pop_after_close(self):
+        queue = FairQueue()
+        queue.push('a', 1)
+        queue.close()
+        assert queue.pop() == ('a', 1)
+        assert queue.pop() is None
+
+
+class TestFairClaims:
+    """Test that claiming interleaves users."""
+
+    def test_burst_does_not_fill_batch(self, app):
+        burst_user = add_user('burst', 'basic')
+        other_user = add_user('other', 'basic')
+        due = datetime.utcnow() - timedelta(minutes=5)
+        for _ in range(20):
+            db.session.add(ScheduledPost(user_id=burst_user, content='x', platforms='twitter', scheduled_time=due))
+        late = ScheduledPost(user_id=other_user, content='y', platforms='twitter',
+                             scheduled_time=due + timedelta(minutes=1))
+        db.session.add(late)
+        db.session.commit()
+
+        scheduler = PostScheduler(db, None, role='api', plan_weights={'basic': 1})
+        assert late.id in scheduler.claim_due_posts(5)
+
+    def test_plan_weight_increases_share(self, app):
+        basic_user = add_user('basic', 'basic')
+        enterprise_user = add_user('enterprise', 'enterprise')
+        due = datetime.utcnow() - timedelta(minutes=5)
+        for user_id in (basic_user, enterprise_user):
+            for _ in range(10):
+                db.session.add(ScheduledPost(user_id=user_id, content='x', platforms='twitter', scheduled_time=due))
+        db.session.commit()
+
+        scheduler = PostScheduler(db, None, role='api', plan_weights={'basic': 1, 'enterprise': 4})
+        claimed = scheduler.claim_due_posts(10)
+        owners = [db.session.get(ScheduledPost, post_id).user_id for post_id in claimed]
+        assert owners.count(enterprise_user) == 8
+
+    def test_tenant_lag_recorded(self, app):
+        scheduler = PostScheduler(db, None, role='api')
+        scheduler._record_lag(1, datetime.utcnow() - timedelta(seconds=30))
+        scheduler._record_lag(1, datetime.utcnow() - timedelta(seconds=10))
+
+        lag = scheduler.get_tenant_lag()[1]
+        assert lag['count'] == 2
+        assert 29 < lag['max_seconds'] < 35
+        assert 9 < lag['last_seconds'] < 15
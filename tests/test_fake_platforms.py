@@ -0,0 +1,80 @@
+"""
+Tests for the fake platform server and the integrations' fake mode.
+"""
+import time
+import pytest
+import requests
+from backend.core.post_handler import PostHandler
+
+
+@pytest.fixture
+def handler(fake_server):
+    """Post handler whose integrations point at the fake server."""
+    return PostHandler({
+        'PLATFORM_API_MODE': 'fake',
+        'FAKE_PLATFORM_URL': fake_server,
+        'FACEBOOK_PAGE_ID': '1234',
+        'INSTAGRAM_USERNAME': 'fake',
+        'INSTAGRAM_PASSWORD': 'fake'
+    })
+
+
+def configure(url, settings):
+    """Change fake server settings at runtime."""
+    requests.post(f'{url}/__config', json=settings).raise_for_status()
+
+
+def stats(url):
+    """Get per-platform counters from the fake server."""
+    return requests.get(f'{url}/__stats').json()
+
+
+class TestFakeMode:
+    """Test publishing through the fake server."""
+
+    def test_posts_reach_every_platform(self, fake_server, handler):
+        assert handler.post_to_platform('twitter', 'hello') is True
+        assert handler.post_to_platform('facebook', 'hello') is True
+        assert handler.post_to_platform('facebook', 'photo', media_url='https://example.com/a.jpg') is True
+        assert handler.post_to_platform('instagram', 'hello', media_url='https://example.com/a.jpg') is True
+
+        counts = stats(fake_server)
+        assert counts['twitter']['published'] == 1
+        assert counts['facebook']['published'] == 2
+        assert counts['instagram']['published'] == 1
+
+    def test_credentials_validate(self, handler):
+        for platform in ('twitter', 'facebook', 'instagram'):
+            assert handler.validate_credentials(platform) is True
+
+    def test_idempotency_key_sent(self, fake_server, handler):
+        twitter = handler.platforms['twitter']
+        assert twitter.post('hello', idempotency_key='post-1-twitter') is True
+        assert twitter.post('hello', idempotency_key='post-1-twitter') is True
+
+        counts = stats(fake_server)['twitter']
+        assert counts['published'] == 1
+        assert counts['replayed'] == 1
+
+
+class TestFaultInjection:
+    """Test errors, quotas and rate-limit headers."""
+
+    def test_server_errors_fail_delivery(self, fake_server, handler):
+        configure(fake_server, {'twitter': {'error_rate': 1.0}})
+        assert handler.post_to_platform('twitter', 'hello') is False
+        assert stats(fake_server)['twitter']['errors'] == 1
+
+    def test_quota_returns_429(self, fake_server, handler):
+        configure(fake_server, {'quota': 2})
+        results = [handler.post_to_platform('twitter', f'post {i}') for i in range(3)]
+
+        assert results == [True, True, False]
+        assert stats(fake_server)['twitter']['throttled'] == 1
+        assert handler.platforms['twitter'].client.rate_limit['x-rate-limit-remaining'] == '0'
+
+    def test_latency_is_applied(self, fake_server, handler):
+        configure(fake_server, {'latency_ms': 100})
+        start = time.perf_counter()
+        handler.post_to_platform('facebook', 'slow')
+        assert time.perf_counter() - start >= 0.1
@@ -0,0 +1,167 @@
+"""
+Tests for idempotent post creation and delivery.
+"""
+import json
+from datetime import datetime, timedelta
+from backend.core.post_handler import PostHandler
+from backend.core.scheduler import PostScheduler, delivery_key
+from backend.models.database import db, IdempotencyKey, PlatformDelivery, ScheduledPost
+from backend.utils.idempotency import DeliveryLog, request_fingerprint
+
+
+def post_payload(content='Retry-safe post'):
+    """Build a create-post request body."""
+    return json.dumps({
+        'content': content,
+        'platforms': ['twitter'],
+        'scheduled_time': '2030-01-01T09:00:00'
+    })
+
+
+class CountingIntegration:
+    """Integration that counts publish calls and fails the first `failures`."""
+
+    def __init__(self, failures=0):
+        self.calls = 0
+        self.failures = failures
+
+    def post(self, content, media_url=None, user_id=None, idempotency_key=None):
+        self.calls += 1
+        return self.calls > self.failures
+
+
+def logged_handler(app, integration):
+    """Build a PostHandler with a delivery log and a counting Twitter integration."""
+    handler = PostHandler(app.config, delivery_log=DeliveryLog(app))
+    handler.platforms['twitter'] = integration
+    return handler
+
+
+class RecordingPostHandler:
+    """Post handler that records the platforms it publishes to."""
+
+    def __init__(self):
+        self.platforms = []
+
+    def post_to_platform(self, platform, content, media_url=None, user_id=None, idempotency_key=None):
+        self.platforms.append((platform, idempotency_key))
+        return True
+
+
+class TestIdempotencyKeyHeader:
+    """Test the Idempotency-Key header on post creation."""
+
+    def test_retry_replays_first_response(self, client, auth_headers):
+        headers = dict(auth_headers, **{'Idempotency-Key': 'abc-123'})
+        first = client.post('/api/posts', data=post_payload(), content_type='application/json', headers=headers)
+        second = client.post('/api/posts', data=post_payload(), content_type='application/json', headers=headers)
+
+        assert first.status_code == second.status_code == 200
+        assert second.headers['Idempotent-Replayed'] == 'true'
+        assert second.get_json() == first.get_json()
+        assert ScheduledPost.query.count() == 1
+
+    def test_key_reused_with_different_body(self, client, auth_headers):
+        headers = dict(auth_headers, **{'Idempotency-Key': 'abc-123'})
+        client.post('/api/posts', data=post_payload(), content_type='application/json', headers=headers)
+        response = client.post('/api/posts', data=post_payload('Other'), content_type='application/json',
+                               headers=headers)
+
+        assert response.status_code == 422
+        assert ScheduledPost.query.count() == 1
+
+    def test_rejected_request_not_stored(self, client, auth_headers):
+        headers = dict(auth_headers, **{'Idempotency-Key': 'abc-123'})
+        invalid = dict(json.loads(post_payload()), flexibility_minutes='soon')
+        rejected = client.post('/api/posts', data=json.dumps(invalid), content_type='application/json',
+                               headers=headers)
+        corrected = client.post('/api/posts', data=post_payload(), content_type='application/json',
+                                headers=headers)
+
+        assert rejected.status_code == 400
+        assert corrected.status_code == 200
+        assert 'Idempotent-Replayed' not in corrected.headers
+        assert ScheduledPost.query.count() == 1
+
+    def test_abandoned_reservation_is_reclaimed(self, app, client, auth_headers):
+        headers = dict(auth_headers, **{'Idempotency-Key': 'abc-123'})
+        with app.test_request_context('/api/posts', method='POST', data=post_payload()):
+            fingerprint = request_fingerprint()
+        # Reserved by a request that crashed before storing its response
+        reservation = IdempotencyKey(user_id=1, key='abc-123', request_hash=fingerprint)
+        db.session.add(reservation)
+        db.session.commit()
+
+        in_progress = client.post('/api/posts', data=post_payload(), content_type='application/json',
+                                  headers=headers)
+        reservation.created_at = datetime.utcnow() - timedelta(seconds=app.config['IDEMPOTENCY_LOCK_SECONDS'] + 1)
+        db.session.commit()
+        reclaimed = client.post('/api/posts', data=post_payload(), content_type='application/json',
+                                headers=headers)
+
+        assert in_progress.status_code == 409
+        assert reclaimed.status_code == 200
+        assert 'Idempotent-Replayed' not in reclaimed.headers
+        assert ScheduledPost.query.count() == 1
+
+    def test_requests_without_key_are_not_deduplicated(self, client, auth_headers):
+        for _ in range(2):
+            client.post('/api/posts', data=post_payload(), content_type='application/json', headers=auth_headers)
+        assert ScheduledPost.query.count() == 2
+
+
+class TestDeliveryIdempotency:
+    """Test that retried deliveries are not published twice."""
+
+    def test_post_handler_skips_completed_delivery(self, app):
+        integration = CountingIntegration()
+        handler = logged_handler(app, integration)
+
+        assert handler.post_to_platform('twitter', 'hi', idempotency_key='post-1-twitter') is True
+        assert handler.post_to_platform('twitter', 'hi', idempotency_key='post-1-twitter') is True
+        assert integration.calls == 1
+
+    def test_completed_delivery_survives_restart(self, app):
+        integration = CountingIntegration()
+        logged_handler(app, integration).post_to_platform('twitter', 'hi', idempotency_key='post-1-twitter')
+
+        # A new process shares only the database
+        restarted = logged_handler(app, integration)
+        assert restarted.post_to_platform('twitter', 'hi', idempotency_key='post-1-twitter') is True
+        assert integration.calls == 1
+        assert PlatformDelivery.query.filter_by(key='post-1-twitter').one().status == 'delivered'
+
+    def test_failed_delivery_is_retried(self, app):
+        integration = CountingIntegration(failures=1)
+        handler = logged_handler(app, integration)
+
+        assert handler.post_to_platform('twitter', 'hi', idempotency_key='post-1-twitter') is False
+        assert handler.post_to_platform('twitter', 'hi', idempotency_key='post-1-twitter') is True
+        assert integration.calls == 2
+
+    def test_interrupted_delivery_not_repeated(self, app):
+        # Left pending by a process that crashed during the platform call
+        db.session.add(PlatformDelivery(key='post-1-twitter'))
+        db.session.commit()
+        integration = CountingIntegration()
+
+        assert logged_handler(app, integration).post_to_platform(
+            'twitter', 'hi', idempotency_key='post-1-twitter') is False
+        assert integration.calls == 0
+
+    def test_reclaimed_post_skips_delivered_platforms(self, app):
+        handler = RecordingPostHandler()
+        scheduler = PostScheduler(db, handler, role='api')
+        post = ScheduledPost(user_id=1, content='hi', platforms='twitter,facebook',
+                             scheduled_time=datetime.utcnow() - timedelta(minutes=1),
+                             delivered_platforms='twitter')
+        db.session.add(post)
+        db.session.commit()
+
+        scheduler._execute_post(post.id)
+
+        assert handler.platforms == [('facebook', delivery_key(post.id, 'facebook'))]
+        db.session.expire_all()
+        post = db.session.get(ScheduledPost, post.id)
+        assert post.status == 'posted'
+        assert post.delivered_platforms == 'twitter,facebook'
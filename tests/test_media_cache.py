@@ -0,0 +1,175 @@
+"""
+Tests for the content-addressed media cache.
+"""
+import os
+import threading
+import pytest
+import requests
+from backend.core.post_handler import PostHandler
+from backend.media.cache import MediaCache, MediaFetchError, check_media_url
+
+
+@pytest.fixture
+def cache(tmp_path):
+    """Empty media cache."""
+    return MediaCache(str(tmp_path / 'media'), allow_private_hosts=True)
+
+
+def object_files(cache):
+    """List the content files stored in a cache."""
+    return [name for _, _, names in os.walk(os.path.join(cache.root, 'objects')) for name in names]
+
+
+class TestMediaCache:
+    """Test fetching, deduplication and eviction."""
+
+    def test_url_fetched_once(self, fake_server, cache):
+        url = f'{fake_server}/media/a.jpg'
+        first = cache.get(url)
+        second = cache.get(url)
+
+        assert first == second
+        assert first.endswith('.jpg')
+        assert cache.stats['misses'] == 1
+        assert cache.stats['hits'] == 1
+        with open(first, 'rb') as handle:
+            assert handle.read() == requests.get(url).content
+
+    def test_identical_content_stored_once(self, fake_server, cache):
+        first = cache.get(f'{fake_server}/media/a.jpg?w=100')
+        second = cache.get(f'{fake_server}/media/a.jpg?w=100&user=2')
+
+        assert first == second
+        assert cache.stats['deduplicated'] == 1
+        assert len(object_files(cache)) == 1
+
+    def test_index_survives_restart(self, fake_server, cache):
+        url = f'{fake_server}/media/a.jpg'
+        path = cache.get(url)
+        reopened = MediaCache(cache.root, allow_private_hosts=True)
+
+        assert reopened.get(url) == path
+        assert reopened.stats['misses'] == 0
+        assert reopened.size() == os.path.getsize(path)
+
+    def test_deleted_file_refetched_without_growing_size(self, fake_server, cache):
+        url = f'{fake_server}/media/a.jpg'
+        os.remove(cache.get(url))
+        path = cache.get(f'{url}?user=2')
+
+        assert os.path.exists(path)
+        assert cache.size() == os.path.getsize(path)
+
+    def test_concurrent_requests_share_one_download(self, fake_server, cache):
+        url = f'{fake_server}/media/a.jpg?w=2000&h=2000'
+        paths = []
+        threads = [threading.Thread(target=lambda: paths.append(cache.get(url))) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert len(set(paths)) == 1
+        assert cache.stats['misses'] == 1
+
+    def test_least_recently_used_evicted(self, fake_server, tmp_path):
+        probe = len(requests.get(f'{fake_server}/media/a.jpg').content)
+        cache = MediaCache(str(tmp_path / 'media'), allow_private_hosts=True, max_bytes=int(probe * 2.5))
+        a = cache.get(f'{fake_server}/media/a.jpg')
+        cache.get(f'{fake_server}/media/b.jpg')
+        cache.get(f'{fake_server}/media/a.jpg')
+        cache.get(f'{fake_server}/media/c.jpg')
+
+        assert os.path.exists(a)
+        assert len(object_files(cache)) == 2
+        assert cache.stats['evictions'] == 1
+
+    def test_files_in_use_not_evicted(self, fake_server, tmp_path):
+        cache = MediaCache(str(tmp_path / 'media'), allow_private_hosts=True, max_bytes=1)
+        with cache.local_path(f'{fake_server}/media/a.jpg') as path:
+            cache.get(f'{fake_server}/media/b.jpg')
+            assert os.path.exists(path)
+
+    def test_oversized_media_rejected(self, fake_server, tmp_path):
+        cache = MediaCache(str(tmp_path / 'media'), allow_private_hosts=True, max_file_bytes=1000)
+        with pytest.raises(MediaFetchError):
+            cache.get(f'{fake_server}/media/a.jpg?w=1000&h=1000')
+        assert object_files(cache) == []
+        assert os.listdir(os.path.join(cache.root, 'tmp')) == []
+
+    @pytest.mark.parametrize('url', ['/etc/passwd', 'file:///etc/passwd', 'ftp://example.com/a.jpg'])
+    def test_only_http_urls_fetched(self, url, cache):
+        with pytest.raises(MediaFetchError):
+            cache.get(url)
+        assert not cache.contains(url)
+
+    def test_private_hosts_refused_by_default(self, fake_server, tmp_path):
+        cache = MediaCache(str(tmp_path / 'media'))
+        with pytest.raises(MediaFetchError):
+            cache.get(f'{fake_server}/media/a.jpg')
+        assert cache.stats['misses'] == 1
+        assert object_files(cache) == []
+
+
+class TestCheckMediaUrl:
+    """Test which hosts may be fetched."""
+
+    @pytest.mark.parametrize('url', [
+        'http://127.0.0.1/a.jpg',
+        'http://localhost/a.jpg',
+        'http://10.0.0.5/a.jpg',
+        'http://169.254.169.254/latest/meta-data/',
+        'http://[::1]/a.jpg',
+        'http://[::ffff:127.0.0.1]/a.jpg',
+    ])
+    def test_non_public_addresses_rejected(self, url):
+        with pytest.raises(MediaFetchError):
+            check_media_url(url)
+
+    def test_public_address_accepted(self):
+        check_media_url('https://93.184.216.34/a.jpg')
+
+
+class TestPostHandlerMedia:
+    """Test that integrations upload from the cache."""
+
+    def test_all_platforms_upload_cached_file(self, fake_server, tmp_path):
+        handler = PostHandler({
+            'PLATFORM_API_MODE': 'fake',
+            'FAKE_PLATFORM_URL': fake_server,
+            'FACEBOOK_PAGE_ID': '1234',
+            'MEDIA_CACHE_DIR': str(tmp_path / 'media'),
+            'MEDIA_ALLOW_PRIVATE_HOSTS': True
+        })
+        url = f'{fake_server}/media/a.jpg'
+        for platform in ('twitter', 'facebook', 'instagram'):
+            assert handler.post_to_platform(platform, 'hello', media_url=url) is True
+
+        counts = requests.get(f'{fake_server}/__stats').json()
+        assert all(counts[platform]['uploads'] == 1 for platform in ('twitter', 'facebook', 'instagram'))
+        assert handler.media_cache.stats['misses'] == 1
+
+    def test_unreachable_media_fails_delivery(self, fake_server, tmp_path):
+        handler = PostHandler({
+            'PLATFORM_API_MODE': 'fake',
+            'FAKE_PLATFORM_URL': fake_server,
+            'MEDIA_CACHE_DIR': str(tmp_path / 'media'),
+            'MEDIA_ALLOW_PRIVATE_HOSTS': True
+        })
+        assert handler.post_to_platform('twitter', 'hello', media_url='http://127.0.0.1:9/a.jpg') is False
+
+    def test_local_file_urls_refused(self, fake_server, tmp_path):
+        handler = PostHandler({
+            'PLATFORM_API_MODE': 'fake',
+            'FAKE_PLATFORM_URL': fake_server,
+            'FACEBOOK_PAGE_ID': '1234',
+            'MEDIA_CACHE_DIR': ''
+        })
+        secret = tmp_path / 'secret.env'
+        secret.write_text('SECRET_KEY=x')
+        for url in (str(secret), f'file://{secret}'):
+            for platform in ('twitter', 'facebook', 'instagram'):
+                assert handler.post_to_platform(platform, 'hello', media_url=url) is False
+
+        counts = requests.get(f'{fake_server}/__stats').json()
+        assert all(counts[platform]['uploads'] == 0 for platform in ('twitter', 'facebook', 'instagram'))
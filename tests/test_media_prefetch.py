@@ -0,0 +1,127 @@
+"""
+Tests for prefetching media of upcoming posts.
+"""
+import pytest
+from datetime import datetime, timedelta
+from backend.core.post_handler import PostHandler
+from backend.core.scheduler import PostScheduler
+from backend.media.prefetch import MediaPrefetcher
+from backend.models.database import db, ScheduledPost
+
+
+@pytest.fixture
+def handler(fake_server, tmp_path):
+    """Fake-mode post handler with its own media cache."""
+    return PostHandler({
+        'PLATFORM_API_MODE': 'fake',
+        'FAKE_PLATFORM_URL': fake_server,
+        'MEDIA_CACHE_DIR': str(tmp_path / 'media'),
+        'MEDIA_ALLOW_PRIVATE_HOSTS': True
+    })
+
+
+@pytest.fixture
+def scheduler(app, handler):
+    """API-role scheduler with a prefetcher and a 30 minute horizon."""
+    prefetcher = MediaPrefetcher(handler.get_media_cache(), max_workers=2)
+    scheduler = PostScheduler(db, handler, role='api', media_prefetcher=prefetcher, prefetch_horizon=1800)
+    yield scheduler
+    scheduler.shutdown()
+
+
+def add_post(media_url, due_in, status='pending'):
+    """Insert a post due in due_in and return its ID."""
+    post = ScheduledPost(user_id=1, content='hello', platforms='twitter', media_url=media_url,
+                         scheduled_time=datetime.utcnow() + due_in, status=status)
+    db.session.add(post)
+    db.session.commit()
+    return post.id
+
+
+class BrokenTranscoder:
+    """Transcoder whose variants can never be written."""
+
+    def prepare(self, path, platform):
+        raise OSError('disk full')
+
+    def has_variant(self, digest, platform):
+        return False
+
+
+class TestPrefetch:
+    """Test which media is prefetched."""
+
+    def test_only_media_within_horizon_prefetched(self, fake_server, scheduler):
+        soon = f'{fake_server}/media/soon.jpg'
+        later = f'{fake_server}/media/later.jpg'
+        add_post(soon, timedelta(minutes=10))
+        add_post(soon, timedelta(minutes=20))
+        add_post(later, timedelta(hours=2))
+        add_post(f'{fake_server}/media/done.jpg', timedelta(minutes=5), status='posted')
+        add_post(None, timedelta(minutes=5))
+
+        assert scheduler.prefetch_media() == 1
+        scheduler.media_prefetcher.wait(timeout=10)
+
+        cache = scheduler.media_prefetcher.cache
+        assert cache.contains(soon)
+        assert not cache.contains(later)
+        assert scheduler.media_prefetcher.stats == {'queued': 1, 'fetched': 1, 'failed': 0}
+
+    def test_cached_media_not_queued_again(self, fake_server, scheduler):
+        add_post(f'{fake_server}/media/soon.jpg', timedelta(minutes=10))
+        scheduler.prefetch_media()
+        scheduler.media_prefetcher.wait(timeout=10)
+        assert scheduler.prefetch_media() == 0
+
+    def test_variants_prepared_for_post_platforms(self, app, fake_server, handler):
+        url = f'{fake_server}/media/a.jpg?w=1600&h=1600'
+        add_post(url, timedelta(minutes=10))
+        transcoder = handler.get_transcoder()
+        scheduler = PostScheduler(db, handler, role='api', prefetch_horizon=1800,
+                                  media_prefetcher=MediaPrefetcher(handler.get_media_cache(), 2, transcoder))
+        try:
+            scheduler.prefetch_media()
+            scheduler.media_prefetcher.wait(timeout=30)
+            digest = handler.get_media_cache().content_hash(url)
+            assert transcoder.has_variant(digest, 'twitter')
+            assert not transcoder.has_variant(digest, 'instagram')
+            assert scheduler.media_prefetcher.is_ready(url, ['twitter'])
+        finally:
+            scheduler.shutdown()
+            transcoder.shutdown()
+
+    def test_failed_prefetch_logged_not_raised(self, scheduler):
+        add_post('http://127.0.0.1:9/missing.jpg', timedelta(minutes=10))
+        scheduler.prefetch_media()
+        scheduler.media_prefetcher.wait(timeout=10)
+        assert scheduler.media_prefetcher.stats['failed'] == 1
+
+    def test_transcode_error_counted_as_failure(self, fake_server, handler, caplog):
+        prefetcher = MediaPrefetcher(handler.get_media_cache(), 1, BrokenTranscoder())
+        try:
+            assert prefetcher.prefetch(f'{fake_server}/media/a.jpg', ['twitter'])
+            prefetcher.wait(timeout=10)
+            assert prefetcher.stats == {'queued': 1, 'fetched': 0, 'failed': 1}
+            assert prefetcher.pending() == 0
+            assert 'disk full' in caplog.text
+        finally:
+            prefetcher.shutdown()
+
+
+class TestPrefetchHitRate:
+    """Test publish-time hit/miss metrics."""
+
+    def test_hits_and_misses_counted(self, fake_server, scheduler):
+        prefetched = add_post(f'{fake_server}/media/a.jpg', timedelta(minutes=10))
+        scheduler.prefetch_media()
+        scheduler.media_prefetcher.wait(timeout=10)
+        missed = add_post(f'{fake_server}/media/b.jpg', timedelta(minutes=10))
+
+        scheduler._publish_post(prefetched)
+        scheduler._publish_post(missed)
+
+        assert db.session.get(ScheduledPost, prefetched).status == 'posted'
+        assert scheduler.media_prefetch.value('hit') == 1
+        assert scheduler.media_prefetch.value('miss') == 1
+        assert 'scheduler_media_prefetch_total{result="hit"} 1' in scheduler.metrics.render()
@@ -0,0 +1,162 @@
+"""
+Tests for scheduler metrics and the Prometheus endpoint.
+"""
+import requests
+from datetime import datetime, timedelta
+from backend.core.metrics import MetricsRegistry
+from backend.core.scheduler import PostScheduler
+from backend.models.database import db, ScheduledPost
+from worker import serve_metrics
+
+
+class StubPostHandler:
+    """Post handler that fails on one platform."""
+
+    def post_to_platform(self, platform, content, media_url=None, user_id=None, idempotency_key=None):
+        return platform != 'facebook'
+
+
+class TestMetricsRegistry:
+    """Test the exposition format."""
+
+    def test_histogram_buckets_are_cumulative(self):
+        registry = MetricsRegistry()
+        histogram = registry.histogram('lag_seconds', 'Lag', buckets=(1, 5))
+        for value in (0.5, 3, 3, 10):
+            histogram.observe(value)
+
+        text = registry.render()
+        assert '# TYPE lag_seconds histogram' in text
+        assert 'lag_seconds_bucket{le="1"} 1' in text
+        assert 'lag_seconds_bucket{le="5"} 3' in text
+        assert 'lag_seconds_bucket{le="+Inf"} 4' in text
+        assert 'lag_seconds_sum 16.5' in text
+        assert 'lag_seconds_count 4' in text
+
+    def test_labels_and_gauges(self):
+        registry = MetricsRegistry()
+        registry.counter('deliveries', 'Deliveries', ['platform']).inc('twitter')
+        registry.gauge('depth', 'Depth', lambda: 7)
+        text = registry.render()
+
+        assert 'deliveries_total{platform="twitter"} 1' in text
+        assert 'depth 7' in text
+
+
+class TestSchedulerMetrics:
+    """Test that deliveries are timed."""
+
+    def test_execute_post_records_timings(self, app):
+        scheduler = PostScheduler(db, StubPostHandler(), role='api')
+        post = ScheduledPost(user_id=1, content='hi', platforms='twitter,facebook',
+                             scheduled_time=datetime.utcnow() - timedelta(seconds=30))
+        db.session.add(post)
+        db.session.commit()
+
+        scheduler._execute_post(post.id)
+
+        assert scheduler.platform_latency.count('twitter') == 1
+        assert scheduler.delivery_lag.count('twitter') == 1
+        assert scheduler.delivery_lag.count('facebook') == 0
+        assert scheduler.deliveries.value('facebook', 'failure') == 1
+        assert scheduler.completed.value('failed') == 1
+
+    def test_enqueue_records_claim_lag(self, app):
+        scheduler = PostScheduler(db, StubPostHandler(), role='api')
+        post = ScheduledPost(user_id=1, content='hi', platforms='twitter',
+                             scheduled_time=datetime.utcnow() - timedelta(seconds=30))
+        db.session.add(post)
+        db.session.commit()
+
+        scheduler._enqueue_claimed(scheduler.claim_due_posts(10))
+
+        assert scheduler.claim_lag.count() == 1
+        assert 'scheduler_queue_depth 1' in scheduler.metrics.render()
+
+    def test_worker_role_renders_local_and_backlog_metrics(self, app):
+        scheduler = PostScheduler(db, StubPostHandler(), app=app, role='worker', poll_interval=3600)
+        try:
+            text = scheduler.render_metrics()
+        finally:
+            scheduler.shutdown()
+
+        assert '# TYPE scheduler_publish_lag_seconds histogram' in text
+        assert 'scheduler_queue_depth 0' in text
+        assert 'scheduler_backlog_posts{state="due"} 0' in text
+        assert 'scheduler_backlog_oldest_seconds 0' in text
+
+
+class TestMetricsEndpoint:
+    """Test /api/metrics."""
+
+    def test_prometheus_text(self, app, client):
+        app.config['METRICS_TOKEN'] = 'secret'
+        response = client.get('/api/metrics', headers={'Authorization': 'Bearer secret'})
+        assert response.status_code == 200
+        assert response.content_type.startswith('text/plain; version=0.0.4')
+        assert b'# TYPE scheduler_backlog_posts gauge' in response.data
+
+    def test_api_role_serves_database_backlog_only(self, app, client):
+        app.config['METRICS_TOKEN'] = 'secret'
+        now = datetime.utcnow()
+        for status, due in (('pending', now - timedelta(minutes=2)), ('pending', now - timedelta(seconds=5)),
+                            ('pending', now + timedelta(hours=1)), ('posted', now - timedelta(hours=1))):
+            db.session.add(ScheduledPost(user_id=1, content='hi', platforms='twitter',
+                                         scheduled_time=due, status=status))
+        db.session.add(ScheduledPost(user_id=1, content='hi', platforms='twitter', scheduled_time=now,
+                                     status='processing', claimed_by='other-node',
+                                     lease_expires_at=now + timedelta(minutes=5)))
+        db.session.commit()
+
+        text = client.get('/api/metrics', headers={'Authorization': 'Bearer secret'}).get_data(as_text=True)
+        assert 'scheduler_backlog_posts{state="due"} 2' in text
+        assert 'scheduler_backlog_posts{state="claimed"} 1' in text
+        oldest = float(text.split('\nscheduler_backlog_oldest_seconds ')[1].split()[0])
+        assert 120 <= oldest < 180
+        # Delivery timings live on the workers that publish
+        assert 'scheduler_publish_lag_seconds' not in text
+        assert 'scheduler_queue_depth' not in text
+
+    def test_disabled_without_token(self, client):
+        assert client.get('/api/metrics').status_code == 404
+
+    def test_token_required(self, app, client):
+        app.config['METRICS_TOKEN'] = 'secret'
+        assert client.get('/api/metrics').status_code == 401
+        assert client.get('/api/metrics', headers={'Authorization': 'Bearer wrong'}).status_code == 401
+
+
+class TestWorkerMetrics:
+    """Test the publisher worker's metrics listener."""
+
+    def test_bound_to_loopback_with_token(self, app):
+        app.config['METRICS_TOKEN'] = 'secret'
+        server = serve_metrics(app, 0)
+        try:
+            host, port = server.server_address[:2]
+            assert host == '127.0.0.1'
+            url = f'http://127.0.0.1:{port}/metrics'
+            assert requests.get(url, timeout=5).status_code == 401
+            response = requests.get(url, headers={'Authorization': 'Bearer secret'}, timeout=5)
+            assert response.status_code == 200
+            assert '# TYPE scheduler_backlog_posts gauge' in response.text
+        finally:
+            server.shutdown()
+            server.server_close()
+
+
+class TestTenantMetrics:
+    """Test that per-user series are capped."""
+
+    def test_only_worst_tenants_exported(self, app):
+        scheduler = PostScheduler(db, StubPostHandler(), role='api', tenant_metrics_limit=2)
+        now = datetime.utcnow()
+        for user_id, lag in ((1, 5), (2, 50), (3, 20), (4, 1)):
+            scheduler._record_lag(user_id, now - timedelta(seconds=lag))
+
+        text = scheduler.metrics.render()
+        exported = {line.split('"')[1] for line in text.splitlines()
+                    if line.startswith('scheduler_tenant_lag_max_seconds{')}
+        assert exported == {'2', '3'}
+        assert 'scheduler_tenants 4' in text
+        assert len(scheduler.get_tenant_lag()) == 4
@@ -0,0 +1,86 @@
+"""
+Tests for load smoothing of flexible posts.
+"""
+import json
+import time
+from datetime import datetime, timedelta
+from backend.core.planner import LoadPlanner, plan_post_time
+from backend.core.scheduler import PostScheduler
+from backend.models.database import db, ScheduledPost
+
+
+class TestLoadPlanner:
+    """Test slot placement."""
+
+    def test_strict_posts_keep_their_time(self):
+        planner = LoadPlanner()
+        when = datetime(2030, 1, 1, 9, 0)
+        assert [planner.place(when, 0) for _ in range(3)] == [when] * 3
+        assert planner.peak() == 3
+
+    def test_burst_spread_within_window(self):
+        planner = LoadPlanner()
+        when = datetime(2030, 1, 1, 9, 0)
+        planned = [planner.place(when, 60) for _ in range(30)]
+
+        assert planner.peak() == 1
+        assert all(when <= p <= when + timedelta(seconds=60) for p in planned)
+        assert planned[0] == when
+
+    def test_flexible_posts_avoid_strict_load(self):
+        planner = LoadPlanner()
+        when = datetime(2030, 1, 1, 9, 0)
+        planner.add(when)
+        assert planner.place(when, 10) == when + timedelta(seconds=1)
+
+    def test_slots_ignore_host_time_zone(self, monkeypatch):
+        monkeypatch.setenv('TZ', 'Asia/Kolkata')
+        time.tzset()
+        try:
+            planner = LoadPlanner(slot_seconds=3600)
+            when = datetime(2030, 1, 1, 9, 0)
+            planner.add(when)
+            assert planner.place(when, 3600) == datetime(2030, 1, 1, 10, 0)
+        finally:
+            monkeypatch.undo()
+            time.tzset()
+
+
+class TestPlannedPosts:
+    """Test planning through the API and the dispatcher."""
+
+    def test_plan_post_time_counts_pending_posts(self, app):
+        when = datetime(2030, 1, 1, 9, 0)
+        db.session.add(ScheduledPost(user_id=1, content='x', platforms='twitter', scheduled_time=when))
+        db.session.commit()
+
+        assert plan_post_time(db.session, when, 0) is None
+        assert plan_post_time(db.session, when, 60) == when + timedelta(seconds=1)
+
+    def test_create_post_with_flexibility(self, client, auth_headers):
+        body = {'content': 'Flexible', 'platforms': ['twitter'], 'scheduled_time': '2030-01-01T09:00:00'}
+        client.post('/api/posts', data=json.dumps(body), content_type='application/json', headers=auth_headers)
+        response = client.post('/api/posts', data=json.dumps(dict(body, flexibility_minutes=5)),
+                               content_type='application/json', headers=auth_headers)
+
+        data = response.get_json()['data']
+        assert data['flexibility_minutes'] == 5
+        assert data['planned_time'] == '2030-01-01T09:00:01'
+
+    def test_flexibility_out_of_range(self, client, auth_headers):
+        body = {'content': 'x', 'platforms': ['twitter'], 'scheduled_time': '2030-01-01T09:00:00',
+                'flexibility_minutes': 10000}
+        response = client.post('/api/posts', data=json.dumps(body), content_type='application/json',
+                               headers=auth_headers)
+        assert response.status_code == 400
+
+    def test_claim_uses_planned_time(self, app):
+        now = datetime.utcnow()
+        post = ScheduledPost(user_id=1, content='x', platforms='twitter',
+                             scheduled_time=now - timedelta(minutes=1), planned_time=now + timedelta(minutes=5),
+                             flex_window_seconds=600)
+        db.session.add(post)
+        db.session.commit()
+
+        scheduler = PostScheduler(db, None, role='api')
+        assert scheduler.claim_due_posts(10) == []
@@ -0,0 +1,106 @@
+"""
+Tests for recurring schedules and lazy materialization.
+"""
+import json
+from datetime import datetime, timedelta
+from backend.core.recurrence import Recurrence, validate_rule
+from backend.core.scheduler import PostScheduler
+from backend.models.database import db, RecurringSchedule, ScheduledPost
+
+
+def add_schedule(rule, starts_at, **kwargs):
+    """Insert an active recurring schedule."""
+    _, first_run = validate_rule(rule, starts_at)
+    schedule = RecurringSchedule(user_id=1, content='Weekly update', platforms='twitter', rule=rule,
+                                 starts_at=starts_at, next_run_at=first_run, **kwargs)
+    db.session.add(schedule)
+    db.session.commit()
+    return schedule
+
+
+class TestRecurrence:
+    """Test rule parsing."""
+
+    def test_cron_weekday_numbers_follow_cron(self):
+        recurrence = Recurrence('0 9 * * 1', datetime(2030, 1, 1))
+        assert recurrence.next_after(datetime(2030, 1, 1)) == datetime(2030, 1, 7, 9, 0)
+
+    def test_cron_weekday_steps_follow_cron(self):
+        recurrence = Recurrence('0 9 * * */2', datetime(2030, 1, 1))
+        assert recurrence.between(datetime(2030, 1, 1), datetime(2030, 1, 7, 12)) == [
+            datetime(2030, 1, 1, 9), datetime(2030, 1, 3, 9), datetime(2030, 1, 5, 9), datetime(2030, 1, 6, 9)
+        ]
+
+    def test_cron_weekday_ranges_follow_cron(self):
+        recurrence = Recurrence('0 9 * * 0-1,5', datetime(2030, 1, 1))
+        assert recurrence.between(datetime(2030, 1, 1), datetime(2030, 1, 7, 12)) == [
+            datetime(2030, 1, 4, 9), datetime(2030, 1, 6, 9), datetime(2030, 1, 7, 9)
+        ]
+
+    def test_rrule_occurrences(self):
+        recurrence = Recurrence('FREQ=DAILY;BYHOUR=9;BYMINUTE=0;BYSECOND=0', datetime(2030, 1, 1))
+        assert recurrence.between(datetime(2030, 1, 1), datetime(2030, 1, 3, 12)) == [
+            datetime(2030, 1, 1, 9), datetime(2030, 1, 2, 9), datetime(2030, 1, 3, 9)
+        ]
+
+    def test_invalid_rules(self):
+        assert validate_rule('not a rule', datetime(2030, 1, 1))[0] is False
+        assert validate_rule('61 9 * * *', datetime(2030, 1, 1))[0] is False
+
+
+class TestMaterialization:
+    """Test that only the horizon is materialized."""
+
+    def test_only_horizon_is_materialized(self, app):
+        start = datetime.utcnow().replace(microsecond=0) + timedelta(minutes=1)
+        schedule = add_schedule('FREQ=MINUTELY;INTERVAL=10', start)
+        scheduler = PostScheduler(db, None, role='api', recurrence_horizon=3600)
+
+        assert scheduler.materialize_recurring() == 6
+        assert scheduler.materialize_recurring() == 0
+        db.session.refresh(schedule)
+        assert schedule.next_run_at == start + timedelta(minutes=60)
+        assert ScheduledPost.query.filter_by(recurrence_id=schedule.id).count() == 6
+
+    def test_missed_occurrences_are_skipped(self, app):
+        start = datetime.utcnow().replace(microsecond=0) - timedelta(days=1)
+        schedule = add_schedule('FREQ=HOURLY', start)
+        scheduler = PostScheduler(db, None, role='api', recurrence_horizon=3600)
+
+        assert scheduler.materialize_recurring() == 1
+        post = ScheduledPost.query.filter_by(recurrence_id=schedule.id).one()
+        assert post.scheduled_time > datetime.utcnow()
+
+    def test_finished_rule_stops(self, app):
+        start = datetime.utcnow().replace(microsecond=0) + timedelta(minutes=1)
+        schedule = add_schedule('FREQ=MINUTELY;COUNT=2', start)
+        scheduler = PostScheduler(db, None, role='api', recurrence_horizon=3600)
+
+        assert scheduler.materialize_recurring() == 2
+        db.session.refresh(schedule)
+        assert schedule.next_run_at is None
+
+
+class TestRecurringRoutes:
+    """Test the recurring schedule API."""
+
+    def test_create_and_delete(self, client, auth_headers):
+        response = client.post('/api/recurring', data=json.dumps({
+            'content': 'Every ten minutes',
+            'platforms': ['twitter'],
+            'rule': 'FREQ=MINUTELY;INTERVAL=10'
+        }), content_type='application/json', headers=auth_headers)
+        assert response.status_code == 200
+        schedule_id = response.get_json()['data']['id']
+        assert ScheduledPost.query.filter_by(recurrence_id=schedule_id).count() == 6
+
+        response = client.delete(f'/api/recurring/{schedule_id}', headers=auth_headers)
+        assert response.status_code == 200
+        assert ScheduledPost.query.filter_by(recurrence_id=schedule_id).count() == 0
+        assert db.session.get(RecurringSchedule, schedule_id).is_active is False
+
+    def test_invalid_rule_rejected(self, client, auth_headers):
+        response = client.post('/api/recurring', data=json.dumps({
+            'content': 'x', 'platforms': ['twitter'], 'rule': 'sometimes'
+        }), content_type='application/json', headers=auth_headers)
+        assert response.status_code == 400
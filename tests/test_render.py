@@ -0,0 +1,63 @@
+"""
+Tests for cached caption image rendering.
+"""
+import os
+from concurrent.futures import ThreadPoolExecutor
+import pytest
+from PIL import Image
+from backend.media.cache import MediaCache
+from backend.media.render import DEFAULT_TEMPLATE, TextRenderer, render_text_image
+
+
+@pytest.fixture
+def renderer(tmp_path):
+    """Renderer with a single worker process over an empty cache."""
+    renderer = TextRenderer(MediaCache(str(tmp_path / 'media')), max_workers=1)
+    yield renderer
+    renderer.shutdown()
+
+
+class TestRenderTextImage:
+    """Test drawing a caption."""
+
+    def test_renders_template_sized_jpeg(self, tmp_path):
+        path = tmp_path / 'out.jpg'
+        path.write_bytes(render_text_image('Hello\nworld'))
+
+        with Image.open(path) as image:
+            assert image.format == 'JPEG'
+            assert image.size == (DEFAULT_TEMPLATE.width, DEFAULT_TEMPLATE.height)
+
+    def test_lines_past_limit_ignored(self):
+        lines = [f'line {i}' for i in range(DEFAULT_TEMPLATE.max_lines)]
+        assert render_text_image('\n'.join(lines)) == render_text_image('\n'.join(lines + ['extra']))
+
+
+class TestTextRenderer:
+    """Test caching of rendered captions."""
+
+    def test_same_text_rendered_once(self, renderer):
+        first = renderer.render('Hello world')
+        with renderer.image('Hello world') as second:
+            pass
+
+        assert first == second
+        assert first.startswith(renderer.cache.root)
+        assert renderer.stats == {'rendered': 1, 'reused': 1}
+
+    def test_concurrent_renders_share_one_file(self, renderer):
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            paths = list(pool.map(renderer.render, ['Same caption'] * 16))
+
+        assert len(set(paths)) == 1
+        assert renderer.stats['rendered'] == 1
+        assert os.listdir(os.path.join(renderer.cache.root, 'tmp')) == []
+
+    def test_render_many_uses_process_pool(self, renderer):
+        renderer.render('cached')
+        paths = renderer.render_many(['a', 'b', 'a', 'cached'])
+
+        assert paths[0] == paths[2]
+        assert len(set(paths)) == 3
+        assert all(os.path.exists(path) for path in paths)
+        assert renderer.stats['rendered'] == 3
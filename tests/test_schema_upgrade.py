@@ -0,0 +1,94 @@
+"""
+Tests for upgrading tables created by older releases.
+"""
+import pytest
+from datetime import datetime
+from sqlalchemy import create_engine, inspect, text
+from sqlalchemy.exc import IntegrityError
+from backend.models.database import db, upgrade_schema
+
+
+LEGACY_SCHEMA = [
+    """CREATE TABLE users (
+        id INTEGER PRIMARY KEY,
+        username VARCHAR(80) NOT NULL UNIQUE,
+        email VARCHAR(120) NOT NULL UNIQUE,
+        password_hash VARCHAR(255) NOT NULL,
+        subscription_plan VARCHAR(50),
+        subscription_active BOOLEAN,
+        created_at DATETIME
+    )""",
+    """CREATE TABLE scheduled_posts (
+        id INTEGER PRIMARY KEY,
+        user_id INTEGER NOT NULL REFERENCES users (id),
+        content TEXT NOT NULL,
+        platforms VARCHAR(200),
+        scheduled_time DATETIME NOT NULL,
+        status VARCHAR(20),
+        media_url VARCHAR(500),
+        created_at DATETIME,
+        posted_at DATETIME
+    )""",
+]
+
+
+@pytest.fixture
+def engine(tmp_path):
+    """Create a database with the schema of the first release."""
+    engine = create_engine(f"sqlite:///{tmp_path / 'legacy.db'}")
+    with engine.begin() as conn:
+        for statement in LEGACY_SCHEMA:
+            conn.execute(text(statement))
+        conn.execute(text("INSERT INTO users (id, username, email, password_hash) VALUES (1, 'old', 'old@example.com', 'x')"))
+        conn.execute(text("INSERT INTO scheduled_posts (user_id, content, platforms, scheduled_time, status) "
+                          "VALUES (1, 'Old post', 'twitter', '2024-01-01 12:00:00', 'pending')"))
+    yield engine
+    engine.dispose()
+
+
+class TestUpgradeSchema:
+    """Test adding columns and indexes to existing tables."""
+
+    def test_adds_missing_columns(self, engine):
+        """Test columns added since the first release are created."""
+        db.metadata.create_all(engine)
+        added = upgrade_schema(engine)
+
+        assert 'scheduled_posts.claimed_by' in added
+        assert 'scheduled_posts.recurrence_id' in added
+        columns = {column['name'] for column in inspect(engine).get_columns('scheduled_posts')}
+        assert {column.name for column in db.metadata.tables['scheduled_posts'].columns} <= columns
+
+    def test_existing_rows_get_defaults(self, engine):
+        """Test existing rows take the scalar default of new columns."""
+        db.metadata.create_all(engine)
+        upgrade_schema(engine)
+
+        with engine.connect() as conn:
+            row = conn.execute(text("SELECT flex_window_seconds, claimed_by FROM scheduled_posts")).one()
+        assert row == (0, None)
+
+    def test_creates_indexes_and_unique_constraints(self, engine):
+        """Test new indexes are created and recurrence occurrences stay unique."""
+        db.metadata.create_all(engine)
+        upgrade_schema(engine)
+
+        indexes = {index['name'] for index in inspect(engine).get_indexes('scheduled_posts')}
+        assert {'ix_scheduled_posts_status_time', 'uq_scheduled_posts_occurrence'} <= indexes
+
+        insert = text("INSERT INTO scheduled_posts (user_id, content, scheduled_time, recurrence_id) "
+                      "VALUES (1, 'Repeat', :time, 1)")
+        with engine.begin() as conn:
+            conn.execute(text("INSERT INTO recurring_schedules (id, user_id, content, rule, starts_at) "
+                              "VALUES (1, 1, 'Repeat', 'FREQ=DAILY', :time)"), {'time': datetime(2024, 1, 2)})
+            conn.execute(insert, {'time': datetime(2024, 1, 2)})
+        with pytest.raises(IntegrityError):
+            with engine.begin() as conn:
+                conn.execute(insert, {'time': datetime(2024, 1, 2)})
+
+    def test_second_run_is_a_no_op(self, engine):
+        """Test upgrading an up-to-date database changes nothing."""
+        db.metadata.create_all(engine)
+        upgrade_schema(engine)
+
+        assert upgrade_schema(engine) == []
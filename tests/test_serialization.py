@@ -0,0 +1,52 @@
+"""
+Tests for response serializers and row projections.
+"""
+import json
+import pytest
+from datetime import datetime
+from backend.models.database import db, ScheduledPost
+from backend.models.projections import POST_PROJECTION, RowProjection
+from backend.utils.serialization import OrjsonSerializer, StdlibSerializer, create_serializer, orjson
+
+
+class TestSerializers:
+    """Test serializer implementations."""
+
+    payload = {
+        'success': True,
+        'data': [{'id': 1, 'at': datetime(2024, 5, 1, 9, 30, 15, 120), 'tags': ['a', 'b'], 'none': None}]
+    }
+
+    def test_stdlib_serializes_datetimes(self):
+        result = json.loads(StdlibSerializer().dumps(self.payload))
+        assert result['data'][0]['at'] == '2024-05-01T09:30:15.000120'
+
+    @pytest.mark.skipif(orjson is None, reason="orjson not installed")
+    def test_orjson_matches_stdlib(self):
+        assert json.loads(OrjsonSerializer().dumps(self.payload)) == json.loads(StdlibSerializer().dumps(self.payload))
+
+    def test_create_serializer_by_name(self):
+        assert create_serializer('json').name == 'json'
+
+
+class TestProjections:
+    """Test row projections."""
+
+    def test_converters_applied(self):
+        projection = RowProjection([
+            ('id', ScheduledPost.id),
+            ('platforms', ScheduledPost.platforms, lambda value: value.split(',')),
+        ])
+        assert projection.to_dicts([(1, 'twitter,facebook')]) == [{'id': 1, 'platforms': ['twitter', 'facebook']}]
+
+    def test_post_projection_matches_to_dict(self, app):
+        post = ScheduledPost(user_id=1, content='hello', platforms='twitter,facebook',
+                             scheduled_time=datetime(2030, 1, 1, 9, 0))
+        db.session.add(post)
+        db.session.commit()
+
+        rows = db.session.execute(POST_PROJECTION.select().where(ScheduledPost.id == post.id))
+        projected = POST_PROJECTION.to_dicts(rows)[0]
+
+        serializer = StdlibSerializer()
+        assert json.loads(serializer.dumps(projected)) == json.loads(serializer.dumps(post.to_dict()))
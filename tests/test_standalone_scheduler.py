@@ -0,0 +1,260 @@
+"""
+Tests for the standalone scheduler's timer thread.
+"""
+import json
+import sqlite3
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+import pytest
+from standalone_scheduler import StandaloneScheduler, cli, read_import_file
+from conftest import wait_for
+
+
+class FakeConfig:
+    """Fake-mode config; the recorder below replaces the integration."""
+    PLATFORM_API_MODE = 'fake'
+    FAKE_PLATFORM_URL = 'http://127.0.0.1:9'
+
+
+class RecordingInstagram:
+    """Records posted captions."""
+
+    def __init__(self):
+        self.posted = []
+        self.threads = set()
+
+    def post(self, content):
+        self.posted.append(content)
+        self.threads.add(threading.current_thread().name)
+        return True
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    """Path of a fresh scheduler database."""
+    return str(tmp_path / 'standalone.db')
+
+
+def make_scheduler(db_path, workers=2):
+    """Started scheduler whose posts are recorded instead of sent."""
+    scheduler = StandaloneScheduler(db_path, config=FakeConfig(), workers=workers)
+    scheduler.instagram = RecordingInstagram()
+    scheduler.start()
+    return scheduler
+
+
+def statuses(db_path):
+    """Map of post ID to status."""
+    conn = sqlite3.connect(db_path)
+    rows = dict(conn.execute("SELECT id, status FROM scheduled_posts"))
+    conn.close()
+    return rows
+
+
+def statuses_if_exists(db_path):
+    """Statuses, or an empty map if the database was never created."""
+    try:
+        return statuses(db_path)
+    except sqlite3.OperationalError:
+        return {}
+
+
+class TestTimerThread:
+    """Test dispatch from a single timer thread."""
+
+    def test_posts_published_in_due_order(self, db_path):
+        scheduler = make_scheduler(db_path, workers=1)
+        try:
+            now = datetime.now()
+            for name, delay in (('third', 0.3), ('first', 0.1), ('second', 0.2)):
+                scheduler.schedule_post(name, now + timedelta(seconds=delay))
+
+            assert wait_for(lambda: len(scheduler.instagram.posted) == 3)
+            assert scheduler.instagram.posted == ['first', 'second', 'third']
+            assert set(statuses(db_path).values()) == {'posted'}
+        finally:
+            scheduler.stop()
+
+    def test_many_posts_use_bounded_threads(self, db_path):
+        scheduler = make_scheduler(db_path, workers=2)
+        try:
+            threads_before = threading.active_count()
+            due = datetime.now() + timedelta(seconds=0.2)
+            for i in range(200):
+                scheduler.schedule_post(f'post {i}', due)
+            assert threading.active_count() == threads_before
+
+            assert wait_for(lambda: len(scheduler.instagram.posted) == 200)
+            assert len(scheduler.instagram.threads) <= 2
+        finally:
+            scheduler.stop()
+
+    def test_cancelled_post_not_published(self, db_path):
+        scheduler = make_scheduler(db_path)
+        try:
+            post_id = scheduler.schedule_post('cancel me', datetime.now() + timedelta(seconds=0.2))
+            scheduler.cancel_post(post_id)
+            time.sleep(0.4)
+            assert scheduler.instagram.posted == []
+        finally:
+            scheduler.stop()
+
+    def test_past_time_rejected(self, db_path):
+        scheduler = make_scheduler(db_path)
+        try:
+            assert scheduler.schedule_post('late', datetime.now() - timedelta(minutes=1)) is None
+            assert statuses(db_path) == {}
+        finally:
+            scheduler.stop()
+
+
+class TestRehydrate:
+    """Test resuming pending posts after a restart."""
+
+    def test_pending_posts_resumed_on_start(self, db_path):
+        scheduler = make_scheduler(db_path)
+        missed = scheduler.schedule_post('missed', datetime.now() + timedelta(seconds=0.1))
+        later = scheduler.schedule_post('later', datetime.now() + timedelta(hours=1))
+        # Stop before anything is due, as if the process had exited
+        scheduler.stop()
+        time.sleep(0.2)
+
+        restarted = make_scheduler(db_path)
+        try:
+            assert wait_for(lambda: restarted.instagram.posted == ['missed'])
+            assert statuses(db_path) == {missed: 'posted', later: 'pending'}
+            assert len(restarted.timers) == 1
+        finally:
+            restarted.stop()
+
+
+    def test_interrupted_posts_failed_on_start(self, db_path):
+        scheduler = make_scheduler(db_path)
+        interrupted = scheduler.schedule_post('interrupted', datetime.now() + timedelta(hours=1))
+        scheduler.stop()
+        conn = sqlite3.connect(db_path)
+        with conn:
+            conn.execute("UPDATE scheduled_posts SET status = 'posting' WHERE id = ?", (interrupted,))
+        conn.close()
+
+        restarted = make_scheduler(db_path)
+        try:
+            assert statuses(db_path) == {interrupted: 'failed'}
+            assert restarted.timers == []
+        finally:
+            restarted.stop()
+
+
+class TestClaim:
+    """Test that a post is published at most once."""
+
+    def test_post_published_once(self, db_path):
+        scheduler = StandaloneScheduler(db_path, config=FakeConfig(), workers=4)
+        scheduler.instagram = RecordingInstagram()
+        try:
+            post_id = scheduler.schedule_post('once', datetime.now() + timedelta(hours=1))
+            threads = [threading.Thread(target=scheduler.execute_post, args=(post_id,)) for _ in range(4)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+            assert scheduler.instagram.posted == ['once']
+            assert statuses(db_path) == {post_id: 'posted'}
+        finally:
+            scheduler.stop()
+
+    def test_cancel_after_claim_fails(self, db_path, capsys):
+        scheduler = StandaloneScheduler(db_path, config=FakeConfig())
+        try:
+            post_id = scheduler.schedule_post('claimed', datetime.now() + timedelta(hours=1))
+            conn = scheduler.connection()
+            with conn:
+                conn.execute("UPDATE scheduled_posts SET status = 'posting' WHERE id = ?", (post_id,))
+
+            scheduler.cancel_post(post_id)
+            assert 'already processed' in capsys.readouterr().out
+            assert statuses(db_path) == {post_id: 'posting'}
+        finally:
+            scheduler.close()
+
+
+class TestConnections:
+    """Test per-thread connections."""
+
+    def test_one_wal_connection_per_thread(self, db_path):
+        scheduler = StandaloneScheduler(db_path, config=FakeConfig())
+        try:
+            conn = scheduler.connection()
+            other = []
+            thread = threading.Thread(target=lambda: other.append(scheduler.connection()))
+            thread.start()
+            thread.join()
+
+            assert scheduler.connection() is conn
+            assert other[0] is not conn
+            assert conn.execute('PRAGMA journal_mode').fetchone()[0] == 'wal'
+        finally:
+            scheduler.close()
+
+
+class TestImport:
+    """Test the import subcommand."""
+
+    def test_csv_imported_in_one_transaction(self, db_path, tmp_path):
+        path = tmp_path / 'posts.csv'
+        rows = '\n'.join(f'post {i},2099-01-01 09:{i % 60:02d}' for i in range(2000))
+        path.write_text('content,scheduled_time\n' + rows + '\n')
+
+        assert cli(['--db', db_path, 'import', str(path)]) == 0
+        assert list(statuses(db_path).values()) == ['pending'] * 2000
+
+    def test_import_does_not_log_in(self, db_path, tmp_path, monkeypatch):
+        def no_login(config):
+            raise AssertionError('import must not create an Instagram client')
+
+        monkeypatch.setattr('standalone_scheduler.InstagramIntegration', no_login)
+        path = tmp_path / 'posts.csv'
+        path.write_text('content,scheduled_time\nhello,2099-01-01 09:00\n')
+
+        assert cli(['--db', db_path, 'import', str(path)]) == 0
+        assert list(statuses(db_path).values()) == ['pending']
+
+    def test_json_import(self, tmp_path):
+        path = tmp_path / 'posts.json'
+        path.write_text(json.dumps([{'content': 'Hello, world', 'scheduled_time': '2099-01-01T09:00:00'}]))
+        assert read_import_file(str(path)) == [('Hello, world', datetime(2099, 1, 1, 9, 0))]
+
+    def test_times_with_offset_converted_to_local(self, tmp_path):
+        path = tmp_path / 'posts.csv'
+        path.write_text('content,scheduled_time\nutc,2099-01-01T09:00:00Z\nparis,2099-01-01T09:00:00+02:00\n')
+
+        posts = dict(read_import_file(str(path)))
+        assert posts['utc'] == datetime(2099, 1, 1, 9, 0, tzinfo=timezone.utc).astimezone().replace(tzinfo=None)
+        assert posts['utc'] - posts['paris'] == timedelta(hours=2)
+        assert all(scheduled_time.tzinfo is None for scheduled_time in posts.values())
+
+    def test_past_time_with_offset_rejected(self, tmp_path):
+        path = tmp_path / 'posts.json'
+        path.write_text(json.dumps([{'content': 'late', 'scheduled_time': '2000-01-01T09:00:00+00:00'}]))
+
+        with pytest.raises(ValueError, match='row 1: scheduled_time .* is in the past'):
+            read_import_file(str(path))
+
+    def test_invalid_rows_reject_whole_file(self, db_path, tmp_path, capsys):
+        path = tmp_path / 'posts.csv'
+        path.write_text('content,scheduled_time\nok,2099-01-01 09:00\n,2099-01-01 09:00\nlate,2000-01-01 09:00\n')
+
+        assert cli(['--db', db_path, 'import', str(path)]) == 1
+        assert 'row 2: missing content' in capsys.readouterr().out
+        assert not statuses_if_exists(db_path)
+
+    def test_import_while_running_queues_posts(self, db_path):
+        scheduler = make_scheduler(db_path)
+        try:
+            due = datetime.now() + timedelta(seconds=0.1)
+            assert scheduler.import_posts([('a', due), ('b', due)]) == 2
+            assert wait_for(lambda: sorted(scheduler.instagram.posted) == ['a', 'b'])
+        finally:
+            scheduler.stop()
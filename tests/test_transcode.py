@@ -0,0 +1,108 @@
+"""
+Tests for per-platform image transcoding.
+"""
+import os
+import pytest
+from PIL import Image
+from backend.media.cache import MediaCache
+from backend.media.transcode import PROFILES, ImageProfile, MediaTranscoder, transcode_image
+
+
+def make_image(path, size, mode='RGB', fmt='JPEG'):
+    """Write a noisy test image so JPEG sizes are realistic."""
+    image = Image.effect_noise(size, 64).convert(mode)
+    image.save(path, fmt)
+    return str(path)
+
+
+@pytest.fixture
+def transcoder(tmp_path):
+    """Transcoder with a single worker process over an empty cache."""
+    transcoder = MediaTranscoder(MediaCache(str(tmp_path / 'media')), max_workers=1)
+    yield transcoder
+    transcoder.shutdown()
+
+
+class TestTranscodeImage:
+    """Test the per-profile image conversion."""
+
+    def test_instagram_tall_image_cropped_to_4_5(self, tmp_path):
+        source = make_image(tmp_path / 'tall.jpg', (2000, 4000))
+        dest = str(tmp_path / 'out.jpg')
+        assert transcode_image(source, dest, PROFILES['instagram']) is True
+
+        with Image.open(dest) as image:
+            assert image.format == 'JPEG'
+            assert image.size == (1080, 1350)
+
+    def test_instagram_wide_image_cropped_to_1_91(self, tmp_path):
+        source = make_image(tmp_path / 'wide.jpg', (3000, 1000))
+        dest = str(tmp_path / 'out.jpg')
+        transcode_image(source, dest, PROFILES['instagram'])
+
+        with Image.open(dest) as image:
+            assert image.width == 1080
+            assert abs(image.width / image.height - 1.91) < 0.01
+
+    def test_small_images_not_upscaled(self, tmp_path):
+        source = make_image(tmp_path / 'small.jpg', (400, 300))
+        dest = str(tmp_path / 'out.jpg')
+        transcode_image(source, dest, PROFILES['twitter'])
+
+        with Image.open(dest) as image:
+            assert image.size == (400, 300)
+
+    def test_transparency_flattened_to_jpeg(self, tmp_path):
+        source = make_image(tmp_path / 'alpha.png', (300, 300), mode='RGBA', fmt='PNG')
+        dest = str(tmp_path / 'out.jpg')
+        transcode_image(source, dest, PROFILES['facebook'])
+
+        with Image.open(dest) as image:
+            assert (image.format, image.mode) == ('JPEG', 'RGB')
+
+    def test_file_size_limit_enforced(self, tmp_path):
+        source = make_image(tmp_path / 'big.jpg', (2000, 2000))
+        dest = str(tmp_path / 'out.jpg')
+        profile = ImageProfile('tiny', 2000, 2000, None, None, 100 * 1024, 95)
+        transcode_image(source, dest, profile)
+        assert os.path.getsize(dest) <= 100 * 1024
+
+    def test_non_images_rejected(self, tmp_path):
+        source = tmp_path / 'clip.mp4'
+        source.write_bytes(b'\x00\x00\x00\x18ftypmp42' + os.urandom(100))
+        assert transcode_image(str(source), str(tmp_path / 'out.jpg'), PROFILES['twitter']) is False
+
+
+class TestMediaTranscoder:
+    """Test variant caching."""
+
+    def test_variant_produced_once_and_cached(self, tmp_path, transcoder):
+        source = make_image(tmp_path / 'photo.jpg', (2000, 2000))
+        with transcoder.variant(source, 'instagram') as first:
+            pass
+        with transcoder.variant(source, 'instagram') as second:
+            pass
+
+        assert first == second
+        assert first.startswith(transcoder.cache.root)
+        assert transcoder.stats['transcoded'] == 1
+        assert transcoder.stats['reused'] == 1
+
+    def test_variants_per_profile(self, tmp_path, transcoder):
+        source = make_image(tmp_path / 'photo.jpg', (3000, 3000))
+        paths = {platform: transcoder.prepare(source, platform) for platform in ('instagram', 'facebook')}
+
+        assert paths['instagram'] != paths['facebook']
+        with Image.open(paths['facebook']) as image:
+            assert image.size == (2048, 2048)
+
+    def test_non_images_passed_through(self, tmp_path, transcoder):
+        source = tmp_path / 'clip.mp4'
+        source.write_bytes(os.urandom(1000))
+        with transcoder.variant(str(source), 'twitter') as path:
+            assert path == str(source)
+        assert transcoder.stats['passed_through'] == 1
+
+    def test_unknown_platform_uses_original(self, tmp_path, transcoder):
+        source = make_image(tmp_path / 'photo.jpg', (100, 100))
+        assert transcoder.prepare(source, 'linkedin') == source
@@ -0,0 +1,193 @@
+"""
+Tests for the split API / publisher worker scheduling roles.
+"""
+import json
+import time
+from datetime import datetime, timedelta
+from backend.core.scheduler import PostScheduler
+from backend.models.database import db, ScheduledPost
+from sqlalchemy import update
+
+
+class StubPostHandler:
+    """Post handler that counts publish calls."""
+
+    def __init__(self):
+        self.calls = 0
+
+    def post_to_platform(self, platform, content, media_url=None, user_id=None, idempotency_key=None):
+        self.calls += 1
+        return True
+
+
+class LeaseLosingPostHandler(StubPostHandler):
+    """Post handler that loses the post's lease during the first publish call."""
+
+    def __init__(self, post_id, **lease):
+        super().__init__()
+        self.post_id = post_id
+        self.lease = lease
+        self.platforms = []
+
+    def post_to_platform(self, platform, content, media_url=None, user_id=None, idempotency_key=None):
+        if not self.platforms:
+            db.session.execute(update(ScheduledPost).where(ScheduledPost.id == self.post_id).values(**self.lease))
+            db.session.commit()
+        self.platforms.append(platform)
+        return super().post_to_platform(platform, content, media_url, user_id, idempotency_key)
+
+
+def add_post(scheduled_time):
+    """Insert a pending post and return its ID."""
+    post = ScheduledPost(user_id=1, content='hello', platforms='twitter', scheduled_time=scheduled_time)
+    db.session.add(post)
+    db.session.commit()
+    return post.id
+
+
+class TestApiRole:
+    """Test that API processes only enqueue posts."""
+
+    def test_create_post_does_not_schedule_job(self, app, client):
+        response = client.post('/api/auth/register', data=json.dumps({
+            'username': 'testuser', 'email': 'test@example.com', 'password': 'password123'
+        }), content_type='application/json')
+        token = response.get_json()['data']['token']
+
+        response = client.post('/api/posts', data=json.dumps({
+            'content': 'Queued post',
+            'platforms': ['twitter'],
+            'scheduled_time': (datetime.utcnow() + timedelta(hours=1)).isoformat()
+        }), content_type='application/json', headers={'Authorization': f'Bearer {token}'})
+
+        assert response.status_code == 200
+        assert response.get_json()['data']['status'] == 'pending'
+        assert app.scheduler.get_scheduled_jobs() == []
+
+
+class TestWorkerRole:
+    """Test that workers claim and publish due posts."""
+
+    def test_claim_is_exclusive(self, app):
+        scheduler = PostScheduler(db, StubPostHandler(), role='api')
+        post_id = add_post(datetime.utcnow())
+
+        assert scheduler.claim_post(post_id) is True
+        assert scheduler.claim_post(post_id) is False
+
+    def test_claimed_post_not_republished(self, app):
+        handler = StubPostHandler()
+        scheduler = PostScheduler(db, handler, role='api')
+        post_id = add_post(datetime.utcnow())
+        scheduler.claim_post(post_id)
+
+        scheduler._execute_post(post_id)
+
+        assert handler.calls == 0
+
+    def test_worker_publishes_due_posts(self, app):
+        handler = StubPostHandler()
+        due_id = add_post(datetime.utcnow() - timedelta(minutes=1))
+        future_id = add_post(datetime.utcnow() + timedelta(hours=1))
+
+        scheduler = PostScheduler(db, handler, app=app, role='worker', poll_interval=3600)
+        try:
+            deadline = time.time() + 5
+            while time.time() < deadline:
+                db.session.expire_all()
+                if db.session.get(ScheduledPost, due_id).status == 'posted':
+                    break
+                time.sleep(0.05)
+
+            assert db.session.get(ScheduledPost, due_id).status == 'posted'
+            assert db.session.get(ScheduledPost, future_id).status == 'pending'
+            assert handler.calls == 1
+        finally:
+            scheduler.shutdown()
+
+
+class TestLeases:
+    """Test lease-based claiming across multiple schedulers."""
+
+    def test_workers_claim_disjoint_batches(self, app):
+        first = PostScheduler(db, StubPostHandler(), role='api', worker_id='node-a')
+        second = PostScheduler(db, StubPostHandler(), role='api', worker_id='node-b')
+        for _ in range(5):
+            add_post(datetime.utcnow() - timedelta(minutes=1))
+
+        claimed_a = first.claim_due_posts(3)
+        claimed_b = second.claim_due_posts(3)
+
+        assert len(claimed_a) == 3
+        assert len(claimed_b) == 2
+        assert not set(claimed_a) & set(claimed_b)
+        assert db.session.get(ScheduledPost, claimed_b[0]).claimed_by == 'node-b'
+
+    def test_expired_lease_is_reclaimed(self, app):
+        crashed = PostScheduler(db, StubPostHandler(), role='api', worker_id='crashed', lease_seconds=60)
+        survivor = PostScheduler(db, StubPostHandler(), role='api', worker_id='survivor')
+        post_id = add_post(datetime.utcnow() - timedelta(minutes=1))
+        crashed.claim_due_posts(10)
+
+        assert survivor.claim_due_posts(10) == []
+
+        db.session.get(ScheduledPost, post_id).lease_expires_at = datetime.utcnow() - timedelta(seconds=1)
+        db.session.commit()
+
+        assert survivor.claim_due_posts(10) == [post_id]
+
+    def test_lost_lease_does_not_overwrite_status(self, app):
+        stale = PostScheduler(db, StubPostHandler(), role='api', worker_id='stale')
+        current = PostScheduler(db, StubPostHandler(), role='api', worker_id='current')
+        post_id = add_post(datetime.utcnow())
+        stale.claim_post(post_id)
+        db.session.get(ScheduledPost, post_id).lease_expires_at = datetime.utcnow() - timedelta(seconds=1)
+        db.session.commit()
+        current.claim_post(post_id)
+
+        assert stale._complete_post(post_id, 'failed') is False
+        assert current._complete_post(post_id, 'posted') is True
+        db.session.expire_all()
+        assert db.session.get(ScheduledPost, post_id).status == 'posted'
+
+    def test_renew_leases_extends_in_flight_posts(self, app):
+        scheduler = PostScheduler(db, StubPostHandler(), role='api', lease_seconds=600)
+        post_id = add_post(datetime.utcnow())
+        scheduler.claim_post(post_id)
+        post = db.session.get(ScheduledPost, post_id)
+        post.lease_expires_at = datetime.utcnow()
+        db.session.commit()
+
+        assert scheduler.renew_leases() == 1
+        db.session.expire_all()
+        assert db.session.get(ScheduledPost, post_id).lease_expires_at > datetime.utcnow() + timedelta(seconds=500)
+
+    def test_stolen_lease_stops_delivery(self, app):
+        post_id = add_post(datetime.utcnow())
+        db.session.get(ScheduledPost, post_id).platforms = 'twitter,facebook,instagram'
+        db.session.commit()
+        handler = LeaseLosingPostHandler(post_id, claimed_by='thief',
+                                         lease_expires_at=datetime.utcnow() + timedelta(minutes=5))
+        scheduler = PostScheduler(db, handler, role='api', worker_id='paused')
+
+        scheduler._execute_post(post_id)
+
+        assert handler.platforms == ['twitter']
+        db.session.expire_all()
+        post = db.session.get(ScheduledPost, post_id)
+        assert (post.status, post.claimed_by) == ('processing', 'thief')
+        assert post.delivered_platforms is None
+
+    def test_expired_lease_stops_before_next_platform(self, app):
+        post_id = add_post(datetime.utcnow())
+        db.session.get(ScheduledPost, post_id).platforms = 'twitter,facebook,instagram'
+        db.session.commit()
+        handler = LeaseLosingPostHandler(post_id, lease_expires_at=datetime.utcnow() - timedelta(seconds=1))
+        scheduler = PostScheduler(db, handler, role='api', worker_id='slow')
+
+        scheduler._execute_post(post_id)
+
+        assert handler.platforms == ['twitter']
+        db.session.expire_all()
+        post = db.session.get(ScheduledPost, post_id)
+        assert (post.status, post.delivered_platforms) == ('processing', 'twitter')
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Publisher worker for the Social Media Automation Bot.
+
+Owns the post scheduler: polls the database for due posts, claims them and
+publishes them. Run web processes with SCHEDULER_ROLE=api so they only
+enqueue posts, and scale workers independently:
+
+    SCHEDULER_ROLE=api gunicorn -w 4 "app:create_app('production')"
+    python worker.py
+"""
+import hmac
+import logging
+import os
+import signal
+import threading
+from wsgiref.simple_server import WSGIRequestHandler, make_server
+
+from app import create_app
+from backend.core.metrics import CONTENT_TYPE
+
+logger = logging.getLogger(__name__)
+
+
+class QuietRequestHandler(WSGIRequestHandler):
+    """Request handler that does not log every scrape."""
+    
+    def log_message(self, format, *args):
+        pass
+
+
+def serve_metrics(app, port, host='127.0.0.1'):
+    """
+    Serve the worker's scheduler metrics on a local port.
+    
+    When METRICS_TOKEN is set, scrapes must send it as a bearer token.
+    
+    Args:
+        app: Flask application owning the scheduler
+        port: TCP port for Prometheus to scrape
+        host: Interface to bind; loopback only unless METRICS_HOST says otherwise
+    """
+    token = app.config.get('METRICS_TOKEN')
+    
+    def metrics_app(environ, start_response):
+        if environ.get('PATH_INFO') not in ('/metrics', '/api/metrics'):
+            start_response('404 Not Found', [('Content-Type', 'text/plain')])
+            return [b'Not Found']
+        if token and not hmac.compare_digest(environ.get('HTTP_AUTHORIZATION', ''), f'Bearer {token}'):
+            start_response('401 Unauthorized', [('Content-Type', 'text/plain')])
+            return [b'Unauthorized']
+        body = app.scheduler.render_metrics().encode()
+        start_response('200 OK', [('Content-Type', CONTENT_TYPE), ('Content-Length', str(len(body)))])
+        return [body]
+    
+    server = make_server(host, port, metrics_app, handler_class=QuietRequestHandler)
+    threading.Thread(target=server.serve_forever, name='metrics', daemon=True).start()
+    logger.info(f"Serving worker metrics on {host}:{server.server_port}")
+    return server
+
+
+def main():
+    """Run the publisher worker until interrupted."""
+    app = create_app(os.getenv('FLASK_ENV', 'production'), scheduler_role='worker')
+    stop = threading.Event()
+    metrics_server = None
+    if app.config['METRICS_PORT']:
+        metrics_server = serve_metrics(app, app.config['METRICS_PORT'], app.config['METRICS_HOST'])
+    
+    def handle_signal(signum, frame):
+        logger.info(f"Received signal {signum}, shutting down publisher worker")
+        stop.set()
+    
+    signal.signal(signal.SIGTERM, handle_signal)
+    signal.signal(signal.SIGINT, handle_signal)
+    
+    logger.info("Publisher worker started")
+    stop.wait()
+    if metrics_server:
+        metrics_server.shutdown()
+    app.scheduler.shutdown()
+    logger.info("Publisher worker stopped")
+
+
+if __name__ == '__main__':
+    main()